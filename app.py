@@ -59,7 +59,7 @@ app.debug = settings.DEBUG
 def __handle_sqs_message(event):
     import json
 
-    logger = Logger()
+    logger = Logger(__name__)
 
     for record in event:
         data = record.to_dict()
@@ -67,10 +67,7 @@ def __handle_sqs_message(event):
 
         sqs_message_data = record.body if type(record.body) is dict else json.loads(record.body)
         sqs_message = SqsMessage(data['messageId'], object_type, sqs_message_data)
-        logger.log_simple('SQS Event Handling - Handle message "{}" #{} - Start'.format(
-            sqs_message.message_type,
-            sqs_message.id
-        ))
+        logger.debug('SQS Event Handling - Handle message "{}" #{} - Start', sqs_message.message_type, sqs_message.id)
 
         handlers_map = {
             'chalicelib.utils.sqs_handlers.product.ProductSqsHandler': ('mpc_assets_product_config',),
@@ -120,21 +117,23 @@ def __handle_sqs_message(event):
                 if object_type in handlers_map[class_name]:
                     sqs_handler: SqsHandlerInterface = create_object(class_name)
                     sqs_handler.handle(sqs_message)
-                    logger.log_simple('SQS Event Handling - Handle message "{}" #{} - Done!'.format(
+                    logger.debug(
+                        'SQS Event Handling - Handle message "{}" #{} - Done!',
                         sqs_message.message_type,
                         sqs_message.id
-                    ))
+                    )
                     return
             else:
                 raise ValueError('SQS Handler was not found!')
 
         except BaseException as e:
             app.log.exception('Error SQS "{}" {} - {}'.format(object_type, data, str(e)))
-            logger.log_simple('SQS Event Handling - Handle message "{}" #{} - Error: {}!'.format(
+            logger.error(
+                'SQS Event Handling - Handle message "{}" #{} - Error: {}!',
                 sqs_message.message_type,
                 sqs_message.id,
                 str(e)
-            ))
+            )
 
 
 queues = settings.SQS_LISTENER_CONFIG.get('queues')
@@ -168,24 +167,36 @@ if settings.STAGE in settings.STAGES_TO_BIND_LAMBDA_WITH_AWS_RESOURCES:
         Rate(settings.SCORE_CALCULATE_INTERVAL, Rate.MINUTES),
         name='product-score-%s-schduler' % shorten_stage_str)
     def scheduler(event):
-        emails = CustomerStateModel.get_customers_to_recalculate_scores()
-        User.send_calculate_product_score_for_customers(emails)
+        try:
+            emails = CustomerStateModel.get_customers_to_recalculate_scores()
+            User.send_calculate_product_score_for_customers(emails)
+        finally:
+            # buffered log records of the event are written at once
+            Logger.flush()
 
     @app.lambda_function(name='cognito-hook-%s' % settings.STAGE)
     def cognito_hook(event, context):
-        # TODO: Some logics that should be done when a customer was created here.
-        trigger_source = event['triggerSource']
-        if trigger_source == 'PostConfirmation_ConfirmSignUp':
-            email = event['request']['userAttributes']['email']
-            User.send_calculate_product_score_for_customers(emails=[email])
-            return {'status': True}
-        return {'status': False}
+        try:
+            # TODO: Some logics that should be done when a customer was created here.
+            trigger_source = event['triggerSource']
+            if trigger_source == 'PostConfirmation_ConfirmSignUp':
+                email = event['request']['userAttributes']['email']
+                User.send_calculate_product_score_for_customers(emails=[email])
+                return {'status': True}
+            return {'status': False}
+        finally:
+            # buffered log records of the event are written at once
+            Logger.flush()
 
     for queue in queues:
         name = 'sqs_' + str(queue.get('name')).replace('.', '-')    # "." is not supported
         @app.on_sqs_message(queue=queue.get('name'), batch_size=queue.get('batch_size'), name=name)
         def register_listener(event):
-            __handle_sqs_message(event)
+            try:
+                __handle_sqs_message(event)
+            finally:
+                # buffered log records of the event are written at once
+                Logger.flush()
 else:
     print("Skipping lambda functions additional resources such as\n"\
         "- SQS queues\n"
@@ -0,0 +1,134 @@
+"""
+Orders restoring benchmark.
+
+Restores orders from a captured DynamoDB export (aws dynamodb scan --output json > export.json)
+with the same code, which is used by /orders endpoints.
+
+    $ python benchmarks/order_restore.py [export.json] [--repeat 1000]
+
+If the export does not contain orders in the current format (PURCHASE_ORDERS partition),
+a synthetic order with a long status history is used instead.
+"""
+import os
+import sys
+import json
+import timeit
+import datetime
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from boto3.dynamodb.types import TypeDeserializer
+from chalicelib.libs.purchase.order import storage as order_storage
+
+
+def _load_rows(export_path: str) -> list:
+    with open(export_path) as f:
+        export = json.load(f)
+
+    deserializer = TypeDeserializer()
+    rows = []
+    for item in export.get('Items', []):
+        row = {key: deserializer.deserialize(value) for key, value in item.items()}
+        if row.get('pk') == 'PURCHASE_ORDERS':
+            rows.append(row)
+
+    return rows
+
+
+def _synthetic_row(items_count: int = 10, history_size: int = 20) -> dict:
+    from decimal import Decimal
+
+    changed_at = datetime.datetime(2020, 1, 1, 10, 0, 0, 123456)
+    statuses = ('Awaiting Payment', 'Payment Sent', 'Payment Received', 'On Hold')
+    return {
+        'pk': 'PURCHASE_ORDERS',
+        'sk': '20200010001234567',
+        'customer_id': 'b6a0a5f4-0d33-4f1f-b6b4-0d1b3e8e5e2a',
+        'order_items': [{
+            'event_code': 'EVENT{}'.format(i),
+            'simple_sku': 'SKU-{}'.format(i),
+            'product_original_price': Decimal('499.99'),
+            'product_current_price': Decimal('349.5'),
+            'dtd_occasion_name': None,
+            'dtd_occasion_description': None,
+            'dtd_date_from': '2020-01-05',
+            'dtd_date_to': '2020-01-09',
+            'dtd_working_days_from': Decimal(3),
+            'dtd_working_days_to': Decimal(5),
+            'qty_ordered': Decimal(2),
+            'qty_cancelled_before_payment': Decimal(0),
+            'qty_cancelled_after_payment_requested': Decimal(0),
+            'qty_cancelled_after_payment_cancelled': Decimal(0),
+            'qty_return_requested': Decimal(0),
+            'qty_return_returned': Decimal(0),
+            'qty_refunded': Decimal(0),
+            'qty_modified_at': changed_at.strftime('%Y-%m-%dT%H:%M:%S.%f'),
+            'fbucks_earnings': Decimal('10.5'),
+        } for i in range(items_count)],
+        'delivery_address_recipient_name': 'Recipient',
+        'delivery_address_phone_number': '+27000000000',
+        'delivery_address_street_address': 'Street',
+        'delivery_address_suburb': 'Suburb',
+        'delivery_address_city': 'Cape Town',
+        'delivery_address_province': 'Western Cape',
+        'delivery_address_complex_building': None,
+        'delivery_address_postal_code': '8001',
+        'delivery_address_business_name': None,
+        'delivery_address_special_instructions': None,
+        'delivery_cost': Decimal(60),
+        'vat_percent': Decimal(15),
+        'credits_spent': Decimal(0),
+        'payment_method': 'regular_eft',
+        'payment_method_extra_data_json': '{}',
+        'status_history': [{
+            'status': statuses[0] if i == 0 else statuses[1 + i % 3],
+            'datetime': (changed_at + datetime.timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%S.%f'),
+        } for i in range(history_size)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('export', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'export.json'))
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = _load_rows(args.export)
+    source = 'export'
+    if not rows:
+        rows = [_synthetic_row()]
+        source = 'synthetic'
+
+    storage = order_storage._OrderStorageDynamoDb()
+    restore = getattr(storage, '_OrderStorageDynamoDb__restore')
+
+    seconds = timeit.timeit(lambda: [restore(row) for row in rows], number=args.repeat)
+    orders_count = len(rows) * args.repeat
+    print('Orders ({}): {}, restored in {:.3f}s - {:.1f} us/order'.format(
+        source,
+        orders_count,
+        seconds,
+        seconds / orders_count * 1000000
+    ))
+
+    timestamps = [change['datetime'] for row in rows for change in row['status_history']]
+    strptime_seconds = timeit.timeit(
+        lambda: [datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f') for value in timestamps],
+        number=args.repeat
+    )
+    parser_seconds = timeit.timeit(
+        lambda: [order_storage._parse_datetime(value) for value in timestamps],
+        number=args.repeat
+    )
+    print('Timestamps: {}, strptime {:.3f}s, precompiled parser {:.3f}s'.format(
+        len(timestamps) * args.repeat,
+        strptime_seconds,
+        parser_seconds
+    ))
+
+
+if __name__ == '__main__':
+    main()
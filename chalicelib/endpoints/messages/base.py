@@ -1,5 +1,8 @@
 from typing import Tuple, List
+from datetime import datetime
 from chalice import Blueprint, UnauthorizedError, NotFoundError, BadRequestError
+from chalicelib.extensions import ArgumentValueException
+from chalicelib.libs.core.chalice.request import MPCRequest
 from chalicelib.libs.message.base import Message, MessageStorageImplementation
 
 blueprint = Blueprint(__name__)
@@ -10,22 +13,63 @@ def __response_list(messages: Tuple[Message]) -> Tuple[dict]:
         'id': message.message_id,
         'title': message.title,
         'text': message.text,
-        'created_at': message.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        'created_at': message.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        # sent back to dismiss the message by its key
+        'key': message.created_at.strftime('%Y%m%d%H%M%S%f'),
     } for message in messages]
 
     return tuple(response)
 
 
+def __response_page(request: MPCRequest, customer_email: str, all_messages: bool = True):
+    """
+    The newest messages first: a page, when "cursor" query parameter is sent,
+    otherwise all messages or the first page (size), if all_messages is False.
+    """
+    message_storage = MessageStorageImplementation()
+
+    if request.cursor is None and all_messages:
+        return __response_list(message_storage.get_all_for_customer(customer_email))
+
+    try:
+        messages, cursor = message_storage.get_page_for_customer(customer_email, request.size, request.cursor or None)
+    except ArgumentValueException as e:
+        raise BadRequestError(str(e))
+
+    if request.cursor is None:
+        return __response_list(messages)
+
+    return {'messages': __response_list(messages), 'cursor': cursor}
+
+
 @blueprint.route('/list', methods=['GET'], cors=True)
 def messages_list():
     user = blueprint.current_request.current_user
     if user.is_anyonimous:
         raise UnauthorizedError('Authentication is required!')
 
+    return __response_page(blueprint.current_request, user.email)
+
+
+@blueprint.route('/unread_count', methods=['GET'], cors=True)
+def messages_unread_count():
+    user = blueprint.current_request.current_user
+    if user.is_anyonimous:
+        raise UnauthorizedError('Authentication is required!')
+
     message_storage = MessageStorageImplementation()
-    messages = message_storage.get_all_for_customer(user.email)
+    return {'count': message_storage.get_unread_count(user.email)}
 
-    return __response_list(messages)
+
+@blueprint.route('/mark_read', methods=['POST'], cors=True)
+def messages_mark_read():
+    user = blueprint.current_request.current_user
+    if user.is_anyonimous:
+        raise UnauthorizedError('Authentication is required!')
+
+    message_storage = MessageStorageImplementation()
+    message_storage.mark_all_read(user.email)
+    return {'count': message_storage.get_unread_count(user.email)}
 
 
 @blueprint.route('/dismiss', methods=['DELETE'], cors=True)
@@ -34,20 +78,21 @@ def messages_dismiss():
     if user.is_anyonimous:
         raise UnauthorizedError('Authentication is required!')
 
-    message_id = str(blueprint.current_request.json_body.get('message_id') or '').strip() or None
+    request_data = blueprint.current_request.json_body or {}
+    message_id = str(request_data.get('message_id') or '').strip() or None
     if not message_id:
         raise BadRequestError('"message_id" is required!')
 
-    message_storage = MessageStorageImplementation()
+    # "key" of the listed message allows to remove it without searching, clients without it are still supported
+    key = str(request_data.get('key') or '').strip() or None
+    try:
+        created_at = datetime.strptime(key, '%Y%m%d%H%M%S%f') if key else None
+    except ValueError:
+        raise BadRequestError('"key" is incorrect!')
 
-    messages = list(message_storage.get_all_for_customer(user.email))
-    for k in range(0, len(messages)):
-        if messages[k].message_id == message_id:
-            message_storage.remove(message_id)
-            del messages[k]
-            break
-    else:
+    message_storage = MessageStorageImplementation()
+    if not message_storage.remove(user.email, message_id, created_at):
         raise NotFoundError('Your message #{} was not found!'.format(message_id))
 
-    return __response_list(tuple(messages))
-
+    # only the first page (size) without "cursor", so dismissing does not read all messages
+    return __response_page(blueprint.current_request, user.email, all_messages=False)
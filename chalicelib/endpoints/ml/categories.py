@@ -1,4 +1,5 @@
 from chalicelib.libs.core.chalice.request import MPCRequest
+from chalicelib.libs.core.response_cache import AnonymousResponseCache
 from chalicelib.libs.models.ml.scored_products import ScoredProduct
 from ...libs.models.mpc.categories import Category
 
@@ -7,10 +8,21 @@ def register_categories(blue_print):
     @blue_print.route('/categories', cors=True)
     def product_types():
         request: MPCRequest = blue_print.current_request
-        response = ScoredProduct().get_categories_by_gender(
-            request.gender, customer_id=request.current_user.id,
-            user_defined_product_types=request.current_user.profile.product_types)
-        return response
+        gender = request.gender
+        user_defined_product_types = request.current_user.profile.product_types
+
+        def __get_categories():
+            return ScoredProduct().get_categories_by_gender(
+                gender, customer_id=request.current_user.id,
+                user_defined_product_types=user_defined_product_types)
+
+        if request.current_user.is_anyonimous:
+            return AnonymousResponseCache('categories').respond(request, {
+                'gender': gender,
+                'product_types': user_defined_product_types,
+            }, __get_categories, private=True)
+
+        return __get_categories()
 
     @blue_print.route('/categories/{category_id}/products', cors=True)
     def category_by_subtypes(category_id):
@@ -1,5 +1,8 @@
+from chalice import BadRequestError
+from chalicelib.extensions import ArgumentValueException
 
 from ...libs.core.chalice.request import MPCRequest
+from ...libs.core.response_cache import AnonymousResponseCache
 from ...libs.models.ml.scored_products import ScoredProduct
 from ...libs.models.mpc.user import User
 
@@ -15,12 +18,33 @@ def register_new_ins(blue_print):
     def new_in(email=''):
         request = __get_request()
         product = ScoredProduct()
-        response = product.get_new_products(
-            customer_id=request.current_user.id,
-            gender=request.gender,
-            tier=request.current_user.profile.tier,
-            page=request.page, size=request.size)
-        return response['products']
+        gender = request.gender
+
+        def __list():
+            response = product.get_new_products(
+                customer_id=request.current_user.id,
+                gender=gender,
+                tier=request.current_user.profile.tier,
+                page=request.page, size=request.size,
+                cursor=request.cursor)
+
+            if request.cursor is not None:
+                return {'products': response['products'], 'cursor': response['cursor']}
+
+            return response['products']
+
+        try:
+            if request.current_user.is_anyonimous:
+                return AnonymousResponseCache('new_in').respond(request, {
+                    'gender': gender,
+                    'page': request.page,
+                    'size': request.size,
+                    'cursor': request.cursor,
+                }, __list)
+
+            return __list()
+        except ArgumentValueException as e:
+            raise BadRequestError(str(e))
 
     @blue_print.route('/last_chance', cors=True)
     def last_chance():
@@ -1,6 +1,8 @@
 from typing import List
-from chalice import ForbiddenError
+from chalice import ForbiddenError, NotFoundError, BadRequestError
+from chalicelib.extensions import ArgumentValueException
 from chalicelib.libs.core.chalice.request import MPCRequest
+from chalicelib.libs.core.response_cache import AnonymousResponseCache
 from chalicelib.libs.models.ml.scored_products import ScoredProduct
 from ...libs.models.mpc.user import User
 from ...libs.models.mpc.Cms.meta import Meta
@@ -21,13 +23,30 @@ def register_products(blue_print):
         request = __get_request()
         current_user = request.current_user
 
-        response = ScoredProduct().listByCustomFilter(
-            customer_id=current_user.id,
-            sort_by_score=True,
-            tier=current_user.profile.tier,
-            page=request.page, size=request.size)
+        def __list():
+            response = ScoredProduct().listByCustomFilter(
+                customer_id=current_user.id,
+                sort_by_score=True,
+                tier=current_user.profile.tier,
+                page=request.page, size=request.size,
+                cursor=request.cursor)
 
-        return response['products']  # response
+            if request.cursor is not None:
+                return {'products': response['products'], 'cursor': response['cursor']}
+
+            return response['products']  # response
+
+        try:
+            if current_user.is_anyonimous:
+                return AnonymousResponseCache('products').respond(request, {
+                    'page': request.page,
+                    'size': request.size,
+                    'cursor': request.cursor,
+                }, __list)
+
+            return __list()
+        except ArgumentValueException as e:
+            raise BadRequestError(str(e))
 
     @blue_print.route('/admin/product_scoring', cors=True, methods=['GET', 'POST'])
     def products():
@@ -80,6 +99,23 @@ def register_products(blue_print):
             tier=request.current_user.profile.tier)
         return item
 
+    @blue_print.route('/products/{product_id}/details', cors=True)
+    def get_product_details(product_id):
+        request = __get_request()
+        product = Product()
+        response = product.get_details(
+            product_id,
+            session_id=request.session_id,
+            customer_id=request.customer_id,
+            user_id=request.current_user.email,
+            tier=request.current_user.profile.tier,
+            page=request.page, size=request.size,
+            log=True)
+        if response is None:
+            raise NotFoundError('Product #{} does not exist!'.format(product_id))
+
+        return response
+
     @blue_print.route('/products/{product_id}/complete_looks', cors=True)
     def get_product(product_id):
         seen_app_service = SeenAppService()
@@ -99,7 +135,8 @@ def register_products(blue_print):
         response = product.get_smiliar_styles(
             product_id, customer_id=request.current_user.email,
             size=request.size, page=request.page,
-            tier=request.current_user.profile.tier)
+            tier=request.current_user.profile.tier,
+            session_id=request.session_id)
         return response
 
     @blue_print.route('/products/{product_id}/also_availables', cors=True)
@@ -107,7 +144,8 @@ def register_products(blue_print):
         request = __get_request()
         product = Product()
         item = product.get_also_availables(
-            product_id, tier=request.current_user.profile.tier)
+            product_id, tier=request.current_user.profile.tier,
+            session_id=request.session_id)
         return item
 
     @blue_print.route('/products/{product_id}/recently_views', cors=True)
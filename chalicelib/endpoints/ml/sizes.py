@@ -1,3 +1,5 @@
+from chalice import BadRequestError
+from chalicelib.extensions import ArgumentValueException
 from chalicelib.libs.core.chalice import MPCRequest
 from ...libs.models.ml.scored_products import ScoredProduct
 
@@ -40,9 +42,20 @@ def register_sizes(blue_print):
             else:
                 product_size_name = candidates[0]
 
-        products = product_model.get_by_size(
-            product_size_name, product_type=product_type_name, gender=request.gender,
-            page=request.page, size=request.size)
+        try:
+            products = product_model.get_by_size(
+                product_size_name, product_type=product_type_name, gender=request.gender,
+                page=request.page, size=request.size, cursor=request.cursor)
+        except ArgumentValueException as e:
+            raise BadRequestError(str(e))
+
+        if request.cursor is not None:
+            return {
+                'product_type': product_type_name,
+                'product_size': product_size_name,
+                'products': products['products'],
+                'cursor': products['cursor'],
+            }
 
         return {
             'product_type': product_type_name,
@@ -1,7 +1,9 @@
 import math
 from typing import Optional
 from chalice import Blueprint, BadRequestError
+from chalicelib.extensions import ArgumentValueException
 from chalicelib.libs.core.chalice.request import MPCRequest
+from chalicelib.libs.core.response_cache import AnonymousResponseCache
 from chalicelib.libs.models.mpc.Product import Product, ProductSearchCriteria
 from chalicelib.libs.models.ml.scored_products import ScoredProduct
 from chalicelib.libs.purchase.core import SimpleSku, Qty, Dtd
@@ -47,30 +49,48 @@ def list_products_by_filter():
     search_criteria = __create_search_criteria(request.query_params, current_user.is_personalized)
     user_id = current_user.user_id
 
-    if current_user.is_personalized:
-        response = scored_product.listByCustomFilter(
-            customer_id=user_id,
-            custom_filters=request.json_body,
-            sorts={
-                search_criteria.sort_column: search_criteria.sort_direction
-            },
-            page=search_criteria.page_number,
-            size=search_criteria.page_size,
-            tier=current_user.profile.tier,
-        )
-    else:
-        if not current_user.is_anyonimous:
-            current_user.send_calculate_product_score_for_customers([current_user.email])
-
-        response = product.listByCustomFilter(
-            request.json_body,
-            sorts={
-                search_criteria.sort_column: search_criteria.sort_direction
-            },
-            page=search_criteria.page_number,
-            size=search_criteria.page_size,
-            tier=current_user.profile.tier,
-        )
+    try:
+        if current_user.is_personalized:
+            response = scored_product.listByCustomFilter(
+                customer_id=user_id,
+                custom_filters=request.json_body,
+                sorts={
+                    search_criteria.sort_column: search_criteria.sort_direction
+                },
+                page=search_criteria.page_number,
+                size=search_criteria.page_size,
+                tier=current_user.profile.tier,
+                cursor=request.cursor,
+            )
+        else:
+            if not current_user.is_anyonimous:
+                current_user.send_calculate_product_score_for_customers([current_user.email])
+
+            def __list():
+                return product.listByCustomFilter(
+                    request.json_body,
+                    sorts={
+                        search_criteria.sort_column: search_criteria.sort_direction
+                    },
+                    page=search_criteria.page_number,
+                    size=search_criteria.page_size,
+                    tier=current_user.profile.tier,
+                    cursor=request.cursor,
+                )
+
+            if current_user.is_anyonimous:
+                response = AnonymousResponseCache('list-products-by-filter').respond(request, {
+                    'filters': request.json_body,
+                    'sort': {search_criteria.sort_column: search_criteria.sort_direction},
+                    'page': search_criteria.page_number,
+                    'size': search_criteria.page_size,
+                    'cursor': request.cursor,
+                }, __list)
+            else:
+                response = __list()
+    except ArgumentValueException as e:
+        # incorrect cursor
+        raise BadRequestError(str(e))
 
     return response
 
@@ -154,8 +174,11 @@ def available_filter():
     sort = 'asc'
     if request.query_params is not None and request.query_params.get('sort') is not None:
         sort = request.query_params.get('sort')
-    response = product.getAvailableFilter(request.json_body, sort)
-    return response
+    # filters do not depend on the customer
+    return AnonymousResponseCache('available-filter').respond(request, {
+        'filters': request.json_body,
+        'sort': sort,
+    }, lambda: product.getAvailableFilter(request.json_body, sort))
 
 
 @products_blueprint.route('/new-available-filter', methods=['POST'], cors=True)
@@ -165,8 +188,11 @@ def available_filter():
     sort = 'asc'
     if request.query_params is not None and request.query_params.get('sort') is not None:
         sort = request.query_params.get('sort')
-    response = product.getNewAvailableFilter(request.json_body, sort)
-    return response
+    # filters do not depend on the customer
+    return AnonymousResponseCache('new-available-filter').respond(request, {
+        'filters': request.json_body,
+        'sort': sort,
+    }, lambda: product.getNewAvailableFilter(request.json_body, sort))
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -47,8 +47,14 @@ def register_cart(blueprint: Blueprint) -> None:
 
             products = MpcProduct()
             items_data = []
+            # all products are loaded by one request
+            products_map = {}
+            for product in products.getRawDataBySimpleSkus([cart_item.simple_sku.value for cart_item in cart_items]):
+                for product_size in product.get('sizes', []):
+                    products_map[product_size.get('simple_sku')] = product
+
             for cart_item in cart_items:
-                product = products.getRawDataBySimpleSku(cart_item.simple_sku.value)
+                product = products_map.get(cart_item.simple_sku.value)
                 product_sizes = product.get('sizes', []) if product else ()
                 size = tuple(filter(lambda s: s.get('simple_sku') == cart_item.simple_sku.value, product_sizes))[0]
                 dtd = dtd_calculator.calculate(cart_item.simple_sku, cart_item.qty)
@@ -30,8 +30,15 @@ def register_checkout(blueprint: Blueprint):
         tier = blueprint.current_request.current_user.profile.tier
 
         checkout_items_data = []
+        # all products are loaded by one request
+        products_map = {}
+        simple_skus = [checkout_item.simple_sku.value for checkout_item in checkout.checkout_items]
+        for product in products.getRawDataBySimpleSkus(simple_skus):
+            for product_size in product.get('sizes', []):
+                products_map[product_size.get('simple_sku')] = product
+
         for checkout_item in checkout.checkout_items:
-            product = products.getRawDataBySimpleSku(checkout_item.simple_sku.value)
+            product = products_map.get(checkout_item.simple_sku.value)
             product_sizes = product.get('sizes', []) if product else tuple()
             size = tuple(filter(lambda s: s.get('simple_sku') == checkout_item.simple_sku.value, product_sizes))[0]
             dtd = dtd_calculator.calculate(checkout_item.simple_sku, checkout_item.qty)
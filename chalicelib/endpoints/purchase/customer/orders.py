@@ -19,18 +19,10 @@ def register_customer_orders(blueprint: Blueprint) -> None:
 
         tier = blueprint.current_request.current_user.profile.tier
 
-        products_map = {}
-        for order in orders:
-            for item in order.items:
-                products_map[item.simple_sku.value] = None
-
-        _existed_products = products.getRawDataBySimpleSkus(tuple(products_map.keys()))
-        for _simple_sku in tuple(products_map.keys()):
-            for _existed_product in _existed_products:
-                if _simple_sku in [size['simple_sku'] for size in _existed_product['sizes']]:
-                    products_map[_simple_sku] = _existed_product
-                    break
-            else:
+        simple_skus = [item.simple_sku.value for order in orders for item in order.items]
+        products_index = products.getSimpleSkusIndex(simple_skus)
+        for _simple_sku in simple_skus:
+            if _simple_sku not in products_index:
                 raise ValueError('{} - Unable to find Product "{}" for Customer\'s #{} orders'.format(
                     __orders_response.__qualname__,
                     _simple_sku,
@@ -43,9 +35,7 @@ def register_customer_orders(blueprint: Blueprint) -> None:
 
             order_items = []
             for order_item in order.items:
-                product = products_map[order_item.simple_sku.value]
-                product_sizes = product.get('sizes', []) if product else tuple()
-                size = tuple(filter(lambda s: s.get('simple_sku') == order_item.simple_sku.value, product_sizes))[0]
+                product, size = products_index[order_item.simple_sku.value]
 
                 item_fbucks = None
                 if not tier['is_neutral'] and not blueprint.current_request.current_user.is_anyonimous:
@@ -2,6 +2,7 @@ import os
 import uuid
 import hashlib
 import datetime
+from typing import Tuple
 from chalice import \
     Blueprint,\
     UnauthorizedError,\
@@ -14,7 +15,7 @@ from chalicelib.libs.core.file_storage import FileStorageImplementation
 from chalicelib.libs.core.sqs_sender import SqsSenderImplementation
 from chalicelib.libs.core.logger import Logger
 from chalicelib.libs.models.mpc.user import User
-from chalicelib.libs.purchase.core import Id, OrderNumber, SimpleSku, Cost, Qty, ReturnRequest
+from chalicelib.libs.purchase.core import Id, OrderNumber, SimpleSku, Cost, Qty, ReturnRequest, Order
 from chalicelib.libs.purchase.returns.storage import ReturnRequestStorageImplementation
 from chalicelib.libs.purchase.order.storage import OrderStorageImplementation
 from chalicelib.libs.purchase.product.storage import ProductStorageImplementation
@@ -124,15 +125,23 @@ def register_customer_returns(blueprint: Blueprint):
             }
         }
 
-        orders_map = {}
-        products_map = {}
-        for return_item in return_request.items:
-            product = products_map.get(return_item.simple_sku.value) or products_storage.load(return_item.simple_sku)
-            products_map[return_item.simple_sku.value] = product
-
-            order = orders_map.get(return_item.order_number.value) or orders_storage.load(return_item.order_number)
-            orders_map[return_item.order_number.value] = order
+        # preload all products and orders
+        products_map = {
+            product.simple_sku.value: product
+            for product in products_storage.get_all_by_simple_skus(tuple([
+                return_item.simple_sku for return_item in return_request.items
+            ]))
+        }
+        orders_map = {
+            order.number.value: order
+            for order in orders_storage.get_all_by_numbers(tuple([
+                return_item.order_number for return_item in return_request.items
+            ]))
+        }
 
+        for return_item in return_request.items:
+            product = products_map[return_item.simple_sku.value]
+            order = orders_map[return_item.order_number.value]
             response['items'].append({
                 'order_number': return_item.order_number.value,
                 'simple_sku': return_item.simple_sku.value,
@@ -154,12 +163,23 @@ def register_customer_returns(blueprint: Blueprint):
     #                                                       CREATE
     # ------------------------------------------------------------------------------------------------------------------
 
-    def __get_initial_data():
+    def __get_returnable_orders() -> Tuple[Order]:
         orders_storage = OrderStorageImplementation()
+        orders = orders_storage.get_all_for_customer(Id(__get_user().id))
+        return tuple([order for order in orders if order.is_returnable])
+
+    def __get_initial_data(returnable_orders: Tuple[Order]):
         products_storage = ProductStorageImplementation()
 
         orders = []
-        products_map = {}
+
+        # preload all products
+        products_map = {
+            product.simple_sku.value: product
+            for product in products_storage.get_all_by_simple_skus(tuple([
+                item.simple_sku for order in returnable_orders for item in order.items
+            ]))
+        }
 
         # "...credit-card should be allowed only when one of selected orders was paid by credit card,
         # but eft and credits should be available for all return-requests..."
@@ -197,15 +217,10 @@ def register_customer_returns(blueprint: Blueprint):
             ]]
         }
 
-        for order in orders_storage.get_all_for_customer(Id(__get_user().id)):
-            if not order.is_returnable:
-                continue
-
+        for order in returnable_orders:
             items = []
             for item in order.items:
-                product = products_map.get(item.simple_sku.value) or products_storage.load(item.simple_sku)
-                products_map[item.simple_sku.value] = product
-
+                product = products_map[item.simple_sku.value]
                 items.append({
                     'simple_sku': item.simple_sku.value,
                     'product_name': product.name.value,
@@ -251,7 +266,7 @@ def register_customer_returns(blueprint: Blueprint):
 
     @blueprint.route('/customer/returns/create/get_initial_data', methods=['GET'], cors=True)
     def returns_create_list_orders():
-        return __get_initial_data()
+        return __get_initial_data(__get_returnable_orders())
 
     @blueprint.route(
         '/customer/returns/create/upload_file',
@@ -381,7 +396,8 @@ def register_customer_returns(blueprint: Blueprint):
             raise BadRequestError('Incorrect Input Data! Parameter "refund_method" is incorrect!')
 
         # collect control data
-        initial_data = __get_initial_data()
+        returnable_orders = __get_returnable_orders()
+        initial_data = __get_initial_data(returnable_orders)
         control_data = {
             'reasons': [reason['key'] for reason in initial_data['reasons']],
             'delivery_methods': [_delivery_method['key'] for _delivery_method in initial_data['delivery_methods']],
@@ -395,6 +411,14 @@ def register_customer_returns(blueprint: Blueprint):
                 control_data['orders'][order_number] = control_data['orders'].get(order_number) or {}
                 control_data['orders'][order_number][simple_sku] = qty
 
+        # preload all attached files
+        files_map = {
+            file.key: file
+            for file in file_storage.get_all(tuple([
+                file_id for item in input_items for file_id in item['file_ids'] if file_id.strip()
+            ]))
+        }
+
         # validate input data
         if (
             # items
@@ -403,7 +427,7 @@ def register_customer_returns(blueprint: Blueprint):
                 or item['simple_sku'] not in control_data['orders'][item['order_number']].keys()
                 or item['qty'] not in range(1, control_data['orders'][item['order_number']][item['simple_sku']] + 1)
                 or item['reason'] not in control_data['reasons']
-                or sum([not file_id.strip() or not file_storage.get(file_id) for file_id in item['file_ids']]) > 0
+                or sum([not file_id.strip() or file_id not in files_map for file_id in item['file_ids']]) > 0
                 or (item['additional_comment'] is not None and len(item['additional_comment']) > 255)
                 for item in input_items
             ]) > 0
@@ -488,7 +512,7 @@ def register_customer_returns(blueprint: Blueprint):
             reason = ReturnRequest.Item.Reason(item['reason'])
 
             attached_files = tuple([
-                ReturnRequest.Item.AttachedFile(file_storage.get(file_id).url)
+                ReturnRequest.Item.AttachedFile(files_map[file_id].url)
                 for file_id in item['file_ids']
             ])
 
@@ -537,9 +561,11 @@ def register_customer_returns(blueprint: Blueprint):
         # 3. Modify orders qty
         # -------------------------------
 
+        # orders are already loaded for control data
+        returnable_orders_map = {order.number.value: order for order in returnable_orders}
         modified_orders = {}
         for return_item in return_request.items:
-            order = modified_orders.get(return_item.order_number.value) or orders_storage.load(return_item.order_number)
+            order = returnable_orders_map[return_item.order_number.value]
             order.request_return(return_item.simple_sku, return_item.qty)
             modified_orders[order.number.value] = order
 
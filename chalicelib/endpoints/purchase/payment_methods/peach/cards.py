@@ -8,9 +8,10 @@ from typing import Tuple, List, Optional
 from chalice import Blueprint, BadRequestError, NotFoundError, UnprocessableEntityError
 from chalicelib.extensions import *
 from chalicelib.settings import settings
+from chalicelib.libs.core.http_client import HttpClient
 from chalicelib.libs.core.logger import Logger
 from chalicelib.libs.models.mpc.user import User
-from chalicelib.libs.purchase.core import Id, Order
+from chalicelib.libs.purchase.core import Id
 from chalicelib.libs.purchase.payment_methods.peach.cards import CreditCard, CreditCardsStorageImplementation
 from chalicelib.libs.purchase.checkout.storage import CheckoutStorageImplementation
 from chalicelib.libs.purchase.order.service import OrderAppService
@@ -232,7 +233,7 @@ def register_payment_methods_peach_cards(blueprint: Blueprint) -> None:
 
             try:
                 __log_flow('Initial Payment...')
-                response = requests.post(
+                response = HttpClient('peach').post(
                     url=settings.PEACH_PAYMENT_BASE_URL + 'payments',
                     data=(lambda data: data.update(
                         {'card.holder': form.holder_name} if form.holder_name else {}
@@ -341,7 +342,7 @@ def register_payment_methods_peach_cards(blueprint: Blueprint) -> None:
                 __log_flow('Removed from storage!')
 
                 __log_flow('Removing from Peach...')
-                response = requests.delete(
+                response = HttpClient('peach').delete(
                     url=settings.PEACH_PAYMENT_BASE_URL + 'registrations/{}?entityId={}'.format(
                         card.token,
                         settings.PEACH_PAYMENT_ENTITY_ID
@@ -426,7 +427,7 @@ def register_payment_methods_peach_cards(blueprint: Blueprint) -> None:
             # init
             try:
                 __log_flow('Payment Request...')
-                response = requests.post(
+                response = HttpClient('peach').post(
                     url=settings.PEACH_PAYMENT_BASE_URL + 'registrations/{}/payments'.format(card.token),
                     data={
                         'entityId': settings.PEACH_PAYMENT_ENTITY_ID,
@@ -516,11 +517,7 @@ def register_payment_methods_peach_cards(blueprint: Blueprint) -> None:
         try:
             user = __get_user()
 
-            last_order: Optional[Order] = None
-            orders = order_storage.get_all_for_customer(Id(user.id))
-            for order in orders:
-                if not last_order or order.created_at > last_order.created_at:
-                    last_order = order
+            last_order = order_storage.get_last_for_customer(Id(user.id))
 
             if not last_order:
                 raise UnprocessableEntityError('No orders - something wrong!')
@@ -4,8 +4,9 @@ from typing import Optional, List
 from chalice import Blueprint, UnprocessableEntityError, UnauthorizedError
 from chalicelib.extensions import *
 from chalicelib.settings import settings
+from chalicelib.libs.core.http_client import HttpClient
 from chalicelib.libs.core.logger import Logger
-from chalicelib.libs.purchase.core import Id, Order
+from chalicelib.libs.purchase.core import Id
 from chalicelib.libs.purchase.order.storage import OrderStorageImplementation
 from chalicelib.libs.purchase.order.service import OrderAppService
 from chalicelib.libs.purchase.cart.service import CartAppService
@@ -101,7 +102,7 @@ def register_payment_methods_peach_mobicred(blueprint: Blueprint) -> None:
             # init mobicred
             try:
                 __log_flow('Payment Initializing...')
-                response = requests.post(
+                response = HttpClient('peach').post(
                     url=settings.PEACH_PAYMENT_BASE_URL + 'payments​',
                     data={
                         'entityId': settings.PEACH_PAYMENT_ENTITY_ID,
@@ -197,11 +198,7 @@ def register_payment_methods_peach_mobicred(blueprint: Blueprint) -> None:
 
         order_storage = OrderStorageImplementation()
 
-        last_order: Optional[Order] = None
-        orders = order_storage.get_all_for_customer(Id(user.id))
-        for order in orders:
-            if not last_order or order.created_at > last_order.created_at:
-                last_order = order
+        last_order = order_storage.get_last_for_customer(Id(user.id))
 
         if not last_order:
             raise UnprocessableEntityError('No orders - something wrong!')
@@ -1,13 +1,16 @@
 import uuid
 import hashlib
 import datetime
-from chalice import Blueprint, ChaliceViewError, UnprocessableEntityError
+from chalice import Blueprint, ChaliceViewError, UnprocessableEntityError, ConflictError
 from chalicelib.settings import settings
 from chalicelib.libs.core.elastic import Elastic
 from chalicelib.libs.core.sqs_sender import SqsSenderImplementation
-from chalicelib.libs.purchase.payment_methods.peach.webhooks import WebhooksFlowLog, WebhooksDecryptor
+from chalicelib.libs.purchase.payment_methods.peach.webhooks import \
+    WebhooksFlowLog, \
+    WebhooksDecryptor, \
+    WebhooksNotificationsRegistry
 from chalicelib.libs.purchase.payment_methods.peach.payments import MobicredPaymentMethod, CreditCardOrderPaymentMethod
-from chalicelib.libs.purchase.core import Order
+from chalicelib.libs.purchase.core import Order, OrderVersionConflictException
 from chalicelib.libs.purchase.order.storage import OrderStorageImplementation
 from chalicelib.libs.purchase.order.sqs import OrderChangeSqsSenderEvent
 from chalicelib.libs.purchase.payment_methods.peach.cards import CreditCardsStorageImplementation
@@ -19,6 +22,9 @@ def register_payment_methods_peach_weebhoks(blueprint: Blueprint) -> None:
         '000.100.110',  # Transaction successfully processed in TEST system
     ]
 
+    # order can be changed by another process (e.g. the same payment notification of another type)
+    __ORDER_UPDATE_ATTEMPTS = 3
+
     # ------------------------------------------------------------------------------------------------------------------
     #                                                   ENDPOINT
     # ------------------------------------------------------------------------------------------------------------------
@@ -63,7 +69,25 @@ def register_payment_methods_peach_weebhoks(blueprint: Blueprint) -> None:
                     'Webhooks handler does not know, how to work with "{}" webhooks type'.format(data['type'])
                 )
 
-            handlers_map[data['type']](data, webhooks_flow_log)
+            # duplicates and retries are not processed again
+            notifications_registry = WebhooksNotificationsRegistry()
+            notification_id = notifications_registry.get_notification_id(data)
+            webhooks_flow_log.write('Notification: {}'.format(notification_id))
+            if not notifications_registry.lock(notification_id):
+                if notifications_registry.get_status(notification_id) == WebhooksNotificationsRegistry.STATUS_DONE:
+                    webhooks_flow_log.write('End - OK - Already processed')
+                    return 'OK'
+
+                # peach will retry it later, when the current processing is finished or failed
+                raise ConflictError('Notification is being processed right now!')
+
+            try:
+                handlers_map[data['type']](data, webhooks_flow_log)
+            except BaseException as e:
+                notifications_registry.release(notification_id)
+                raise e
+
+            notifications_registry.complete(notification_id)
 
             webhooks_flow_log.write('End - OK')
         except ChaliceViewError as e:
@@ -112,6 +136,11 @@ def register_payment_methods_peach_weebhoks(blueprint: Blueprint) -> None:
             webhooks_flow_log.write('Skipped because of not good result - {}!'.format(payload['result']))
             return
 
+        # another notification of the same payment has been already processed
+        if order.was_paid:
+            webhooks_flow_log.write('Skipped because Order #{} is already paid!'.format(order_number.value))
+            return
+
         # Attention!
         # @TODO : SHOULD BE SPENT, WHEN ORDER IS CREATED !!!
         # Currently we use f-bucks only! Other credits are not available for now!
@@ -147,10 +176,23 @@ def register_payment_methods_peach_weebhoks(blueprint: Blueprint) -> None:
 
         # update order
         webhooks_flow_log.write('Updating Order...')
-        order.payment_method = order_payment_method
-        order.status = Order.Status(Order.Status.PAYMENT_SENT)
-        order.status = Order.Status(Order.Status.PAYMENT_RECEIVED)
-        order_storage.save(order)
+        for attempt in range(1, __ORDER_UPDATE_ATTEMPTS + 1):
+            order.payment_method = order_payment_method
+            order.status = Order.Status(Order.Status.PAYMENT_SENT)
+            order.status = Order.Status(Order.Status.PAYMENT_RECEIVED)
+            try:
+                order_storage.save(order)
+                break
+            except OrderVersionConflictException as e:
+                webhooks_flow_log.write('Order was changed by another process: {}'.format(str(e)))
+                if attempt == __ORDER_UPDATE_ATTEMPTS:
+                    raise e
+
+                # credits are already spent, so only order changes are applied to the actual order
+                order = order_storage.load(order_number)
+                if order.was_paid:
+                    webhooks_flow_log.write('Skipped because Order #{} is already paid!'.format(order_number.value))
+                    return
         webhooks_flow_log.write('Done')
 
         # send sqs
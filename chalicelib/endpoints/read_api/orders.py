@@ -1,14 +1,19 @@
+import json
 import datetime
+from typing import Tuple, Dict
 from chalicelib.extensions import *
-from chalice import Blueprint
+from chalice import Blueprint, Response
 from chalicelib.settings import Config
-from chalicelib.libs.purchase.core import Order, CustomerInterface
+from chalicelib.libs.purchase.core import Order
 from chalicelib.libs.purchase.order.storage import OrderStorageImplementation
-from chalicelib.libs.purchase.customer.storage import CustomerStorageImplementation
+from chalicelib.libs.models.mpc.Cms.Informations import InformationModel, Information
 from chalicelib.libs.models.mpc.Product import Product as MpcProducts
 
 
 def register_orders(blueprint: Blueprint) -> None:
+    __EXPORT_PAGE_SIZE = 100
+    __EXPORT_PAGE_SIZE_MAX = 500
+
     def __to_utc(local_datetime: datetime.datetime) -> datetime.datetime:
         return local_datetime.astimezone(tz=datetime.timezone.utc)
 
@@ -22,17 +27,35 @@ def register_orders(blueprint: Blueprint) -> None:
 
     # ------------------------------------------------------------------------------------------------------------------
 
-    def _order_info(order: Order) -> dict:
-        customer_storage = CustomerStorageImplementation()
-        mpc_products = MpcProducts()
+    def __get_sizes_index(orders: Tuple[Order]) -> Dict[str, dict]:
+        """ simple_sku => product size data, loaded by one catalogue query for all orders """
+        simple_skus = set([order_item.simple_sku.value for order in orders for order_item in order.items])
+        if not simple_skus:
+            return {}
+
+        products = MpcProducts().getRawDataBySimpleSkus(list(simple_skus), False)
+        return {
+            size['rs_simple_sku']: size
+            for product in products for size in product.get('sizes', [])
+            if size.get('rs_simple_sku') in simple_skus
+        }
+
+    def __get_customers_informations(orders: Tuple[Order]) -> Dict[str, Information]:
+        """ customer_id => information, loaded by one batch request for all orders """
+        customer_ids = tuple(set([order.customer_id.value for order in orders]))
+        informations = InformationModel.get_informations(customer_ids) if customer_ids else {}
+        for customer_id, information in informations.items():
+            if not information.email:
+                raise ValueError('User information is incorrect - {}'.format(information.to_dict()))
 
-        customer = customer_storage.get_by_id(order.customer_id)
+        return informations
+
+    def _order_info(order: Order, customer_information: Information, sizes_index: Dict[str, dict]) -> dict:
         delivery_address = order.delivery_address
 
         order_items_data = []
         for order_item in order.items:
-            product = mpc_products.getRawDataBySimpleSku(order_item.simple_sku.value, False)
-            size = tuple(filter(lambda s: s['rs_simple_sku'] == order_item.simple_sku.value, product['sizes']))[0]
+            size = sizes_index[order_item.simple_sku.value]
 
             simple_id = int(size['portal_simple_id'])
 
@@ -94,19 +117,14 @@ def register_orders(blueprint: Blueprint) -> None:
                 'in_time_for_status': 0,
             })
 
-        if customer.name:
-            customer_first_name = customer.name.first_name.value
-            customer_last_name = customer.name.last_name.value
+        if customer_information.first_name and customer_information.last_name:
+            customer_first_name = customer_information.first_name
+            customer_last_name = customer_information.last_name
         else:
             customer_name_str = delivery_address.recipient_name
             customer_first_name = customer_name_str.split(' ')[0]
             customer_last_name = customer_name_str.replace(customer_first_name, '', 1).strip()
 
-        customer_genders_map = {
-            CustomerInterface.Gender.MALE: 'male',
-            CustomerInterface.Gender.FEMALE: 'female',
-        }
-
         data = {
             'increment_id': order.number.value,
             'status': order.status.value,
@@ -152,8 +170,8 @@ def register_orders(blueprint: Blueprint) -> None:
 
             'customer_firstname': customer_first_name,
             'customer_lastname': customer_last_name,
-            'customer_email': customer.email.value,
-            'customer_gender': customer_genders_map.get(customer.gender.descriptor, None) if customer.gender else None,
+            'customer_email': customer_information.email,
+            'customer_gender': customer_information.gender if customer_information.gender in ('male', 'female') else None,
             'ip_address': None,  # @TODO : add IP address. Not sure, that it should be inside Order. Create Elastic?
 
             'addresses': [{
@@ -201,10 +219,67 @@ def register_orders(blueprint: Blueprint) -> None:
                 raise HttpNotFoundException('Order does not exist!')
 
             return {
-                'order': _order_info(order)
+                'order': _order_info(
+                    order,
+                    __get_customers_informations((order,))[order.customer_id.value],
+                    __get_sizes_index((order,))
+                )
             }
         except BaseException as e:
             return http_response_exception_or_throw(e)
 
+    # ------------------------------------------------------------------------------------------------------------------
+    #                                               ORDERS EXPORT
+    # ------------------------------------------------------------------------------------------------------------------
+
+    @blueprint.route('/orders/export', methods=['POST'], cors=True)
+    def export():
+        """
+        Returns one page of orders, created in the dates range, as JSON lines (one order info per line).
+        Next page is requested with "continuation_token" from "X-Continuation-Token" response header,
+        the header is empty for the last page.
+        """
+        try:
+            __check_header_or_error()
+
+            request_data = blueprint.current_request.json_body or {}
+            try:
+                date_from = datetime.datetime.strptime(request_data.get('date_from') or '', '%Y-%m-%d').date()
+                date_to = datetime.datetime.strptime(request_data.get('date_to') or '', '%Y-%m-%d').date()
+                limit = int(request_data.get('limit') or __EXPORT_PAGE_SIZE)
+            except ValueError:
+                raise HttpIncorrectInputDataException('date_from, date_to (Y-m-d) and limit are incorrect!')
+
+            if date_to < date_from or not 0 < limit <= __EXPORT_PAGE_SIZE_MAX:
+                raise HttpIncorrectInputDataException('Dates range or limit is incorrect!')
+
+            order_storage = OrderStorageImplementation()
+            try:
+                orders, continuation_token = order_storage.get_page_by_dates(
+                    date_from,
+                    date_to,
+                    limit,
+                    request_data.get('continuation_token') or None
+                )
+            except ArgumentValueException as e:
+                raise HttpIncorrectInputDataException(str(e))
+
+            informations = __get_customers_informations(orders)
+            sizes_index = __get_sizes_index(orders)
+
+            return Response(
+                body=''.join([
+                    json.dumps(_order_info(order, informations[order.customer_id.value], sizes_index)) + '\n'
+                    for order in orders
+                ]),
+                headers={
+                    'Content-Type': 'application/x-ndjson',
+                    'X-Continuation-Token': continuation_token or '',
+                },
+                status_code=200
+            )
+        except BaseException as e:
+            return http_response_exception_or_throw(e)
+
 
 
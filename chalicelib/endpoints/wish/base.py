@@ -16,11 +16,8 @@ def __response_wish(user_id) -> dict:
     wish_storage = WishStorageImplementation()
 
     def __return(wish_items):
-        products = Product()
-        items_data = []
-        for wish_item in wish_items:
-            product = products.get_raw_data(wish_item, True)
-            items_data.append(product)
+        # all products are loaded by one request
+        items_data = Product().get_raw_data_by_skus(wish_items, True)
 
         return {
             'items': items_data,
@@ -144,11 +144,21 @@ def clone(o):
 
     # custom objects
     o_clone = object.__new__(o.__class__)
-    for property_name in tuple(o.__dict__.keys()):
+    for property_name in tuple(getattr(o, '__dict__', {}).keys()):
         property_value = o.__dict__.get(property_name)
         cloned_property_value = clone(property_value)
         setattr(o_clone, property_name, cloned_property_value)
 
+    # custom objects with __slots__ (e.g. value objects)
+    for cls in o.__class__.__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        for slot_name in ((slots,) if isinstance(slots, str) else slots):
+            if slot_name.startswith('__') and not slot_name.endswith('__'):
+                slot_name = '_' + cls.__name__.lstrip('_') + slot_name
+
+            if slot_name not in ('__dict__', '__weakref__') and hasattr(o, slot_name):
+                setattr(o_clone, slot_name, clone(getattr(o, slot_name)))
+
     return o_clone
 
 
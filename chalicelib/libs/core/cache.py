@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Any
+from chalicelib.extensions import *
+
+
+class TtlCache(object):
+    """
+    In-memory cache of the lambda container, so it is shared by invocations of the same container only.
+    Values are kept not longer than ttl seconds, the least recently used values are dropped, when max_size is reached.
+    Attention! Cached values are returned as is - do not modify them.
+    """
+
+    __MISSED = object()
+
+    def __init__(self, ttl: int, max_size: int = 1000):
+        if not isinstance(ttl, int):
+            raise ArgumentTypeException(self.__init__, 'ttl', ttl)
+        elif ttl < 0:
+            raise ArgumentValueException('{} ttl cannot be negative!'.format(self.__init__.__qualname__))
+
+        if not isinstance(max_size, int):
+            raise ArgumentTypeException(self.__init__, 'max_size', max_size)
+        elif max_size <= 0:
+            raise ArgumentValueException('{} max_size must be positive!'.format(self.__init__.__qualname__))
+
+        self.__ttl = ttl
+        self.__max_size = max_size
+        self.__items: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self.__items.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.__items[key]
+            return default
+
+        # the least recently used values are dropped first
+        self.__items.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.__ttl == 0:
+            return
+
+        self.__items.pop(key, None)
+        self.__items[key] = (time.monotonic() + self.__ttl, value)
+        while len(self.__items) > self.__max_size:
+            self.__items.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, self.__class__.__MISSED)
+        if value is self.__class__.__MISSED:
+            value = factory()
+            self.set(key, value)
+
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        self.__items.pop(key, None)
+
+    def clear(self) -> None:
+        self.__items.clear()
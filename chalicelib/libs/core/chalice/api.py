@@ -3,6 +3,7 @@ from chalice.app import (
     Response)
 from .request import MPCRequest
 from .route import MPCRouteEntry
+from chalicelib.libs.core.logger import Logger
 
 
 def error_response(message, error_code, http_status_code, headers=None):
@@ -53,6 +54,13 @@ class MPCApi(Chalice):
             self.routes[path][method] = entry
 
     def __call__(self, event, context):
+        try:
+            return self.__handle_request(event, context)
+        finally:
+            # buffered log records of the request are written at once
+            Logger.flush()
+
+    def __handle_request(self, event, context):
         # This is what's invoked via lambda.
         # Sometimes the event can be something that's not
         # what we specified in our request_template mapping.
@@ -1,3 +1,4 @@
+from typing import Optional
 from chalice.app import Request
 from ...models.mpc.user import User
 
@@ -69,6 +70,14 @@ class MPCRequest(Request):
         else:
             return int(self.query_params['size'])
 
+    @property
+    def cursor(self) -> Optional[str]:
+        """ search_after pagination token: None - page mode, empty string - the first page of cursor mode """
+        if self.query_params is None or 'cursor' not in self.query_params:
+            return None
+        else:
+            return self.query_params.get('cursor') or ''
+
     @property
     def gender(self):
         gender = 'UNISEX'
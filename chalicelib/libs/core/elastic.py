@@ -1,13 +1,54 @@
+import json
+import base64
 import requests
-from typing import Optional
+from typing import Optional, Tuple, Dict
 from elasticsearch import Elasticsearch, RequestsHttpConnection
 from chalicelib.settings import settings
+from chalicelib.extensions import ArgumentValueException
 
 
 class ElasticRequestException(Exception):
     pass
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+#                                           SEARCH AFTER PAGINATION
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def apply_search_after(query: dict, cursor: Optional[str], tiebreaker: dict) -> dict:
+    """
+    Turns "from/size" query into "search_after" query.
+    :param cursor: token returned by get_search_after_cursor() for the previous page, empty for the first page
+    :param tiebreaker: sort by unique field, e.g. {'rs_sku': {'order': 'asc'}}
+    """
+    query = dict(query)
+    query.pop('from', None)
+    query['sort'] = list(query.get('sort') or ['_score']) + [tiebreaker]
+
+    if cursor:
+        try:
+            search_after = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')).decode('utf-8'))
+        except (ValueError, TypeError):
+            raise ArgumentValueException('Cursor "{}" is incorrect!'.format(cursor))
+
+        if not isinstance(search_after, list) or len(search_after) != len(query['sort']):
+            raise ArgumentValueException('Cursor "{}" is incorrect!'.format(cursor))
+
+        query['search_after'] = search_after
+
+    return query
+
+
+def get_search_after_cursor(hits: dict, size: int) -> Optional[str]:
+    """ token of the next page for search_after query, None - if there are no more pages """
+    rows = hits.get('hits') or []
+    if len(rows) < size or not rows[-1].get('sort'):
+        return None
+
+    return base64.urlsafe_b64encode(json.dumps(rows[-1]['sort']).encode('utf-8')).decode('utf-8')
+
+
 # @todo : refactoring AlreadyExist, NotExisted, IndexDoesNotExist, ... exceptions
 
 
@@ -127,17 +168,60 @@ class Elastic:
             raise ElasticRequestException('Elastic search error: {}'.format(response))
         return response
 
-    def update_data(self, document_id, params: dict):
+    def update_data(self, document_id, params: dict, refresh: Optional[str] = None):
+        """ :param refresh: 'wait_for' - return, when the change is visible for search """
         headers = {"Content-Type": "application/json"}
         response = requests.post(
             self.__index_url + "/" + document_id + "/_update",
             json=params,
+            params={'refresh': refresh} if refresh else None,
             headers=headers
         ).json()
         if response.get('error'):
             raise ElasticRequestException('Elastic search error: {}'.format(response))
         return response
 
+    def mget_data(self, document_ids: Tuple[str]) -> Dict[str, dict]:
+        """ Loads many documents by one request: document_id => source, not existed documents are skipped """
+        if not document_ids:
+            return {}
+
+        headers = {"Content-Type": "application/json"}
+        response = requests.post(
+            self.__index_url + "/_mget",
+            json={'ids': list(document_ids)},
+            headers=headers
+        ).json()
+        if response.get('error'):
+            raise ElasticRequestException('Elastic search error: {}'.format(response))
+
+        return dict([(doc['_id'], doc['_source']) for doc in response.get('docs', []) if doc.get('found')])
+
+    def bulk_upsert(self, documents: Dict[str, dict]) -> dict:
+        """ Partially updates (or creates, if not exist) many documents by one request: document_id => data """
+        if not documents:
+            return {}
+
+        lines = []
+        for document_id, document_data in documents.items():
+            lines.append(json.dumps({'update': {
+                '_index': self.__index_name,
+                '_type': self.__doc_type,
+                '_id': document_id,
+            }}))
+            lines.append(json.dumps({'doc': document_data, 'doc_as_upsert': True}))
+
+        headers = {"Content-Type": "application/x-ndjson"}
+        response = requests.post(
+            self.__host + "/_bulk",
+            data='\n'.join(lines) + '\n',
+            headers=headers
+        ).json()
+        if response.get('error') or response.get('errors'):
+            raise ElasticRequestException('Elastic search error: {}'.format(response))
+
+        return response
+
     def update_by_query(self, params: dict):
         headers = {"Content-Type": "application/json"}
         response = requests.post(
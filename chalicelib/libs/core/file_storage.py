@@ -2,7 +2,8 @@ import os
 import shutil
 import re
 import boto3
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from chalicelib.extensions import *
 from chalicelib.settings import settings
 
@@ -44,6 +45,10 @@ class FileStorageInterface(object):
     def get(self, key: str) -> Optional[FileStorageFile]:
         raise NotImplementedError()
 
+    def get_all(self, keys: Tuple[str]) -> Tuple[FileStorageFile]:
+        """ the same as get() for many keys, not existed files are skipped """
+        raise NotImplementedError()
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -119,11 +124,17 @@ class _FileLocalStorage(FileStorageInterface):
         destination_url = self.__get_url(key)
         return FileStorageFile(key, destination_url)
 
+    def get_all(self, keys: Tuple[str]) -> Tuple[FileStorageFile]:
+        files = [self.get(key) for key in dict.fromkeys(keys)]
+        return tuple([file for file in files if file])
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
 
 class _AwsS3FileStorage(FileStorageInterface):
+    __GET_ALL_WORKERS = 10
+
     def __init__(self, bucket: str, root_url: str):
         if not isinstance(bucket, str):
             raise ArgumentTypeException(self.__init__, 'bucket', bucket)
@@ -180,6 +191,17 @@ class _AwsS3FileStorage(FileStorageInterface):
             self.__get_url(key)
         )
 
+    def get_all(self, keys: Tuple[str]) -> Tuple[FileStorageFile]:
+        # s3 does not have batch requests for objects, so keys are checked in parallel
+        keys = tuple(dict.fromkeys(keys))
+        if not keys:
+            return tuple()
+
+        with ThreadPoolExecutor(max_workers=min(self.__GET_ALL_WORKERS, len(keys))) as executor:
+            files = list(executor.map(self.get, keys))
+
+        return tuple([file for file in files if file])
+
     def __get_url(self, key) -> str:
         return self.__root_url + key
 
@@ -199,6 +221,9 @@ class FileStorageImplementation(FileStorageInterface):
     def get(self, key: str) -> Optional[FileStorageFile]:
         return self.__storage.get(key)
 
+    def get_all(self, keys: Tuple[str]) -> Tuple[FileStorageFile]:
+        return self.__storage.get_all(keys)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
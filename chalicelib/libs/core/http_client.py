@@ -0,0 +1,93 @@
+import time
+import requests
+from typing import Dict
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from chalicelib.extensions import *
+from chalicelib.settings import settings
+from chalicelib.libs.core.logger import Logger
+
+
+class HttpClient(object):
+    """
+    Outbound requests to partners (payments, auth, dtd, ...).
+    Sessions are shared by the container, so connections are kept alive in a pool per host.
+    Timeouts and retries are configured per integration by settings.HTTP_CLIENT_CONFIG,
+    latency of every request is logged by "chalicelib.libs.core.http_client" logger.
+    """
+
+    __DEFAULT_INTEGRATION = 'default'
+
+    # integration => session
+    __sessions: Dict[str, requests.Session] = {}
+
+    def __init__(self, integration: str):
+        if not isinstance(integration, str):
+            raise ArgumentTypeException(self.__init__, 'integration', integration)
+        elif not integration.strip():
+            raise ArgumentCannotBeEmptyException(self.__init__, 'integration')
+
+        self.__integration = integration
+        self.__config = {
+            **(settings.HTTP_CLIENT_CONFIG.get(self.__class__.__DEFAULT_INTEGRATION) or {}),
+            **(settings.HTTP_CLIENT_CONFIG.get(integration) or {}),
+        }
+        self.__logger = Logger(__name__)
+
+    def __get_session(self) -> requests.Session:
+        session = self.__class__.__sessions.get(self.__integration)
+        if not session:
+            # urllib3 retries only idempotent methods by default, errors of other requests are raised
+            adapter = HTTPAdapter(
+                pool_maxsize=int(self.__config.get('pool_maxsize', 10)),
+                max_retries=Retry(
+                    total=int(self.__config.get('retries', 0)),
+                    backoff_factor=float(self.__config.get('backoff_factor', 0)),
+                    status_forcelist=(502, 503, 504),
+                    raise_on_status=False
+                )
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.__class__.__sessions[self.__integration] = session
+
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', (
+            float(self.__config.get('connect_timeout', 3)),
+            float(self.__config.get('read_timeout', 10))
+        ))
+
+        # only host is logged - urls can contain tokens
+        host = urlparse(url).netloc
+        started_at = time.time()
+        try:
+            response = self.__get_session().request(method, url, **kwargs)
+        except requests.RequestException as e:
+            self.__logger.warning(
+                'HTTP {} {} {} : failed in {} ms : {}',
+                self.__integration, method.upper(), host, int((time.time() - started_at) * 1000), type(e).__name__
+            )
+            raise e
+
+        self.__logger.info(
+            'HTTP {} {} {} : {} in {} ms',
+            self.__integration, method.upper(), host, response.status_code, int((time.time() - started_at) * 1000)
+        )
+
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
@@ -1,5 +1,9 @@
+import json
+import random
+import logging
 import datetime
 import traceback
+from typing import Dict, List
 from chalicelib.extensions import *
 from chalicelib.settings import settings
 
@@ -8,28 +12,121 @@ class _LogWriterInterface(object):
     def write(self, message: str) -> None:
         raise NotImplementedError()
 
+    def flush(self) -> None:
+        pass
+
 
 class _PrintLogWriter(_LogWriterInterface):
     def write(self, message: str) -> None:
         print(message)
 
 
-class Logger(object):
-    def __init__(self):
-        # @todo : should be configurable, but hardcoded implementation is enough for now
-        self.__writer: _LogWriterInterface = _PrintLogWriter()
+class _BufferedLogWriter(_LogWriterInterface):
+    """ Collects records of the invocation and writes them at once on flush() """
 
-    def __log_message(self, message: str) -> None:
-        message = '[{}] : {}'.format(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), message)
+    def __init__(self, writer: _LogWriterInterface, buffer_size: int):
+        self.__writer = writer
+        self.__buffer_size = buffer_size
+        self.__buffer: List[str] = []
+
+    def write(self, message: str) -> None:
+        self.__buffer.append(message)
+        if len(self.__buffer) >= self.__buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.__buffer:
+            return
+
+        message = '\n'.join(self.__buffer)
+        self.__buffer = []
         self.__writer.write(message)
 
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class Logger(object):
+    """
+    Writes JSON records: {"time": ..., "level": ..., "logger": ..., "message": ...}.
+    Records are buffered per invocation, Logger.flush() is called at the end of request / sqs event handling,
+    errors are flushed immediately. Levels and debug sampling are configured by settings.LOGGER_CONFIG.
+    Messages are formatted only for enabled records: logger.debug('Data: {}', data)
+    """
+
+    DEBUG = logging.DEBUG
+    INFO = logging.INFO
+    WARNING = logging.WARNING
+    ERROR = logging.ERROR
+
+    __DEFAULT_NAME = 'mpc'
+
+    # shared by all loggers of the container
+    __writer: _LogWriterInterface = _BufferedLogWriter(
+        _PrintLogWriter(),
+        int(settings.LOGGER_CONFIG.get('buffer_size', 100))
+    )
+    __levels_cache: Dict[str, int] = {}
+
+    def __init__(self, name: str = None):
+        self.__name = name or self.__class__.__DEFAULT_NAME
+        self.__level = self.__get_level(self.__name)
+        self.__debug_sample_rate = float(settings.LOGGER_CONFIG.get('debug_sample_rate', 1))
+
+    @classmethod
+    def __get_level(cls, name: str) -> int:
+        level = cls.__levels_cache.get(name)
+        if level is None:
+            # the most specific module prefix wins: "chalicelib.libs.core" is used for "chalicelib.libs.core.sqs_sender"
+            levels = settings.LOGGER_CONFIG.get('levels') or {}
+            prefixes = [prefix for prefix in levels.keys() if name == prefix or name.startswith(prefix + '.')]
+            level_name = levels[max(prefixes, key=len)] if prefixes else settings.LOGGER_CONFIG.get('level', 'INFO')
+            level = logging.getLevelName(str(level_name).upper())
+            level = level if isinstance(level, int) else logging.INFO
+            cls.__levels_cache[name] = level
+
+        return level
+
+    @classmethod
+    def flush(cls) -> None:
+        cls.__writer.flush()
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.__level
+
+    def __log(self, level: int, message: str, args: tuple) -> None:
+        if level < self.__level:
+            return
+        elif level == self.__class__.DEBUG and random.random() >= self.__debug_sample_rate:
+            return
+
+        self.__class__.__writer.write(json.dumps({
+            'time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
+            'level': logging.getLevelName(level),
+            'logger': self.__name,
+            'message': str(message).format(*args) if args else str(message),
+        }, default=str))
+
+        if level >= self.__class__.ERROR:
+            self.__class__.flush()
+
+    def debug(self, message: str, *args) -> None:
+        self.__log(self.__class__.DEBUG, message, args)
+
+    def info(self, message: str, *args) -> None:
+        self.__log(self.__class__.INFO, message, args)
+
+    def warning(self, message: str, *args) -> None:
+        self.__log(self.__class__.WARNING, message, args)
+
+    def error(self, message: str, *args) -> None:
+        self.__log(self.__class__.ERROR, message, args)
+
     def log_exception(self, e: BaseException) -> None:
         if not isinstance(e, BaseException):
             raise ArgumentTypeException(self.log_exception, 'e', e)
 
-        self.__log_message(str(e) + str(traceback.format_exc()))
+        self.__log(self.__class__.ERROR, str(e) + str(traceback.format_exc()), ())
 
     def log_simple(self, message: str) -> None:
-        message = str(message)
-        self.__log_message(message)
-
+        self.__log(self.__class__.INFO, message, ())
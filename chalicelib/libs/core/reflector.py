@@ -3,7 +3,19 @@ from typing import Union
 
 
 class Reflector(object):
+    # (class, property name) => mangled property name, shared by all instances
+    __full_property_names = {}
+
     def __get_full_property_name(self, cls, property_name: str) -> str:
+        key = (cls, property_name)
+        full_property_name = Reflector.__full_property_names.get(key)
+        if full_property_name is None:
+            full_property_name = self.__build_full_property_name(cls, property_name)
+            Reflector.__full_property_names[key] = full_property_name
+
+        return full_property_name
+
+    def __build_full_property_name(self, cls, property_name: str) -> str:
         # strange name
         if property_name == '_':
             return property_name
@@ -73,7 +85,15 @@ class Reflector(object):
             ))
 
         entity = object.__new__(cls)
-        for (property_name, property_value) in tuple(properties_map.items()):
-            self.__set_entity_property(entity, property_name, property_value)
+        if hasattr(entity, '__dict__'):
+            # one dict update instead of setattr() per property
+            entity.__dict__.update({
+                self.__get_full_property_name(cls, property_name): property_value
+                for property_name, property_value in properties_map.items()
+            })
+        else:
+            for (property_name, property_value) in tuple(properties_map.items()):
+                self.__set_entity_property(entity, property_name, property_value)
+
         return entity
 
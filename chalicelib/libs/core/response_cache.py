@@ -0,0 +1,155 @@
+import json
+import time
+import hashlib
+from decimal import Decimal
+from typing import Callable, Optional, Tuple, Any
+from chalice import Response
+from chalice.app import Request
+from chalicelib.settings import settings
+from chalicelib.libs.core.chalice.request import MPCRequest
+from chalicelib.libs.core.cache import TtlCache
+from chalicelib.libs.models.mpc.base import DynamoModel
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                               CATALOGUE VERSION
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class CatalogueVersion(DynamoModel):
+    """
+    Counter, which is increased on every catalogue change (products data, anonymous scores).
+    Cached responses of previous versions are not used anymore.
+    """
+
+    TABLE_NAME = settings.AWS_DYNAMODB_CMS_TABLE_NAME
+    PARTITION_KEY = 'CATALOGUE'
+    SORT_KEY = 'VERSION'
+
+    __cache = TtlCache(int(settings.ANONYMOUS_RESPONSE_CACHE_CONFIG.get('version_ttl', 30)), 1)
+
+    def __init__(self):
+        super(CatalogueVersion, self).__init__(self.TABLE_NAME)
+
+    def get(self) -> int:
+        return self.__class__.__cache.get_or_set(self.SORT_KEY, lambda: int(
+            (self.find_item(self.SORT_KEY) or {}).get('version') or 0
+        ))
+
+    def increase(self) -> None:
+        self.table.update_item(
+            Key={'pk': self.get_partition_key(), 'sk': self.SORT_KEY},
+            UpdateExpression='ADD version :one',
+            ExpressionAttributeValues={':one': 1}
+        )
+        self.__class__.__cache.clear()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   STORAGES
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class _ResponseCacheDynamoDb(DynamoModel):
+    """ Shared cache tier. Expired items are removed by DynamoDB TTL, if it is enabled for TTL_ATTRIBUTE """
+
+    TABLE_NAME = settings.AWS_DYNAMODB_CMS_TABLE_NAME
+    PARTITION_KEY = 'ANONYMOUS_RESPONSE_CACHE'
+    TTL_ATTRIBUTE = 'expires_at'
+
+    # DynamoDB item size limit is 400KB
+    MAX_BODY_SIZE = 350 * 1024
+
+    def __init__(self):
+        super(_ResponseCacheDynamoDb, self).__init__(self.TABLE_NAME)
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        item = self.find_item(key)
+        if not item or int(item.get(self.TTL_ATTRIBUTE) or 0) < int(time.time()):
+            return None
+
+        return item['body'], item['etag']
+
+    def set(self, key: str, body: str, etag: str, ttl: int) -> None:
+        if len(body) > self.MAX_BODY_SIZE:
+            return
+
+        self.put_item(key, {
+            'body': body,
+            'etag': etag,
+            self.TTL_ATTRIBUTE: int(time.time()) + ttl,
+        })
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   CACHE
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def _json_default(value: Any) -> Any:
+    # numbers from DynamoDB are serialized as numbers, as by chalice, other values (datetime, ...) - as strings
+    if isinstance(value, Decimal):
+        return float(value)
+
+    return str(value)
+
+
+class AnonymousResponseCache(object):
+    """
+    Cache of responses, which are the same for all anonymous visitors (listings, filters, categories).
+    Responses are kept in the container (LRU) and optionally in DynamoDB (shared by all containers),
+    ETag / Cache-Control headers allow API Gateway, CDN and browsers to serve repeats.
+    """
+
+    __CONFIG = settings.ANONYMOUS_RESPONSE_CACHE_CONFIG
+
+    # serialized body and etag by cache key
+    __container_cache = TtlCache(int(__CONFIG.get('ttl', 60)), int(__CONFIG.get('max_size', 200)))
+
+    def __init__(self, namespace: str):
+        self.__namespace = namespace
+        self.__ttl = int(self.__class__.__CONFIG.get('ttl', 60))
+        self.__shared_storage = _ResponseCacheDynamoDb() if self.__class__.__CONFIG.get('shared') else None
+
+    def __get_key(self, params: Any) -> str:
+        # normalized params: the same filters in another order give the same key
+        return hashlib.sha1(json.dumps({
+            'namespace': self.__namespace,
+            'version': CatalogueVersion().get(),
+            'params': params,
+        }, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def __get_or_build(self, key: str, builder: Callable[[], Any]) -> Tuple[str, str]:
+        cached = self.__class__.__container_cache.get(key)
+        if cached:
+            return cached
+
+        cached = self.__shared_storage.get(key) if self.__shared_storage else None
+        if not cached:
+            body = json.dumps(builder(), default=_json_default)
+            cached = body, '"{}"'.format(hashlib.md5(body.encode('utf-8')).hexdigest())
+            if self.__shared_storage:
+                self.__shared_storage.set(key, cached[0], cached[1], self.__ttl)
+
+        self.__class__.__container_cache.set(key, cached)
+        return cached
+
+    def respond(self, request: Request, params: Any, builder: Callable[[], Any], private: bool = False) -> Response:
+        """
+        :param params: everything, what response depends on (filters, sorting, page, ...)
+        :param builder: builds response data, when it is not cached
+        :param private: response depends on the session (e.g. guest profile), so shared caches must not keep it
+        """
+        body, etag = self.__get_or_build(self.__get_key(params), builder)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': '{}, max-age={}'.format('private' if private else 'public', self.__ttl),
+            # the same url gives another response for a customer or another session
+            'Vary': '{}, {}'.format(MPCRequest.RWS_HEADER_X_TOKEN_NAME, MPCRequest.RWS_HEADER_SESSION_ID_NAME),
+        }
+
+        if etag in [value.strip() for value in str(request.headers.get('if-none-match') or '').split(',')]:
+            return Response(body='', status_code=304, headers=headers)
+
+        headers['Content-Type'] = 'application/json'
+        return Response(body=body, status_code=200, headers=headers)
@@ -77,7 +77,7 @@ class _SqsSenderDummyPrint(SqsSenderInterface):
 class _SqsSenderSqs(SqsSenderInterface):
     def __init__(self):
         self.__sqs_client = boto3.client('sqs')
-        self.__logger = Logger()
+        self.__logger = Logger(__name__)
 
     def send_batch(self, events: List[SqsSenderEventInterface]) -> None:
         # Group by event_type
@@ -103,9 +103,11 @@ class _SqsSenderSqs(SqsSenderInterface):
                 batch = event_data[idx: idx + CHUNK_SIZE]
 
                 def __log_flow(msg: str, event_type: str = event_type, data: list = batch):
-                    self.__logger.log_simple('{} : Sending SQS "{}" : {} : {}'.format(
+                    # batches are sent by hot paths (tracking, scores), so payloads are debug records only
+                    self.__logger.debug(
+                        '{} : Sending SQS "{}" : {} : {}',
                         self.__class__.__qualname__,
-                        event_type, data, msg))
+                        event_type, data, msg)
 
                 __log_flow('Start')
 
@@ -118,12 +120,13 @@ class _SqsSenderSqs(SqsSenderInterface):
 
     def send(self, event: SqsSenderEventInterface) -> None:
         def __log_flow(text: str) -> None:
-            self.__logger.log_simple('{} : Sending SQS "{}" : {} : {}'.format(
+            self.__logger.info(
+                '{} : Sending SQS "{}" : {} : {}',
                 self.__class__.__qualname__,
                 event.event_type,
                 event.event_data,
                 text
-            ))
+            )
 
         __log_flow('Start')
 
@@ -158,7 +161,7 @@ class _SqsSenderSqs(SqsSenderInterface):
                 }
             }
         )
-        __log_flow('Standard - End: {}'.format(response))
+        __log_flow('Standard - End: {}'.format(response.get('MessageId')))
 
     def __send_fifo(self, queue_url: str, object_type: str, data: dict, __log_flow):
         __log_flow('Fifo - Start')
@@ -178,7 +181,7 @@ class _SqsSenderSqs(SqsSenderInterface):
                 }
             }
         )
-        __log_flow('Fifo - End: {}'.format(response))
+        __log_flow('Fifo - End: {}'.format(response.get('MessageId')))
 
 
 # ----------------------------------------------------------------------------------------------------------------------
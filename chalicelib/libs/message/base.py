@@ -1,8 +1,10 @@
-from typing import Tuple
+import json
+import base64
+from typing import Tuple, Optional
 from datetime import datetime
+from boto3.dynamodb.conditions import Key
 from chalicelib.extensions import *
 from chalicelib.settings import settings
-from chalicelib.libs.core.reflector import Reflector
 from chalicelib.libs.models.mpc.base import DynamoModel
 
 
@@ -58,10 +60,30 @@ class MessageStorageInterface(object):
     def save(self, message: Message) -> None:
         raise NotImplementedError()
 
-    def remove(self, message_id: str) -> None:
+    def save_all(self, messages: Tuple[Message]) -> None:
+        raise NotImplementedError()
+
+    def remove(self, customer_email: str, message_id: str, created_at: Optional[datetime] = None) -> bool:
+        """ False, if customer does not have this message. Message is found faster by its creation time """
         raise NotImplementedError()
 
     def get_all_for_customer(self, customer_email: str) -> Tuple[Message]:
+        """ the newest messages first """
+        raise NotImplementedError()
+
+    def get_page_for_customer(
+        self,
+        customer_email: str,
+        limit: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[Tuple[Message], Optional[str]]:
+        """ the newest messages first and token of the next page (None for the last page) """
+        raise NotImplementedError()
+
+    def get_unread_count(self, customer_email: str) -> int:
+        raise NotImplementedError()
+
+    def mark_all_read(self, customer_email: str) -> None:
         raise NotImplementedError()
 
 
@@ -69,44 +91,101 @@ class MessageStorageInterface(object):
 
 
 class _MessageStorageDynamoDb(MessageStorageInterface):
-    __ENTITY_PROPERTY_MESSAGE_ID = '__id'
-    __ENTITY_PROPERTY_CUSTOMER_EMAIL = '__customer_email'
-    __ENTITY_PROPERTY_TITLE = '__title'
-    __ENTITY_PROPERTY_TEXT = '__text'
-    __ENTITY_PROPERTY_CREATED_AT = '__created_at'
+    """
+    Messages are stored in the customer's partition "NOTIFICATION#<email>" by "MESSAGE#<created_at>#<id>" keys,
+    so the inbox is read page by page from the newest message without other customers' messages.
+    Messages, which are created after "READ" item's time, are unread.
+    Previously all messages were stored in "NOTIFICATION_SIMPLE" partition - see migrations/messages_by_customer.py
+    """
+
+    __PARTITION_KEY = 'NOTIFICATION#%s'
+    __MESSAGE_SORT_KEY_PREFIX = 'MESSAGE#'
+    __READ_SORT_KEY = 'READ'
 
     def __init__(self):
         # is better to use composition instead of inheritance
         self.__storage = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
-        self.__storage.PARTITION_KEY = 'NOTIFICATION_SIMPLE'
-        self.__reflector = Reflector()
+
+    def __get_partition_key(self, customer_email: str) -> str:
+        return self.__class__.__PARTITION_KEY % customer_email
 
     def save(self, entity: Message) -> None:
         if not isinstance(entity, Message):
             raise ArgumentTypeException(self.save, 'entity', entity)
 
-        data = self.__reflector.extract(entity, (
-            self.__class__.__ENTITY_PROPERTY_MESSAGE_ID,
-            self.__class__.__ENTITY_PROPERTY_CUSTOMER_EMAIL,
-            self.__class__.__ENTITY_PROPERTY_TITLE,
-            self.__class__.__ENTITY_PROPERTY_TEXT,
-            self.__class__.__ENTITY_PROPERTY_CREATED_AT,
-        ))
-
-        self.__storage.put_item(data[self.__class__.__ENTITY_PROPERTY_MESSAGE_ID], {
-            'customer_email': data[self.__class__.__ENTITY_PROPERTY_CUSTOMER_EMAIL],
-            'title': data[self.__class__.__ENTITY_PROPERTY_TITLE],
-            'text': data[self.__class__.__ENTITY_PROPERTY_TEXT],
-            'created_at': data[self.__class__.__ENTITY_PROPERTY_CREATED_AT].strftime('%Y-%m-%d %H:%M:%S')
-        })
+        self.__storage.table.put_item(Item=self.__get_data(entity))
+
+    def save_all(self, entities: Tuple[Message]) -> None:
+        for entity in entities:
+            if not isinstance(entity, Message):
+                raise ArgumentTypeException(self.save_all, 'entities', entities)
+
+        # batch writer sends items by BatchWriteItem requests
+        self.__storage.insert_data([self.__get_data(entity) for entity in entities])
+
+    def __get_sort_key(self, message_id: str, created_at: datetime) -> str:
+        return '{}{}#{}'.format(
+            self.__class__.__MESSAGE_SORT_KEY_PREFIX,
+            created_at.strftime('%Y%m%d%H%M%S%f'),
+            message_id
+        )
+
+    def __get_data(self, entity: Message) -> dict:
+        return {
+            'pk': self.__get_partition_key(entity.customer_email),
+            'sk': self.__get_sort_key(entity.message_id, entity.created_at),
+            'message_id': entity.message_id,
+            'customer_email': entity.customer_email,
+            'title': entity.title,
+            'text': entity.text,
+            'created_at': entity.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def remove(self, customer_email: str, message_id: str, created_at: Optional[datetime] = None) -> bool:
+        if not isinstance(customer_email, str):
+            raise ArgumentTypeException(self.remove, 'customer_email', customer_email)
+        elif not str(customer_email).strip():
+            raise ArgumentCannotBeEmptyException(self.remove, 'customer_email')
 
-    def remove(self, message_id: str) -> None:
         if not isinstance(message_id, str):
             raise ArgumentTypeException(self.remove, 'message_id', message_id)
         elif not str(message_id).strip():
             raise ArgumentCannotBeEmptyException(self.remove, 'message_id')
 
-        self.__storage.delete_item(message_id)
+        if created_at is not None:
+            if not isinstance(created_at, datetime):
+                raise ArgumentTypeException(self.remove, 'created_at', created_at)
+
+            response = self.__storage.table.delete_item(
+                Key={
+                    'pk': self.__get_partition_key(customer_email),
+                    'sk': self.__get_sort_key(message_id, created_at),
+                },
+                ReturnValues='ALL_OLD'
+            )
+            return bool(response.get('Attributes'))
+
+        # the key contains creation time, so without it the key is searched in the customer's partition
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.__get_partition_key(customer_email)) & Key('sk').begins_with(
+                self.__class__.__MESSAGE_SORT_KEY_PREFIX
+            ),
+            'ProjectionExpression': 'sk',
+        }
+        while True:
+            response = self.__storage.table.query(**params)
+            for item in response.get('Items', []):
+                if item['sk'].endswith('#' + message_id):
+                    self.__storage.table.delete_item(Key={
+                        'pk': self.__get_partition_key(customer_email),
+                        'sk': item['sk'],
+                    })
+                    return True
+
+            if not response.get('LastEvaluatedKey'):
+                return False
+
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
 
     def get_all_for_customer(self, customer_email: str) -> Tuple[Message]:
         if not isinstance(customer_email, str):
@@ -114,17 +193,118 @@ class _MessageStorageDynamoDb(MessageStorageInterface):
         elif not str(customer_email).strip():
             raise ArgumentCannotBeEmptyException(self.get_all_for_customer, 'customer_email')
 
-        rows = self.__storage.filter_by_field_value('customer_email', customer_email)
-        return tuple([self.__get_instance(row) for row in rows])
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.__get_partition_key(customer_email)) & Key('sk').begins_with(
+                self.__class__.__MESSAGE_SORT_KEY_PREFIX
+            ),
+            'ScanIndexForward': False,
+        }
+        messages = []
+        while True:
+            response = self.__storage.table.query(**params)
+            messages.extend([self.__get_instance(item) for item in response.get('Items', [])])
+            if not response.get('LastEvaluatedKey'):
+                return tuple(messages)
+
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def get_page_for_customer(
+        self,
+        customer_email: str,
+        limit: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[Tuple[Message], Optional[str]]:
+        if not isinstance(customer_email, str):
+            raise ArgumentTypeException(self.get_page_for_customer, 'customer_email', customer_email)
+        elif not str(customer_email).strip():
+            raise ArgumentCannotBeEmptyException(self.get_page_for_customer, 'customer_email')
+
+        if not isinstance(limit, int):
+            raise ArgumentTypeException(self.get_page_for_customer, 'limit', limit)
+        elif limit < 1:
+            raise ArgumentValueException('{} expects limit > 0'.format(self.get_page_for_customer.__qualname__))
+
+        try:
+            start_key = json.loads(base64.urlsafe_b64decode(continuation_token.encode()).decode()) \
+                if continuation_token else None
+        except ValueError:
+            raise ArgumentValueException('{} got incorrect continuation token {}'.format(
+                self.get_page_for_customer.__qualname__,
+                continuation_token
+            ))
+
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.__get_partition_key(customer_email)) & Key('sk').begins_with(
+                self.__class__.__MESSAGE_SORT_KEY_PREFIX
+            ),
+            'ScanIndexForward': False,
+            'Limit': limit,
+        }
+        if start_key:
+            params['ExclusiveStartKey'] = start_key
 
-    def __get_instance(self, data: dict) -> Message:
-        entity: Message = self.__reflector.construct(Message, {
-            self.__class__.__ENTITY_PROPERTY_MESSAGE_ID: data.get('sk'),
-            self.__class__.__ENTITY_PROPERTY_CUSTOMER_EMAIL: data.get('customer_email'),
-            self.__class__.__ENTITY_PROPERTY_TITLE: data.get('title'),
-            self.__class__.__ENTITY_PROPERTY_TEXT: data.get('text'),
-            self.__class__.__ENTITY_PROPERTY_CREATED_AT: datetime.strptime(data.get('created_at'), '%Y-%m-%d %H:%M:%S')
+        response = self.__storage.table.query(**params)
+        last_key = response.get('LastEvaluatedKey')
+
+        messages = tuple([self.__get_instance(item) for item in response.get('Items', [])])
+        next_token = base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode() if last_key else None
+        return messages, next_token
+
+    def get_unread_count(self, customer_email: str) -> int:
+        if not isinstance(customer_email, str):
+            raise ArgumentTypeException(self.get_unread_count, 'customer_email', customer_email)
+        elif not str(customer_email).strip():
+            raise ArgumentCannotBeEmptyException(self.get_unread_count, 'customer_email')
+
+        read_item = self.__storage.table.get_item(Key={
+            'pk': self.__get_partition_key(customer_email),
+            'sk': self.__class__.__READ_SORT_KEY,
+        }).get('Item')
+
+        # only keys of unread messages are counted
+        from_key = self.__class__.__MESSAGE_SORT_KEY_PREFIX + (read_item['read_at'] if read_item else '')
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.__get_partition_key(customer_email)) & Key('sk').between(
+                from_key,
+                self.__class__.__MESSAGE_SORT_KEY_PREFIX + '~'
+            ),
+            'Select': 'COUNT',
+        }
+        count = 0
+        while True:
+            response = self.__storage.table.query(**params)
+            count += int(response.get('Count', 0))
+            if not response.get('LastEvaluatedKey'):
+                return count
+
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def mark_all_read(self, customer_email: str) -> None:
+        if not isinstance(customer_email, str):
+            raise ArgumentTypeException(self.mark_all_read, 'customer_email', customer_email)
+        elif not str(customer_email).strip():
+            raise ArgumentCannotBeEmptyException(self.mark_all_read, 'customer_email')
+
+        # "~" is after "#", so the message, which is created in the same microsecond, is read too
+        self.__storage.table.put_item(Item={
+            'pk': self.__get_partition_key(customer_email),
+            'sk': self.__class__.__READ_SORT_KEY,
+            'read_at': datetime.now().strftime('%Y%m%d%H%M%S%f') + '~',
         })
+
+    def __get_instance(self, data: dict) -> Message:
+        # Attention! This is a hot path for inbox, so reflector and strptime are not used.
+        # Creation time is restored from the key with microseconds, so the key can be built again.
+        created_at = data['sk'][len(self.__class__.__MESSAGE_SORT_KEY_PREFIX):]
+        entity = object.__new__(Message)
+        entity._Message__id = data['message_id']
+        entity._Message__customer_email = data['customer_email']
+        entity._Message__title = data['title']
+        entity._Message__text = data['text']
+        entity._Message__created_at = datetime(
+            int(created_at[0:4]), int(created_at[4:6]), int(created_at[6:8]),
+            int(created_at[8:10]), int(created_at[10:12]), int(created_at[12:14]), int(created_at[14:20])
+        )
         return entity
 
 
@@ -138,12 +318,29 @@ class MessageStorageImplementation(MessageStorageInterface):
     def save(self, message: Message) -> None:
         self.__implementation.save(message)
 
-    def remove(self, message_id: str) -> None:
-        self.__implementation.remove(message_id)
+    def save_all(self, messages: Tuple[Message]) -> None:
+        self.__implementation.save_all(messages)
+
+    def remove(self, customer_email: str, message_id: str, created_at: Optional[datetime] = None) -> bool:
+        return self.__implementation.remove(customer_email, message_id, created_at)
 
     def get_all_for_customer(self, customer_email: str) -> Tuple[Message]:
         return self.__implementation.get_all_for_customer(customer_email)
 
+    def get_page_for_customer(
+        self,
+        customer_email: str,
+        limit: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[Tuple[Message], Optional[str]]:
+        return self.__implementation.get_page_for_customer(customer_email, limit, continuation_token)
+
+    def get_unread_count(self, customer_email: str) -> int:
+        return self.__implementation.get_unread_count(customer_email)
+
+    def mark_all_read(self, customer_email: str) -> None:
+        self.__implementation.mark_all_read(customer_email)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -13,6 +13,42 @@ from .orders import OrderAggregation
 from .tracks import UserTrackEntry
 
 
+def has_low_stock_sizes(sizes: List[dict]) -> bool:
+    """ see ProductEntry.is_low_stock, the same condition is used in ScoredProduct.updateStock() script """
+    threshold = int(settings.LAST_CHANCE_STOCK_THRESHOLD)
+    return any([0 < int(size.get('qty') or 0) <= threshold for size in sizes])
+
+
+# the same as has_low_stock_sizes(), for update scripts. Sizes qty are replaced by params.stocks (simple sku => qty)
+LOW_STOCK_SCRIPT = " ".join([
+    "boolean isLowStock = false;",
+    "for (def size : ctx._source.sizes == null ? [] : ctx._source.sizes) {",
+    "    if (params.stocks.containsKey(size.rs_simple_sku)) { size.qty = params.stocks[size.rs_simple_sku]; }",
+    "    if (size.qty != null && size.qty > 0 && size.qty <= params.threshold) { isLowStock = true; }",
+    "}",
+    "ctx._source.is_low_stock = isLowStock;",
+])
+
+
+def get_current_price(rs_selling_price, discount) -> float:
+    """ Effective (discounted) price, which is stored as "current_price" to sort by native field """
+    try:
+        original_price = float(str(rs_selling_price))
+        return original_price - original_price * float(str(discount or 0)) / 100
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# the same as get_current_price(), for update scripts
+CURRENT_PRICE_SCRIPT = " ".join([
+    "if (ctx._source.rs_selling_price != null) {",
+    "    double price = Double.parseDouble(String.valueOf(ctx._source.rs_selling_price));",
+    "    double discount = ctx._source.discount == null ? 0 : Double.parseDouble(String.valueOf(ctx._source.discount));",
+    "    ctx._source.current_price = price - price * discount / 100;",
+    "}",
+])
+
+
 class ProductSize:
     size: str
     qty: int
@@ -230,6 +266,11 @@ class ProductEntry(object):
     def viewed_at(self, value: Optional[datetime]):
         self.__viewed_at = value
 
+    @property
+    def is_low_stock(self) -> bool:
+        """ some size is still available, but its qty is not more than last chance threshold """
+        return has_low_stock_sizes([size.to_dict() for size in self.sizes])
+
     @property
     def original_price(self) -> float:
         try:
@@ -239,13 +280,7 @@ class ProductEntry(object):
 
     @property
     def current_price(self) -> float:
-        try:
-            original_price = self.original_price
-            discount = float(str(self.discount))
-            current_price = original_price - original_price * discount / 100
-            return current_price
-        except:
-            return 0.0
+        return get_current_price(self.rs_selling_price, self.discount)
 
     def to_dict(self, mode: str = 'detail', tier: dict = None) -> dict:
         if mode == 'detail':
@@ -318,6 +353,7 @@ class ProductEntry(object):
                 "tracking_score": self.tracking_score,
                 "total_score": self.total_score,
                 "percentage_score": self.percentage_score,
+                "is_low_stock": self.is_low_stock,
                 "tracking_info": {
                     "views": self.views,
                     "clicks": self.clicks,
@@ -1,7 +1,8 @@
+import zlib
 import math
 import boto3
 import random
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 from elasticsearch import Elasticsearch, RequestsHttpConnection, helpers
 from elasticsearch_dsl import Search, A
@@ -10,9 +11,11 @@ from decimal import Decimal
 from ..mpc.product_types import ProductType
 from ..mpc.product_visit_logs import ProductVisitLog
 from ....settings import settings
+from ...core.elastic import ElasticRequestException
+from ...core.cache import TtlCache
 from .orders import OrderAggregation
 from ..mpc.Cms.UserQuestions import UserQuestionEntity as Question
-from .product_entry import ProductEntry
+from .product_entry import ProductEntry, get_current_price
 
 
 
@@ -23,6 +26,31 @@ class Product(object):
     INDEX_NAME = settings.AWS_ELASTICSEARCH_PRODUCTS
     DOC_TYPE = settings.AWS_ELASTICSEARCH_PRODUCTS
 
+    # "card" projection - only fields, which are used by convert_item(), are loaded by listing queries
+    CARD_SOURCE_FIELDS = (
+        'portal_config_id',
+        'rs_sku',
+        'product_name',
+        'product_description',
+        'rs_selling_price',
+        'discount',
+        'created_at',
+        'product_size_attribute',
+        'rs_product_sub_type',
+        'gender',
+        'manufacturer',
+        'sizes.size',
+        'sizes.qty',
+        'sizes.rs_simple_sku',
+        'images.s3_filepath',
+    )
+
+    # similar styles, also availables sources by (type, product, seed, ...)
+    __RECOMMENDATIONS_CACHE = TtlCache(
+        settings.PRODUCT_RECOMMENDATIONS_CACHE_TTL,
+        settings.PRODUCT_RECOMMENDATIONS_CACHE_SIZE
+    )
+
     def __init__(self, **kwargs):
         service = 'es'
         credentials = boto3.Session(region_name=self.ES_REGION).get_credentials()
@@ -70,7 +98,8 @@ class Product(object):
                     "updated_at": new_datetime
                 })
             item.update({
-                'brand_code': item.get('manufacturer', '').lower()
+                'brand_code': item.get('manufacturer', '').lower(),
+                'current_price': get_current_price(item.get('rs_selling_price'), item.get('discount')),
             })
             actions.append({
                 '_index': index,
@@ -83,7 +112,8 @@ class Product(object):
     def insert(self, index, doc_type, item, **kwargs):
         es = self.elasticsearch
         item.update({
-            'brand_code': item.get('manufacturer', '').lower()
+            'brand_code': item.get('manufacturer', '').lower(),
+            'current_price': get_current_price(item.get('rs_selling_price'), item.get('discount')),
         })
         return helpers.create(es, index, item.get('rs_sku'), item, doc_type)
 
@@ -95,6 +125,8 @@ class Product(object):
         discount = float(item['discount']) if item['discount'] else 0
         current_price = original_price - original_price * discount / 100
 
+        # see CARD_SOURCE_FIELDS
+        images = item.get('images') or []
         item = {
             'id': item['portal_config_id'],
             'sku': item['rs_sku'],
@@ -113,7 +145,7 @@ class Product(object):
                 'rs_simple_sku': size['rs_simple_sku']
             } for size in item['sizes']],
             'image': {
-                'src': item['images'][0]['s3_filepath'] if len(item['images']) > 0 else 'https://placeimg.com/155/140/arch',
+                'src': images[0]['s3_filepath'] if len(images) > 0 else 'https://placeimg.com/155/140/arch',
                 'title': item['product_size_attribute'],
             },
             'original_price': original_price,
@@ -167,6 +199,7 @@ class Product(object):
             })
 
         s = Search(using=self.elasticsearch, index=self.INDEX_NAME)\
+            .source(list(self.CARD_SOURCE_FIELDS))\
             .query(query)[offset:offset + size]
         response = s.execute()
         return self.convert([item['_source'] for item in response.hits.hits])
@@ -184,6 +217,7 @@ class Product(object):
             }
         }
         s = Search(using=self.elasticsearch, index=self.INDEX_NAME)\
+            .source(list(self.CARD_SOURCE_FIELDS))\
             .query(query)[offset:offset + size]
         response = s.execute()
 
@@ -198,18 +232,26 @@ class Product(object):
             log_model.insert(self.convert_item(item))
         return self.convert_item(item, tier=tier)
 
-    def get_smiliar_styles(
-            self, id, page=1, size=20, customer_id='BLANK',
-            tier=None, **kwargs):
+    @staticmethod
+    def __get_random_seed(session_id: Optional[str] = None) -> int:
+        """ the same order of random recommendations for a session during a day """
+        return zlib.crc32('{}#{}'.format(session_id or '', datetime.now().strftime('%Y%m%d')).encode('utf-8'))
+
+    @staticmethod
+    def __get_random_score(seed: int) -> dict:
+        return {
+            "function_score": {
+                "query": {"match_all": {}},
+                # seeded score on a stable field gives the same order for the same seed,
+                # so pages do not overlap and elastic request cache can be used
+                "random_score": {"seed": seed, "field": "portal_config_id"}
+            }
+        }
+
+    def __get_smiliar_styles_query(self, product: dict, seed: int, page: int = 1, size: int = 20) -> dict:
+        """ :param product: converted product (see convert_item()) """
         offset = (page - 1) * size
-        item = self.find_by_id(id)
-        if item is None:
-            return []
-        product_type = item.get('product_type')
-        sub_type = item.get('product_sub_type')
-        gender = item.get('gender')
-        brand = item.get('brand')
-        s = Search(using=self.elasticsearch, index=self.INDEX_NAME)\
+        return Search()\
             .query({
                 "bool": {
                     "must": [
@@ -217,45 +259,52 @@ class Product(object):
                             "range": {"sizes.qty": {"gt": 0}}
                         },
                         {
-                            "term": {"gender": gender}
+                            "term": {"gender": product.get('gender')}
                         },
                         {
-                            "term": {"product_size_attribute": product_type}
+                            "term": {"product_size_attribute": product.get('product_type')}
                         },
                         {
-                            "term": {"rs_product_sub_type": sub_type}
+                            "term": {"rs_product_sub_type": product.get('product_sub_type')}
                         },
                         {
-                            "match": {"manufacturer": brand}
+                            "match": {"manufacturer": product.get('brand')}
                         }
                     ],
                     "must_not": [
                         {
                             "match": {
-                                "rs_sku": id
+                                "rs_sku": product.get('sku')
                             }
                         }
                     ]
                 }
-            }).query({
-                "function_score" : {
-                "query" : { "match_all": {} },
-                "random_score" : {}
-            }
-            })[offset:offset + size]
-        response = s.execute()
-
-        return self.convert(
-            [item['_source'] for item in response.hits.hits],
-            tier=tier)
+            }).query(self.__get_random_score(seed))\
+            .source(list(self.CARD_SOURCE_FIELDS))[offset:offset + size].to_dict()
 
-    def get_also_availables(self, id, tier=None, **kwargs):
-        item = self.find_by_id(id)
-        if item is None:
-            return []
-
-        base_sku = '_'.join(item.get('sku').split('_')[:-1])
-        s = Search(using=self.elasticsearch, index=self.INDEX_NAME)\
+    def get_smiliar_styles(
+            self, id, page=1, size=20, customer_id='BLANK',
+            tier=None, session_id=None, **kwargs):
+        seed = self.__get_random_seed(session_id)
+        cache_key = ('similar_styles', id, seed, page, size)
+        sources = self.__RECOMMENDATIONS_CACHE.get(cache_key)
+        if sources is None:
+            item = self.find_by_id(id)
+            if item is None:
+                return []
+
+            response = self.elasticsearch.search(
+                index=self.INDEX_NAME,
+                body=self.__get_smiliar_styles_query(item, seed, page=page, size=size))
+            sources = [item['_source'] for item in response['hits']['hits']]
+            self.__RECOMMENDATIONS_CACHE.set(cache_key, sources)
+
+        return self.convert(sources, tier=tier)
+
+    def __get_also_availables_query(self, product: dict, seed: int) -> dict:
+        """ :param product: converted product (see convert_item()) """
+        base_sku = '_'.join(product.get('sku').split('_')[:-1])
+        return Search()\
             .query({
                 "bool": {
                     "must": [
@@ -269,19 +318,30 @@ class Product(object):
                     "must_not": [
                         {
                             "match": {
-                                "rs_sku": id
+                                "rs_sku": product.get('sku')
                             }
                         }
                     ]
                 }
-            }).query({
-                "function_score" : {
-                    "query" : { "match_all": {} },
-                    "random_score" : {}
-                }
-            })
-        response = s.execute()
-        return self.convert([item['_source'] for item in response.hits.hits], tier=tier)
+            }).query(self.__get_random_score(seed))\
+            .source(list(self.CARD_SOURCE_FIELDS)).to_dict()
+
+    def get_also_availables(self, id, tier=None, session_id=None, **kwargs):
+        seed = self.__get_random_seed(session_id)
+        cache_key = ('also_availables', id, seed)
+        sources = self.__RECOMMENDATIONS_CACHE.get(cache_key)
+        if sources is None:
+            item = self.find_by_id(id)
+            if item is None:
+                return []
+
+            response = self.elasticsearch.search(
+                index=self.INDEX_NAME,
+                body=self.__get_also_availables_query(item, seed))
+            sources = [item['_source'] for item in response['hits']['hits']]
+            self.__RECOMMENDATIONS_CACHE.set(cache_key, sources)
+
+        return self.convert(sources, tier=tier)
 
     def get_recently_viewed(
             self, session_id, customer_id=None,
@@ -302,15 +362,96 @@ class Product(object):
 
         # To implement discount
         skus: List[str] = [log['sku'] for log in logs]
-        s = Search(using=self.elasticsearch, index=self.INDEX_NAME)\
-            .query({
+        response = self.elasticsearch.search(index=self.INDEX_NAME, body=self.__get_recently_viewed_query(skus))
+        return self.__sort_recently_viewed(
+            skus, self.convert([item['_source'] for item in response['hits']['hits']], tier=tier))
+
+    @staticmethod
+    def __get_recently_viewed_query(skus: List[str]) -> dict:
+        return {
+            "query": {
                 "terms": {"rs_sku": skus}
-            })
-        response = s.execute()
-        products = self.convert([item['_source'] for item in response.hits.hits], tier=tier)
+            },
+            "size": len(skus),
+            "_source": list(Product.CARD_SOURCE_FIELDS),
+        }
+
+    @staticmethod
+    def __sort_recently_viewed(skus: List[str], products: List[dict]) -> List[dict]:
         return sorted(
             products, key=lambda x: skus.index(x['sku']))
 
+    def get_details(
+            self, id, session_id=None, customer_id=None, user_id=None,
+            tier: dict = None, page=1, size=20, log=False, **kwargs) -> Optional[dict]:
+        """
+        Product page data: product, complete looks, similar styles, also availables, recently viewed products.
+        The product is loaded once, all related products are loaded by one _msearch request.
+        """
+        from .scored_products import ScoredProduct
+
+        es = self.elasticsearch
+        source = es.get(index=self.INDEX_NAME, doc_type=self.DOC_TYPE, id=id, ignore=[404]).get('_source')
+        if source is None:
+            return None
+
+        if log:
+            log_model = ProductVisitLog(session_id, customer_id=user_id)
+            log_model.insert(self.convert_item(source))
+
+        product = self.convert_item(source, tier=tier)
+        scored_product = ScoredProduct()
+        viewed_skus: List[str] = [
+            log['sku'] for log in ProductVisitLog(session_id, customer_id=customer_id).get_logs(omit=id)
+        ]
+
+        seed = self.__get_random_seed(session_id)
+        cache_keys = {
+            'similar_styles': ('similar_styles', id, seed, page, size),
+            'also_availables': ('also_availables', id, seed),
+        }
+        sources = {
+            name: self.__RECOMMENDATIONS_CACHE.get(cache_key) for name, cache_key in cache_keys.items()
+        }
+
+        searches = {
+            'complete_looks': (scored_product.INDEX_NAME, scored_product.get_complete_looks_query(source, page, size)),
+        }
+        if sources['similar_styles'] is None:
+            searches['similar_styles'] = (
+                self.INDEX_NAME,
+                self.__get_smiliar_styles_query(product, seed, page=page, size=size)
+            )
+        if sources['also_availables'] is None:
+            searches['also_availables'] = (self.INDEX_NAME, self.__get_also_availables_query(product, seed))
+        if viewed_skus:
+            searches['recently_views'] = (self.INDEX_NAME, self.__get_recently_viewed_query(viewed_skus))
+
+        body = []
+        for index_name, query in searches.values():
+            body.extend([{'index': index_name}, query])
+
+        responses = dict(zip(searches.keys(), es.msearch(body=body)['responses']))
+        for response in responses.values():
+            if response.get('error'):
+                raise ElasticRequestException('Elastic search error: {}'.format(response))
+
+        for name, cache_key in cache_keys.items():
+            if name in responses:
+                sources[name] = [item['_source'] for item in responses[name]['hits']['hits']]
+                self.__RECOMMENDATIONS_CACHE.set(cache_key, sources[name])
+
+        return {
+            'product': product,
+            'complete_looks': scored_product.convert_search_hits(responses['complete_looks']['hits'], tier=tier),
+            'similar_styles': self.convert(sources['similar_styles'], tier=tier),
+            'also_availables': self.convert(sources['also_availables'], tier=tier),
+            'recently_views': self.__sort_recently_viewed(
+                viewed_skus,
+                self.convert([item['_source'] for item in responses['recently_views']['hits']['hits']], tier=tier)
+            ) if viewed_skus else [],
+        }
+
     def get_brands(
             self,
             keyword: str=None,
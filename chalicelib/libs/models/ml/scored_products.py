@@ -5,14 +5,17 @@ from typing import List, Union, Optional, Tuple
 from warnings import warn
 from elasticsearch import helpers
 from chalicelib.settings import settings
-from chalicelib.libs.core.elastic import Elastic
+from chalicelib.libs.core.elastic import Elastic, apply_search_after, get_search_after_cursor
+from chalicelib.libs.core.cache import TtlCache
+from chalicelib.libs.core.response_cache import CatalogueVersion
 from chalicelib.libs.models.mpc.Product import Product, ProductSearchCriteria
 from chalicelib.libs.core.datetime import get_mpc_datetime_now, DATETIME_FORMAT
 from chalicelib.libs.models.mpc.categories import Category, CategoryEntry
 from chalicelib.libs.models.mpc.product_types import ProductType
 from chalicelib.libs.models.mpc.product_visit_logs import ProductVisitLog
 from chalicelib.libs.models.mpc.brands import Brand
-from ..mpc.ProductMapping import scored_products_mapping
+from ..mpc.ProductMapping import (
+    scored_products_mapping, NORMALIZED_FIELDS, NORMALIZED_SUB_FIELD, AUTOCOMPLETE_FIELDS, AUTOCOMPLETE_SUB_FIELD)
 from ..mpc.Cms.user_states import CustomerStateModel
 from ..mpc.product_tracking import (
     ProductsTrackingModel, _BaseAction, ViewAction, VisitAction, ClickAction)
@@ -21,7 +24,8 @@ from .orders import Order, OrderAggregation
 from .utils import get_bucket_data, get_username_from_email
 from .tracks import UserTrackEntry
 from .weights import ScoringWeight
-from .product_entry import ProductEntry, PercentageScoreRange
+from .product_entry import (
+    ProductEntry, PercentageScoreRange, has_low_stock_sizes, CURRENT_PRICE_SCRIPT, LOW_STOCK_SCRIPT)
 
 
 class ScoredProduct(object):
@@ -30,6 +34,40 @@ class ScoredProduct(object):
 
     __weight__: ScoringWeight = None
 
+    # categories by gender, they are changed rarely
+    __CATEGORIES_CACHE = TtlCache(settings.CATEGORIES_CACHE_TTL, 10)
+    __PRODUCT_TYPES_CACHE = TtlCache(settings.CATEGORIES_CACHE_TTL, 1)
+
+    __LAST_CHANCE_PRODUCT_TYPES_LIMIT = 1000
+
+    # "card" projection - only fields, which are used by __convert_item(), are loaded by listing queries
+    CARD_SOURCE_FIELDS = (
+        'portal_config_id',
+        'rs_sku',
+        'event_code',
+        'product_name',
+        'product_description',
+        'rs_selling_price',
+        'discount',
+        'current_price',
+        'product_size_attribute',
+        'rs_product_sub_type',
+        'gender',
+        'manufacturer',
+        'rs_colour',
+        'sizes.size',
+        'sizes.qty',
+        'sizes.rs_simple_sku',
+        'sizes.portal_simple_id',
+        'images.s3_filepath',
+        'question_score',
+        'order_score',
+        'tracking_score',
+        ProductSearchCriteria.SORT_COLUMN_PERCENTAGE_SCORE,
+        'tracking_info',
+        'is_seen',
+    )
+
     def __init__(self):
         self.__elastic = Elastic(
             settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS,
@@ -78,20 +116,8 @@ class ScoredProduct(object):
             # '_score': '_score',
             ProductSearchCriteria.SORT_COLUMN_PERCENTAGE_SCORE: {'percentage_score': {'order': direction}},
             'search_query': {'search_query': {'order': direction}},
-            'price': {
-                '_script': {
-                    "type": "number",
-                    "script": {
-                        "lang": "painless",
-                        # see __convert_item_calculate_prices()
-                        "source": "{price} - {price} * {discount} / 100".format(**{
-                            'price': "doc['rs_selling_price'].value",
-                            'discount': "doc['discount'].value"
-                        }),
-                    },
-                    "order": direction
-                }
-            },
+            # effective price is stored on indexing, see get_current_price()
+            'price': {'current_price': {'order': direction}},
         }
 
         if column_name not in sort_map.keys():
@@ -117,6 +143,19 @@ class ScoredProduct(object):
     def __update_by_query(self, query: dict):
         return self.elastic.update_by_query(query)
 
+    def __search_products(self, query: dict, cursor: Optional[str], tier: dict = None, is_anyonimous: bool = False):
+        """ {total, products} in page mode (cursor is None), {total, products, cursor} in cursor mode """
+        query = {**query, '_source': list(self.__class__.CARD_SOURCE_FIELDS)}
+        if cursor is None:
+            response = self.__elastic.post_search(query)['hits']
+            return self.__convert_products(response, tier=tier, is_anyonimous=is_anyonimous)
+
+        query = apply_search_after(query, cursor, {'rs_sku': {'order': 'asc'}})
+        response = self.__elastic.post_search(query)['hits']
+        result = self.__convert_products(response, tier=tier, is_anyonimous=is_anyonimous)
+        result['cursor'] = get_search_after_cursor(response, query['size'])
+        return result
+
     def __convert_products(self, data, tier: dict = None, is_anyonimous: bool = False):
         ret ={
             "total": data["total"],
@@ -129,6 +168,9 @@ class ScoredProduct(object):
     @staticmethod
     def __convert_item_calculate_prices(item) -> tuple:
         original_price = float(item['rs_selling_price'] or 0)
+        if item.get('current_price') is not None:
+            return original_price, float(item['current_price'])
+
         discount = float(item['discount'] or 0)
         current_price = original_price - original_price * discount / 100
         return original_price, current_price
@@ -140,6 +182,8 @@ class ScoredProduct(object):
         if isinstance(tier, dict) and not tier.get('is_neutral') and not is_anyonimous:
             fbucks = math.ceil(item['current_price'] * tier['discount_rate'] / 100)
 
+        # see CARD_SOURCE_FIELDS
+        images = item.get('images') or []
         result = {
             'id': item['portal_config_id'],
             'sku': item['rs_sku'],
@@ -166,7 +210,7 @@ class ScoredProduct(object):
                 'simple_id': size['portal_simple_id'],
             } for size in item.get('sizes', [])],
             'image': {
-                'src': item['images'][0]['s3_filepath'] if len(item['images']) > 0 else 'https://www.supplyforce.com/ASSETS/WEB_THEMES//ECOMMERCE_STD_TEMPLATE_V2/images/NoImage.png',
+                'src': images[0]['s3_filepath'] if len(images) > 0 else 'https://www.supplyforce.com/ASSETS/WEB_THEMES//ECOMMERCE_STD_TEMPLATE_V2/images/NoImage.png',
                 'title': item['product_size_attribute'],
             },
             'scores': {
@@ -380,13 +424,15 @@ class ScoredProduct(object):
     def __makeESFilterFromCustomFilter(
             self,
             custom_filters: Optional[dict] = None, customer_id: str = None):
+        # filter clauses are not scored and are cached by elastic, so only text search is in "must"
         if not customer_id:
             customer_id = 'BLANK'
         ret = {}
         ret['bool'] = {}
-        ret['bool']['must'] = [
+        ret['bool']['must'] = []
+        ret['bool']['filter'] = [
             {
-                "match": {
+                "term": {
                     "customer_id": customer_id
                 }
             }
@@ -396,19 +442,21 @@ class ScoredProduct(object):
             if(key == "invalid_name"):
                 continue
             must_item = {}
+            filter_item = {}
             if key == 'rs_selling_price':
-                must_item['range'] = {}
-                must_item['range'][key] = {}
-                must_item['range'][key]['gte'] = value[0]
-                must_item['range'][key]['lte'] = value[1]
+                # ranges are applied to the effective (discounted) price, as it is shown and sorted
+                filter_item['range'] = {}
+                filter_item['range']['current_price'] = {}
+                filter_item['range']['current_price']['gte'] = value[0]
+                filter_item['range']['current_price']['lte'] = value[1]
             elif key == 'search_query':
                 value = str(value or '').strip()
                 if value:
                     must_item['bool'] = {
                         "should": [
-                            {"match_phrase_prefix": {"product_name": value}},
-                            # {"match_phrase_prefix": {"product_description": value}} When search_query is 'Dress', this returns some socks and shoes
-                            {"match_phrase_prefix": {"product_size_attribute": value}}
+                            {"match": {field + '.' + AUTOCOMPLETE_SUB_FIELD: {"query": value, "operator": "and"}}}
+                            # product_description is not used: when search_query is 'Dress', this returns some socks and shoes
+                            for field in AUTOCOMPLETE_FIELDS
                         ]
                     }
             elif key == 'created_at':
@@ -417,11 +465,21 @@ class ScoredProduct(object):
                         self.now - timedelta(
                             days=settings.NEW_PRODUCT_THRESHOLD)
                         ).strftime(DATETIME_FORMAT)
-                    must_item['range'] = {}
-                    must_item['range'][key] = {}
-                    must_item['range'][key]['gte'] = from_date
+                    filter_item['range'] = {}
+                    filter_item['range'][key] = {}
+                    filter_item['range'][key]['gte'] = from_date
                 else:
                     continue
+            elif key in NORMALIZED_FIELDS:
+                values = value if isinstance(value, list) else [value]
+                if values:
+                    filter_item['terms'] = {}
+                    filter_item['terms'][key + '.' + NORMALIZED_SUB_FIELD] = [str(_value).lower() for _value in values]
+            elif key in ('portal_config_id', 'rs_sku'):
+                values = value if isinstance(value, list) else [value]
+                if values:
+                    filter_item['terms'] = {}
+                    filter_item['terms'][key] = values
             else:
                 if isinstance(value, list):
                     must_item['bool'] = {}
@@ -437,24 +495,15 @@ class ScoredProduct(object):
 
             if must_item:
                 ret['bool']['must'].append(must_item)
+            if filter_item:
+                ret['bool']['filter'].append(filter_item)
 
         return ret
 
     def __get_sort_option_by_score(self) -> dict:
+        # weighted score is stored by calculate_scores(), see ProductEntry.total_score
         return {
-            "_script": {
-                "type": "number",
-                "script": {
-                    "lang": "painless",
-                    "source": "doc['question_score'].value * params.qw +"\
-                        "doc['order_score'].value * params.rw +"\
-                        "doc['tracking_score'].value * params.tw",
-                    "params": {
-                        "qw": self.weight.question,
-                        "rw": self.weight.order,
-                        "tw": self.weight.track,
-                    }
-                },
+            "total_score": {
                 "order": "desc"
             }
         }
@@ -542,8 +591,12 @@ class ScoredProduct(object):
                 score_range.min_score = product.total_score
 
         response = self.__bulk_update(username, products)
+        CustomerStateModel(username or 'BLANK').category_ranking = self.__build_category_ranking(products)
         if username:
             customer_state.personalize_in_progress = False
+        else:
+            # anonymous listings are changed
+            CatalogueVersion().increase()
         return response
 
     def track(self, action_or_list: Union[_BaseAction, List[_BaseAction]]):
@@ -571,8 +624,10 @@ class ScoredProduct(object):
         sort_by_score: bool = True,
         tier: dict = None,
         page=1,
-        size=18
+        size=18,
+        cursor: Optional[str] = None
     ):
+        """ :param cursor: see apply_search_after(), page is ignored in cursor mode """
         if not customer_id and isinstance(email, str):
             customer_id = get_username_from_email(email)
 
@@ -592,10 +647,12 @@ class ScoredProduct(object):
             ],
         }
 
-        response = self.__elastic.post_search(query)['hits']
-        return self.__convert_products(response, tier=tier, is_anyonimous=(not customer_id))
+        return self.__search_products(query, cursor, tier=tier, is_anyonimous=(not customer_id))
 
     def update(self, config_sku: str, data: dict):
+        if isinstance(data.get('sizes'), list):
+            data = {**data, 'is_low_stock': has_low_stock_sizes(data['sizes'])}
+
         json_data = {
             "doc": data
         }
@@ -605,6 +662,9 @@ class ScoredProduct(object):
         for key, value in data.items():
             inline_scripts.append("ctx._source.%s = params.%s" % (key, key))
 
+        if 'rs_selling_price' in data or 'discount' in data:
+            inline_scripts.append(CURRENT_PRICE_SCRIPT)
+
         query = {
             "script": {
                 "inline": ";".join(inline_scripts),
@@ -627,10 +687,37 @@ class ScoredProduct(object):
         response = self.__update_by_query(query)
         return response
 
+    def updateStock(self, items: List[dict]):
+        """
+        Updates qty of sizes in scored products of all customers by one request.
+        :param items: [{'rs_simple_sku': str, 'qty': int, ...}, ...]
+        """
+        stocks = dict([(item['rs_simple_sku'], int(item['qty'] or 0)) for item in items])
+        if not stocks:
+            return None
+
+        # is_low_stock is maintained here, so last chance query does not need to check sizes
+        query = {
+            "script": {
+                "source": LOW_STOCK_SCRIPT,
+                "lang": "painless",
+                "params": {
+                    "stocks": stocks,
+                    "threshold": int(settings.LAST_CHANCE_STOCK_THRESHOLD),
+                },
+            },
+            "query": {
+                "terms": {
+                    "sizes.rs_simple_sku": list(stocks.keys())
+                }
+            }
+        }
+        return self.__update_by_query(query)
+
     def get_new_products(
             self,
             customer_id: str = None, gender: str = None, tier: dict = None,
-            page: int = 1, size: int = 20, **kwargs):
+            page: int = 1, size: int = 20, cursor: Optional[str] = None, **kwargs):
         filters = {
                 'gender': [gender] if gender and gender.strip().lower() != 'unisex' else [],
                 'newin': 'true'
@@ -646,72 +733,86 @@ class ScoredProduct(object):
             "sort": sort_options,
         }
 
-        response = self.__elastic.post_search(query)['hits']
-        return self.__convert_products(response, tier=tier, is_anyonimous=(not customer_id))
+        return self.__search_products(query, cursor, tier=tier, is_anyonimous=(not customer_id))
+
+    def __get_root_product_types(self) -> dict:
+        """ product_type_code => root product type data """
+        return self.__PRODUCT_TYPES_CACHE.get_or_set('ROOT', lambda: dict([
+            (str(item['product_type_code']).lower(), item) for item in ProductType().get_root_product_types()
+        ]))
 
     def get_last_chance(
             self, customer_id: str = None, gender: str = None, tier: dict = None,
             page=1, size=20, **kwargs):
+        # rounded to a day, so the same query is sent during a day, and elastic request cache is used
         end_date = (self.now - timedelta(
-                days=settings.LAST_CHANCE_END_DATE_THRESHOLD)
-            ).strftime(DATETIME_FORMAT)
+                days=int(settings.LAST_CHANCE_END_DATE_THRESHOLD))
+            ).strftime('%Y-%m-%d 00:00:00')
         if not customer_id:
             customer_id = 'BLANK'
         offset = self.__get_from_index(page=page, size=size)
         query = {
             "query": {
                 "bool": {
-                    "must": [
+                    "filter": [
                         {
                             "term": {
                                 "customer_id": customer_id
                             }
                         },
                         {
-                            "range": {
-                                "created_at": {"lt": end_date}
+                            # see updateStock(), ProductEntry.is_low_stock
+                            "term": {
+                                "is_low_stock": True
                             }
                         },
                         {
                             "range": {
-                                "sizes.qty": {
-                                    "lte": settings.LAST_CHANCE_STOCK_THRESHOLD,
-                                    "gt": 0
-                                }
+                                "created_at": {"lt": end_date}
                             }
                         }
                     ]
                 }
             },
             "aggs": {
-                "sum_of_order_score": {
-                    "sum": {
-                        "field": "order_score"
-                    }
-                },
-                "sum_of_question_score": {
-                    "sum": {
-                        "field": "question_score"
-                    }
-                },
-                "sum_of_tracking_score": {
-                    "sum": {
-                        "field": "tracking_score"
-                    }
-                },
-                "sum_sort": {
-                    "bucket_sort": {
-                        "sort": [
-                            {
-                                "sum_of_question_score": {"order": "desc"}
-                            },
-                            {
-                                "sum_of_order_score": {"order": "desc"}
-                            },
-                            {
-                                "sum_of_tracking_score": {"order": "desc"}
+                "product_type_terms": {
+                    "terms": {
+                        "field": "product_size_attribute",
+                        "size": self.__class__.__LAST_CHANCE_PRODUCT_TYPES_LIMIT
+                    },
+                    "aggs": {
+                        "sum_of_order_score": {
+                            "sum": {
+                                "field": "order_score"
                             }
-                        ]
+                        },
+                        "sum_of_question_score": {
+                            "sum": {
+                                "field": "question_score"
+                            }
+                        },
+                        "sum_of_tracking_score": {
+                            "sum": {
+                                "field": "tracking_score"
+                            }
+                        },
+                        "sum_sort": {
+                            "bucket_sort": {
+                                "sort": [
+                                    {
+                                        "sum_of_question_score": {"order": "desc"}
+                                    },
+                                    {
+                                        "sum_of_order_score": {"order": "desc"}
+                                    },
+                                    {
+                                        "sum_of_tracking_score": {"order": "desc"}
+                                    }
+                                ],
+                                "from": offset,
+                                "size": size
+                            }
+                        }
                     }
                 }
             },
@@ -719,7 +820,7 @@ class ScoredProduct(object):
         }
 
         if gender and gender.strip().lower() != 'unisex':
-            query['query']['bool']['must'].append(
+            query['query']['bool']['filter'].append(
                 {
                     "terms": {
                         "gender": [gender]
@@ -728,19 +829,24 @@ class ScoredProduct(object):
             )
 
         response = self.__elastic.post_search(query)
-        bucket = response['aggregations']['product_type_terms']['buckets'][offset:offset + size]
-
-        product_type_model = ProductType()
-        product_types = product_type_model.filter_by_product_type_name([item['key'] for item in bucket])
-        dictionary = dict([(item['key'], item['doc_count']) for item in bucket])
-        return [{
-            'id': int(item['product_type_id']),
-            'name': item['product_type_name'],
-            'count': dictionary.get(item['product_type_name']),
-            'image': {
-                'src': item['image'], 'title': item['product_type_name']
-            }
-        } for item in product_types]
+        buckets = response['aggregations']['product_type_terms']['buckets']
+
+        product_types = self.__get_root_product_types()
+        result = []
+        for bucket in buckets:
+            item = product_types.get(str(bucket['key']).lower())
+            if not item:
+                continue
+
+            result.append({
+                'id': int(item['product_type_id']),
+                'name': item['product_type_name'],
+                'count': bucket['doc_count'],
+                # already converted to {'src': ..., 'title': ...} by DynamoModel.convert_item()
+                'image': item['image']
+            })
+
+        return result
 
     def get(
             self,
@@ -785,22 +891,11 @@ class ScoredProduct(object):
 
         return item
 
-    def get_categories_by_gender(
-            self, gender: str, customer_id: str = None,
-            user_defined_product_types: list = [], **kwargs):
-        if not customer_id:
-            customer_id = 'BLANK'
-        if not gender or gender.lower() == 'unisex':
-            gender = 'ladies'
-
-        categories = Category().get_by_gender(gender)
-        product_types = [item['product_type_name'] for item in categories]
-
-        # NOTE: Filter use defined products by stored categories
-        user_defined_product_types = [
-            item for item in user_defined_product_types
-            if item in product_types]
+    def __get_categories(self, gender: str) -> List[dict]:
+        return self.__CATEGORIES_CACHE.get_or_set(gender.upper(), lambda: Category().get_by_gender(gender))
 
+    def __aggregate_product_types(self, customer_id: str, gender: str, product_types: List[str]) -> List[str]:
+        """ the same ranking as stored by calculate_scores(), but calculated by scored products of the customer """
         query = {
             "query": {
                 "bool": {
@@ -875,65 +970,119 @@ class ScoredProduct(object):
         response = self.__elastic.post_search(query)
         buckets = response['aggregations']['product_type_terms']['buckets']
 
-        sorted_product_types = [item['key'] for item in buckets]
+        return [item['key'] for item in buckets]
+
+    @staticmethod
+    def __build_category_ranking(products: List[ProductEntry]) -> dict:
+        """ in stock products rollup by gender and product type, see get_categories_by_gender() """
+        rollups = {}
+        for product in products:
+            if not product.gender or not product.product_size_attribute:
+                continue
+            elif not any([int(size.qty or 0) > 0 for size in product.sizes]):
+                continue
+
+            rollup = rollups.setdefault(product.gender.upper(), {}).setdefault(product.product_size_attribute, {
+                'product_type': product.product_size_attribute,
+                'in_stock': 0,
+                'question_score': 0,
+                'order_score': 0,
+                'tracking_score': 0,
+            })
+            rollup['in_stock'] += 1
+            rollup['question_score'] += int(product.question_score or 0)
+            rollup['order_score'] += int(product.order_score or 0)
+            rollup['tracking_score'] += int(product.tracking_score or 0)
+
+        return {
+            gender: sorted(
+                gender_rollups.values(),
+                key=lambda x: (x['question_score'], x['order_score'], x['tracking_score'], x['in_stock']),
+                reverse=True
+            ) for gender, gender_rollups in rollups.items()
+        }
+
+    def get_categories_by_gender(
+            self, gender: str, customer_id: str = None,
+            user_defined_product_types: list = [], **kwargs):
+        if not customer_id:
+            customer_id = 'BLANK'
+        if not gender or gender.lower() == 'unisex':
+            gender = 'ladies'
+
+        categories = self.__get_categories(gender)
+        product_types = [item['product_type_name'] for item in categories]
+
+        # NOTE: Filter use defined products by stored categories
+        user_defined_product_types = [
+            item for item in user_defined_product_types
+            if item in product_types]
+
+        # ranking is stored by calculate_scores(), aggregation is used only until scores are calculated
+        category_ranking = CustomerStateModel(customer_id).category_ranking
+        if category_ranking is not None:
+            sorted_product_types = [
+                item['product_type'] for item in category_ranking.get(gender.upper(), [])
+                if item['product_type'] in product_types
+            ]
+        else:
+            sorted_product_types = self.__aggregate_product_types(customer_id, gender, product_types)
+
         # NOTE: Re-sort whether it liked by customer or not
         sorted_product_types = user_defined_product_types +\
             [item for item in sorted_product_types if item not in user_defined_product_types]
 
+        positions = {}
+        for position, product_type in enumerate(sorted_product_types):
+            positions.setdefault(product_type, position)
+
         return sorted(
             categories,
-            key=lambda x: sorted_product_types.index(
-                x['product_type_name']) if x['product_type_name'] in sorted_product_types
-                else len(categories))
+            key=lambda x: positions.get(x['product_type_name'], len(categories)))
 
-    def get_complete_looks(
-            self, id, customer_id='BLANK', tier: dict=None,
-            page=1, size=20, **kwargs):
+    def get_complete_looks_query(self, product: dict, page: int = 1, size: int = 20) -> dict:
+        """ :param product: raw product data (product_size_attribute, rs_product_sub_type, gender) """
         offset = (page - 1) * size
-        item = self.get(id, customer_id=customer_id, tier=tier)
-        if item is None:
-            return []
-        product_type = item.get('product_size_attribute')
-        sub_type = item.get('rs_product_sub_type')
-        gender = item.get('gender')
-        # product_type_model = ProductType()
-        # item = product_type_model.get_root_node(product_type_name=product_type)
-
-        product_types = [
-            item['product_type_name'] for item in self.get_categories_by_gender(
-                gender, customer_id=customer_id, size=5)]
-
-        query = {
+        return {
             "query": {
                 "bool": {
                     "must": [
                         {
-                            "term": {"gender": gender}
+                            "term": {"gender": product.get('gender')}
                         },
                         {
                             "range": {"sizes.qty": {"gt": 0}}
                         },
-                        # {
-                        #     "terms": {"product_size_attribute": product_types}
-                        # },
                         {
-                            "term": {"product_size_attribute": product_type}
+                            "term": {"product_size_attribute": product.get('product_size_attribute')}
                         },
                     ],
                     "must_not": [
                         {
-                            "term": {"rs_product_sub_type": sub_type}
+                            "term": {"rs_product_sub_type": product.get('rs_product_sub_type')}
                         }
                     ],
                 }
             },
             "from": offset,
-            "size": size
+            "size": size,
+            "_source": list(self.__class__.CARD_SOURCE_FIELDS),
         }
-        response = self.elastic.post_search(query)
 
-        return self.__convert_products(response['hits'], tier=tier)['products']
+    def convert_search_hits(self, hits: dict, tier: dict = None) -> List[dict]:
+        """ :param hits: "hits" of search response """
+        return self.__convert_products(hits, tier=tier)['products']
 
+    def get_complete_looks(
+            self, id, customer_id='BLANK', tier: dict=None,
+            page=1, size=20, **kwargs):
+        item = self.get(id, customer_id=customer_id, tier=tier)
+        if item is None:
+            return []
+
+        response = self.elastic.post_search(self.get_complete_looks_query(item, page=page, size=size))
+
+        return self.convert_search_hits(response['hits'], tier=tier)
 
     def get_sizes_by_product_type(
             self, product_type: str, gender: str,
@@ -1005,7 +1154,7 @@ class ScoredProduct(object):
             product_type: str = None,
             gender: str = None,
             tier: dict = None,
-            page: int = 1, size: int = 20, **kwargs):
+            page: int = 1, size: int = 20, cursor: Optional[str] = None, **kwargs):
         offset = (page - 1) * size
         if not customer_id:
             customer_id = 'BLANK'
@@ -1033,9 +1182,8 @@ class ScoredProduct(object):
                 'term': {'gender': gender}
             })
 
-        response = self.elastic.post_search(query)
-
-        return self.__convert_products(response['hits'], tier=tier)['products']
+        result = self.__search_products(query, cursor, tier=tier)
+        return result['products'] if cursor is None else result
 
     def get_top_brands(
             self, customer_id: str = 'BLANK',
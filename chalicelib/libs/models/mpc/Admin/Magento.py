@@ -1,10 +1,10 @@
 import boto3
 import hashlib
 import json
-from requests import post
 from .....settings import settings
 from ..base import Base
 from chalicelib.libs.core.logger import Logger
+from chalicelib.libs.core.http_client import HttpClient
 
 class Magento(Base):
     table = None
@@ -51,7 +51,7 @@ class Magento(Base):
                 url = 'https://portal.runway.co.za/api/remoteAuth/customer'
                 body = {'email': email, 'password': password}
                 headers = {'Identification': 'RunwaySale::ReadAPI'}
-                r = post(url, data=body, headers=headers)
+                r = HttpClient('magento').post(url, data=body, headers=headers)
 
                 if r.status_code == 200:
                     result = json.loads(r.text)
@@ -1,5 +1,5 @@
-import requests
 from .....settings import settings
+from chalicelib.libs.core.http_client import HttpClient
 from decimal import Context as DecimalContext, ROUND_DOWN
 
 
@@ -63,10 +63,10 @@ class Products:
         return self.__dynamotbl.put_item(Item=pdata)
 
     def add_to_es(self, datadict):
-        requests.put(self.__es_index_url + '/' + datadict['sku'],
-                     json=datadict,
-                     headers=self.__headers,
-                     auth=self.__awsauth)
+        HttpClient('elastic').put(self.__es_index_url + '/' + datadict['sku'],
+                                  json=datadict,
+                                  headers=self.__headers,
+                                  auth=self.__awsauth)
 
     def prepare_product(self, datadict):
         datadict.update({'selling_price': datadict['rs_selling_price']})
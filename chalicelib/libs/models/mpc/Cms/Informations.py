@@ -1,4 +1,5 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple, Dict, Callable
+from boto3.dynamodb.conditions import Attr
 from chalicelib.settings import settings
 from chalicelib.extensions import *
 from ..base import DynamoModel, Base
@@ -308,6 +309,9 @@ class InformationModel(DynamoModel):
     PARTITION_KEY = 'PROFILE#%s'
     INFORMATIONS_SK = 'USER_INFORMATIONS'
 
+    # addresses can be changed at the same time by a customer and by sqs
+    __UPDATE_ATTEMPTS = 3
+
     __customer_id = None
 
     def __init__(self, customer_id: str):
@@ -361,8 +365,9 @@ class InformationModel(DynamoModel):
         instance = self.get_information()
         return instance.to_dict()
 
-    def get_information(self) -> Information:
-        item = super(InformationModel, self).get_item(self.INFORMATIONS_SK).get('Item', {})
+    @staticmethod
+    def __create_information(item: dict, customer_id: str) -> Tuple[Information, bool]:
+        """ returns information and flag, which means that address hashes were generated """
         addresses = item.get('addresses', [])
         flag = False
         for address in addresses:
@@ -375,13 +380,34 @@ class InformationModel(DynamoModel):
             item.get('email'),
             item.get('gender'),
             addresses,
-            self.__customer_id,
+            customer_id,
             IdentificationNumber(item.get('identification_number')) if item.get('identification_number') else None
         )
+        return instance, flag
+
+    def get_information(self) -> Information:
+        item = super(InformationModel, self).get_item(self.INFORMATIONS_SK).get('Item', {})
+        instance, flag = self.__create_information(item, self.__customer_id)
         if flag == True:
             self.insert_item(instance)
         return instance
 
+    @classmethod
+    def get_informations(cls, customer_ids: Tuple[str]) -> Dict[str, Information]:
+        """ read-only batch version of get_information(): customer_id => information """
+        items = DynamoModel(cls.TABLE_NAME).batch_get_items(tuple([{
+            'pk': cls.PARTITION_KEY % customer_id,
+            'sk': cls.INFORMATIONS_SK,
+        } for customer_id in customer_ids]))
+        items_map = {item['pk']: item for item in items}
+
+        result = {}
+        for customer_id in customer_ids:
+            item = items_map.get(cls.PARTITION_KEY % customer_id, {})
+            result[customer_id] = cls.__create_information(item, customer_id)[0]
+
+        return result
+
     def add_address_attribute(self):
         result = self.table.update_item(
             Key={
@@ -396,108 +422,95 @@ class InformationModel(DynamoModel):
         )
         return result
 
+    @staticmethod
+    def __hash_address(address: dict) -> dict:
+        if address.get('address_hash') is None:
+            address['address_hash'] = hashlib.md5(str(address).encode('utf-8')).hexdigest()
+
+        return address
+
+    def __update_addresses(self, modify: Callable[[List[dict]], List[dict]]) -> dict:
+        """
+        Addresses are read once, changed in memory by modify(addresses) and written by one request.
+        The write is conditional: if addresses have been changed after reading, everything is repeated.
+        """
+        key = {'pk': self.get_partition_key(), 'sk': self.INFORMATIONS_SK}
+        for attempt in range(1, self.__class__.__UPDATE_ATTEMPTS + 1):
+            old_addresses = (self.table.get_item(Key=key).get('Item') or {}).get('addresses')
+            addresses = modify([self.__hash_address(dict(address)) for address in old_addresses or []])
+
+            if old_addresses is None:
+                condition = Attr('addresses').not_exists() | Attr('addresses').attribute_type('NULL')
+            else:
+                condition = Attr('addresses').eq(old_addresses)
+
+            try:
+                return self.table.update_item(
+                    Key=key,
+                    UpdateExpression="SET addresses = :addresses",
+                    ConditionExpression=condition,
+                    ExpressionAttributeValues={
+                        ':addresses': addresses,
+                    },
+                    ReturnValues="UPDATED_NEW"
+                )
+            except self.table.meta.client.exceptions.ConditionalCheckFailedException as e:
+                if attempt == self.__class__.__UPDATE_ATTEMPTS:
+                    raise e
+
+    @staticmethod
+    def __set_default(addresses: List[dict], flag: str, default_address: dict) -> None:
+        for address in addresses:
+            address[flag] = address is default_address
+
     def add_addresses(self, addresses):
-        old_addresses = self.get_item()['addresses']
-
-        if old_addresses is None:
-            self.add_address_attribute()
-
-        index = -1
-        update_dict = {}
-        add_list = []
-
-        for k in range(len(addresses)):
-            isExist = False
-            address_hash = addresses[k].get('address_hash')
-            if address_hash is None:
-                addresses[k]['address_hash'] = hashlib.md5(str(addresses[k]).encode('utf-8')).hexdigest()
-            for i in range(len(old_addresses)):
-                if old_addresses[i]['address_hash'] == addresses[k]['address_hash']:
-                    update_dict[str(i)]=k
-                    isExist = True
-                    break
-            if isExist == False:
-                add_list.append(addresses[k])
-        if len(update_dict) > 0:
-            updateExpression = "SET "
-            expressionAttributeValues = {  
-            }
-            for index_in_old_addresses, index_in_addresses in update_dict.items():
-                exp = "addresses[" + index_in_old_addresses + "] = :val"+ index_in_old_addresses + ", "
-                updateExpression += exp
-                expressionAttributeValues[':val'+index_in_old_addresses] = addresses[index_in_addresses]
-            updateExpression = updateExpression[0:-2]
-
-            result = self.table.update_item(
-                Key={
-                    'pk': self.get_partition_key(),
-                    'sk': self.INFORMATIONS_SK
-                },
-                UpdateExpression=updateExpression,
-                ExpressionAttributeValues=expressionAttributeValues,
-                ReturnValues="UPDATED_NEW"
-            )   
-        if len(add_list) > 0:
-            result = self.table.update_item(
-                Key={
-                    'pk': self.get_partition_key(),
-                    'sk': self.INFORMATIONS_SK
-                },
-                UpdateExpression="SET addresses = list_append(addresses, :val)",
-                ExpressionAttributeValues={
-                    ':val': add_list
-                },
-                ReturnValues="UPDATED_NEW"
-            )
-        return result
+        for address in addresses:
+            self.__hash_address(address)
+
+        def __modify(old_addresses: List[dict]) -> List[dict]:
+            # existed addresses are replaced, new are appended
+            indexes = {address['address_hash']: index for index, address in enumerate(old_addresses)}
+            for address in addresses:
+                if address['address_hash'] in indexes:
+                    old_addresses[indexes[address['address_hash']]] = address
+                else:
+                    old_addresses.append(address)
+
+            return old_addresses
+
+        return self.__update_addresses(__modify)
+
+    def replace_addresses(self, addresses: List[dict]):
+        for address in addresses:
+            self.__hash_address(address)
+
+        return self.__update_addresses(lambda old_addresses: list(addresses))
 
     def add_address(self, address):
-        address_hash = address.get('address_hash')
-        if address_hash is None:
-            address['address_hash'] = hashlib.md5(str(address).encode('utf-8')).hexdigest()
-        old_addresses = self.get_item()['addresses']
-        if old_addresses is None:
-            self.add_address_attribute()
-            old_addresses = []
-        if len(old_addresses) == 0:
-            address['is_default_billing']=True #if addresses is empty, new address should be default billing address.
-            address['is_default_shipping']=True#if addresses is empty, new address should be default shipping address.
-        index = -1
-        for i in range(len(old_addresses)):
-            if old_addresses[i]['address_hash'] == address['address_hash']:
-                index = i
-                break
-        if index == -1:
-            result = self.table.update_item(
-                Key={
-                    'pk': self.get_partition_key(),
-                    'sk': self.INFORMATIONS_SK
-                },
-                UpdateExpression="SET addresses = list_append(addresses, :val)",
-                ExpressionAttributeValues={
-                    ':val': [address]
-                },
-                ReturnValues="UPDATED_NEW"
-            )
-            index = len(old_addresses)
-        else:
-            result = self.table.update_item(
-                Key={
-                    'pk': self.get_partition_key(),
-                    'sk': self.INFORMATIONS_SK
-                },
-                UpdateExpression="SET addresses[" + str(index) + "] = :val",
-                ExpressionAttributeValues={
-                    ':val': address
-                },
-                ReturnValues="UPDATED_NEW"
-            )
-        if address['is_default_billing']:
-            self.__reset_default_billing(index)
-        if address['is_default_shipping']:
-            self.__reset_default_shipping(index)
+        self.__hash_address(address)
+
+        def __modify(old_addresses: List[dict]) -> List[dict]:
+            new_address = dict(address)
+
+            # if addresses are empty, new address should be default billing and shipping address.
+            if not old_addresses:
+                new_address['is_default_billing'] = True
+                new_address['is_default_shipping'] = True
+
+            for index in range(len(old_addresses)):
+                if old_addresses[index]['address_hash'] == new_address['address_hash']:
+                    old_addresses[index] = new_address
+                    break
+            else:
+                old_addresses.append(new_address)
+
+            for flag in ('is_default_billing', 'is_default_shipping'):
+                if new_address.get(flag):
+                    self.__set_default(old_addresses, flag, new_address)
+
+            return old_addresses
 
-        return result  
+        return self.__update_addresses(__modify)
 
     def get_address(self, address_hash):
         addresses = self.get_item()['addresses']
@@ -507,79 +520,23 @@ class InformationModel(DynamoModel):
         raise Exception('There is no address.')
 
     def delete_address(self, address_hash):
-        addresses = self.get_item()['addresses']
-        for index in range(len(addresses)):
-            if addresses[index]['address_hash'] == address_hash:
-                query = "REMOVE addresses[%d]" % (index)
-                result = self.table.update_item(
-                    Key={
-                        'pk': self.get_partition_key(),
-                        'sk': self.INFORMATIONS_SK
-                    },
-                    UpdateExpression=query
-                )
-                if addresses[index]['is_default_billing']:
-                    self.__reset_default_billing(0) #if default billing address was removed, the first address is set as default billing address
-                if addresses[index]['is_default_shipping']:
-                    self.__reset_default_shipping(0) #if default billing address was removed, the first address is set as default billing address
-                return result
-        raise Exception('There is no address.')
-
-    def __reset_default_billing(self, index):
-        addresses = self.get_item()['addresses']
-        if addresses is None or len(addresses) <= index:
-            return
-        updateExpression = "SET "
-        expressionAttributeValues = {  
-        }
-        for k in range(len(addresses)):
-            if k != index:
-                exp = "addresses[" + str(k) + "].is_default_billing = :false_value" + ", "
-                updateExpression += exp
-                expressionAttributeValues[':false_value'] = False
+        def __modify(old_addresses: List[dict]) -> List[dict]:
+            for index in range(len(old_addresses)):
+                if old_addresses[index]['address_hash'] == address_hash:
+                    removed_address = old_addresses.pop(index)
+                    break
             else:
-                exp = "addresses[" + str(k) + "].is_default_billing = :true_value" + ", "
-                updateExpression += exp
-                expressionAttributeValues[':true_value'] = True
-        updateExpression = updateExpression[0:-2]
+                raise Exception('There is no address.')
 
-        self.table.update_item(
-            Key={
-                'pk': self.get_partition_key(),
-                'sk': self.INFORMATIONS_SK
-            },
-            UpdateExpression=updateExpression,
-            ExpressionAttributeValues=expressionAttributeValues,
-            ReturnValues="UPDATED_NEW"
-        ) 
-    
-    def __reset_default_shipping(self, index):
-        addresses = self.get_item()['addresses']
-        if addresses is None or len(addresses) <= index:
-            return
-        updateExpression = "SET "
-        expressionAttributeValues = {  
-        }
-        for k in range(len(addresses)):
-            if k != index:
-                exp = "addresses[" + str(k) + "].is_default_shipping = :false_value" + ", "
-                updateExpression += exp
-                expressionAttributeValues[':false_value'] = False
-            else:
-                exp = "addresses[" + str(k) + "].is_default_shipping = :true_value" + ", "
-                updateExpression += exp
-                expressionAttributeValues[':true_value'] = True
-        updateExpression = updateExpression[0:-2]
+            # if default address was removed, the first address is set as default address
+            for flag in ('is_default_billing', 'is_default_shipping'):
+                if removed_address.get(flag) and old_addresses:
+                    self.__set_default(old_addresses, flag, old_addresses[0])
+
+            return old_addresses
+
+        return self.__update_addresses(__modify)
 
-        self.table.update_item(
-            Key={
-                'pk': self.get_partition_key(),
-                'sk': self.INFORMATIONS_SK
-            },
-            UpdateExpression=updateExpression,
-            ExpressionAttributeValues=expressionAttributeValues,
-            ReturnValues="UPDATED_NEW"
-        ) 
 
 class InformationService(Base):
     def __init__(self):
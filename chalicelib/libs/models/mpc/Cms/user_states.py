@@ -2,7 +2,7 @@
 So we will use a single partition key for profile.
 But let's use a temp name for now.
 """
-from typing import List, Tuple, Union
+from typing import List, Tuple, Union, Optional
 from warnings import warn
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
@@ -18,6 +18,8 @@ class CustomerStateEntry(object):
     personalize_in_progress: bool = False
     clicked_at: str = None
     personalize_in_progress: bool = False
+    # {GENDER: [{product_type, in_stock, question_score, order_score, tracking_score}, ...]}, best first
+    category_ranking: dict = None
 
     def __init__(
             self,
@@ -25,9 +27,11 @@ class CustomerStateEntry(object):
             personalized_at: str = None,
             personalize_in_progress: bool = False,
             clicked_at: str = None,
+            category_ranking: dict = None,
             **kwargs):
         self.personalized_at = personalized_at
         self.clicked_at = clicked_at
+        self.category_ranking = category_ranking
 
     @property
     def is_personalized(self) -> bool:
@@ -125,6 +129,21 @@ class CustomerStateModel(DynamoModel):
     def clicked_now(self):
         self.clicked_at = get_mpc_datetime_now()
 
+    @property
+    def category_ranking(self) -> Optional[dict]:
+        """ None, if scores are not calculated yet """
+        return self.state.category_ranking
+
+    @category_ranking.setter
+    def category_ranking(self, value: dict):
+        if not isinstance(value, dict):
+            raise Exception("Unknown format - %s" % type(value))
+        status, msg = self.set_attribute('category_ranking', value)
+        if status:
+            self.state.category_ranking = value
+        else:
+            warn(msg)
+
     def set_attribute(self, attr_name: str, value) -> Tuple[bool, str]:
         return self.set_attributes(**{attr_name: value})
 
@@ -1,12 +1,13 @@
 import math
-from typing import Optional, Union, List, Tuple
+from typing import Optional, Union, List, Tuple, Dict
 from datetime import datetime, timedelta
 from chalicelib.extensions import *
 from chalicelib.settings import settings
-from chalicelib.libs.core.elastic import Elastic
+from chalicelib.libs.core.elastic import Elastic, apply_search_after, get_search_after_cursor
 from .product_visit_logs import ProductVisitLog
 from .ProductSizeSort import ProductSizeSort
-from ..ml.product_entry import ProductEntry
+from .ProductMapping import NORMALIZED_FIELDS, NORMALIZED_SUB_FIELD, AUTOCOMPLETE_FIELDS, AUTOCOMPLETE_SUB_FIELD
+from ..ml.product_entry import ProductEntry, CURRENT_PRICE_SCRIPT
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -232,6 +233,28 @@ class ProductSearchCriteria(object):
 class Product(object):
     # @todo : refactoring ~ get_all(criteria, limit, offset)
 
+    # "card" projection - only fields, which are used by __convert_item(), are loaded by listing queries
+    CARD_SOURCE_FIELDS = (
+        'portal_config_id',
+        'rs_sku',
+        'event_code',
+        'product_name',
+        'product_description',
+        'rs_selling_price',
+        'discount',
+        'current_price',
+        'product_size_attribute',
+        'rs_product_sub_type',
+        'gender',
+        'manufacturer',
+        'rs_colour',
+        'sizes.size',
+        'sizes.qty',
+        'sizes.rs_simple_sku',
+        'sizes.portal_simple_id',
+        'images.s3_filepath',
+    )
+
     def __init__(self):
         self.__elastic = Elastic(
             settings.AWS_ELASTICSEARCH_PRODUCTS,
@@ -285,37 +308,51 @@ class Product(object):
         return self.__convert_products(response)
 
     def __makeESFilterFromCustomFilter(self, custom_filters: Optional[dict]):
+        # filter clauses are not scored and are cached by elastic, so only text search is in "must"
         ret = {}
-        ret['bool']={}
-        ret['bool']['must']=list()
+        ret['bool'] = {}
+        ret['bool']['must'] = list()
+        ret['bool']['filter'] = list()
         for key, value in custom_filters.items() if custom_filters else []:
             key = self.__class__.__convert_filter(key)
             if(key == "invalid_name"):
                 continue
             must_item = {}
+            filter_item = {}
             if key == 'rs_selling_price':
-                must_item['range'] = {}
-                must_item['range'][key] = {}
-                must_item['range'][key]['gte'] = value[0]
-                must_item['range'][key]['lte'] = value[1]
+                # ranges are applied to the effective (discounted) price, as it is shown and sorted
+                filter_item['range'] = {}
+                filter_item['range']['current_price'] = {}
+                filter_item['range']['current_price']['gte'] = value[0]
+                filter_item['range']['current_price']['lte'] = value[1]
             elif key == 'search_query':
                 value = str(value or '').strip()
                 if value:
                     must_item['bool'] = {
                         "should": [
-                            {"match_phrase_prefix": {"product_name": value}},
-                            # {"match_phrase_prefix": {"product_description": value}} When search_query is 'Dress', this returns some socks and shoes
-                            {"match_phrase_prefix": {"product_size_attribute": value}}
+                            {"match": {field + '.' + AUTOCOMPLETE_SUB_FIELD: {"query": value, "operator": "and"}}}
+                            # product_description is not used: when search_query is 'Dress', this returns some socks and shoes
+                            for field in AUTOCOMPLETE_FIELDS
                         ]
                     }
             elif key == 'created_at':
                 if value == 'true':
                     from_date = (datetime.now() - timedelta(days=settings.NEW_PRODUCT_THRESHOLD)).strftime("%Y-%m-%d %H:%M:%S")
-                    must_item['range'] = {}
-                    must_item['range'][key] = {}
-                    must_item['range'][key]['gte'] = from_date
+                    filter_item['range'] = {}
+                    filter_item['range'][key] = {}
+                    filter_item['range'][key]['gte'] = from_date
                 else:
                     continue
+            elif key in NORMALIZED_FIELDS:
+                values = value if isinstance(value, list) else [value]
+                if values:
+                    filter_item['terms'] = {}
+                    filter_item['terms'][key + '.' + NORMALIZED_SUB_FIELD] = [str(_value).lower() for _value in values]
+            elif key in ('portal_config_id', 'rs_sku'):
+                values = value if isinstance(value, list) else [value]
+                if values:
+                    filter_item['terms'] = {}
+                    filter_item['terms'][key] = values
             else:
                 if isinstance(value, list):
                     must_item['bool'] = {}
@@ -331,6 +368,8 @@ class Product(object):
 
             if must_item:
                 ret['bool']['must'].append(must_item)
+            if filter_item:
+                ret['bool']['filter'].append(filter_item)
 
         return ret
 
@@ -340,8 +379,10 @@ class Product(object):
         sorts: dict,
         tier: dict,
         page: int,
-        size: int
+        size: int,
+        cursor: Optional[str] = None
     ):
+        """ :param cursor: see apply_search_after(), page is ignored in cursor mode """
         filters = self.__makeESFilterFromCustomFilter(custom_filters)
         fromindex = (int(page) - 1) * int(size)
         if fromindex < 0:
@@ -355,15 +396,33 @@ class Product(object):
                 self.__class__.__convert_sort_filter(column, direction)
                 for column, direction in sorts.items()
             ],
+            "_source": list(self.__class__.CARD_SOURCE_FIELDS),
         }
 
+        if cursor is None:
+            response = self.__elastic.post_search(query)['hits']
+            return self.__convert_products(response, tier=tier)
+
+        query = apply_search_after(query, cursor, {'rs_sku': {'order': 'asc'}})
         response = self.__elastic.post_search(query)['hits']
-        return self.__convert_products(response, tier=tier)
+        result = self.__convert_products(response, tier=tier)
+        result['cursor'] = get_search_after_cursor(response, query['size'])
+        return result
 
     def update(self, config_sku, data):
         json_data = {
             "doc": data
         }
+        if 'rs_selling_price' in data or 'discount' in data:
+            # stored effective price must be recalculated with the final values
+            json_data = {
+                "script": {
+                    "lang": "painless",
+                    "source": "ctx._source.putAll(params.doc); " + CURRENT_PRICE_SCRIPT,
+                    "params": {"doc": data}
+                }
+            }
+
         response = self.__elastic.update_data(config_sku, json_data)
         return response
 
@@ -404,6 +463,9 @@ class Product(object):
     @staticmethod
     def __convert_item_calculate_prices(item) -> tuple:
         original_price = float(item['rs_selling_price'] or 0)
+        if item.get('current_price') is not None:
+            return original_price, float(item['current_price'])
+
         discount = float(item['discount'] or 0)
         current_price = original_price - original_price * discount / 100
         return original_price, current_price
@@ -415,6 +477,8 @@ class Product(object):
         if isinstance(tier, dict) and not tier.get('is_neutral'):
             fbucks = math.ceil(item.get('current_price', current_price) * tier['discount_rate'] / 100)
 
+        # see CARD_SOURCE_FIELDS
+        images = item.get('images') or []
         result = {
             'id': item['portal_config_id'],
             'sku': item['rs_sku'],
@@ -441,7 +505,7 @@ class Product(object):
                 'simple_id': size['portal_simple_id'],
             } for size in item.get('sizes', [])],
             'image': {
-                'src': item['images'][0]['s3_filepath'] if len(item['images']) > 0 else 'https://www.supplyforce.com/ASSETS/WEB_THEMES//ECOMMERCE_STD_TEMPLATE_V2/images/NoImage.png',
+                'src': images[0]['s3_filepath'] if len(images) > 0 else 'https://www.supplyforce.com/ASSETS/WEB_THEMES//ECOMMERCE_STD_TEMPLATE_V2/images/NoImage.png',
                 'title': item['product_size_attribute'],
             }
         }
@@ -484,20 +548,8 @@ class Product(object):
             'newin': {'created_at': {'order': direction}},
             '_score': {'_score': {'order': direction}},
             'search_query': {'search_query': {'order': direction}},
-            'price': {
-                '_script': {
-                    "type": "number",
-                    "script": {
-                        "lang": "painless",
-                        # see __convert_item_calculate_prices()
-                        "source": "{price} - {price} * {discount} / 100".format(**{
-                            'price': "doc['rs_selling_price'].value",
-                            'discount': "doc['discount'].value"
-                        }),
-                    },
-                    "order": direction
-                }
-            }
+            # effective price is stored on indexing, see get_current_price()
+            'price': {'current_price': {'order': direction}}
         }
 
         if column_name not in sort_map.keys():
@@ -573,7 +625,7 @@ class Product(object):
                 },
                 "price": {
                     "terms": {
-                        "field": "rs_selling_price",
+                        "field": "current_price",
                         "size": 100000
                     }
                 },
@@ -731,7 +783,7 @@ class Product(object):
                 },
                 "price": {
                     "terms": {
-                        "field": "rs_selling_price",
+                        "field": "current_price",
                         "size": 100000
                     }
                 },
@@ -873,6 +925,38 @@ class Product(object):
         result = [self.__convert_item(data['_source']) if convert else data['_source'] for data in response_items]
         return tuple(result)
 
+    def getSimpleSkusIndex(self, simple_skus: Union[Tuple[str], List[str]]) -> Dict[str, Tuple[dict, dict]]:
+        """
+        simple_sku => (converted product, its size) for existed products.
+        Products are loaded by one request with CARD_SOURCE_FIELDS only.
+        """
+        simple_skus = tuple(dict.fromkeys(simple_skus))
+        if not simple_skus:
+            return {}
+
+        response_items = self.__elastic.post_search({
+            'query': {
+                'bool': {
+                    'filter': {
+                        'terms': {'sizes.rs_simple_sku': simple_skus}
+                    }
+                }
+            },
+            # every product has at least one of required simple skus
+            'size': len(simple_skus),
+            '_source': list(self.__class__.CARD_SOURCE_FIELDS),
+        }).get('hits', {}).get('hits', []) or []
+
+        index = dict.fromkeys(simple_skus)
+        result = {}
+        for data in response_items:
+            product = self.__convert_item(data['_source'])
+            for size in product['sizes']:
+                if size['simple_sku'] in index:
+                    result[size['simple_sku']] = (product, size)
+
+        return result
+
     def getRawDataBySimpleSku(self, simple_sku: str, convert=True) -> Optional[dict]:
         rows = self.getRawDataBySimpleSkus([simple_sku], convert)
         return rows[0] if rows else None
@@ -890,15 +974,14 @@ class Product(object):
             return None
 
     def get_raw_data_by_skus(self, config_skus: List[str], convert=False) -> List[dict]:
+        """ Loads products by one _mget request in the order of config_skus, not existed products are skipped """
         try:
-            response = self.__elastic.post_search({
-                'query': {
-                    'terms': {'rs_sku': config_skus}
-                }
-            }).get('hits', {}).get('hits', [{}])
+            config_skus = list(dict.fromkeys([str(config_sku) for config_sku in config_skus]))
+            products_map = self.__elastic.mget_data(tuple(config_skus))
+            response = [products_map[config_sku] for config_sku in config_skus if config_sku in products_map]
             if convert:
-                return [self.__convert_item(item['_source']) for item in response]
+                return [self.__convert_item(item) for item in response]
             else:
-                return [item['_source'] for item in response]
+                return response
         except:
             return []
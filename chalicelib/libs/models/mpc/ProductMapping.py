@@ -1,4 +1,66 @@
+# Filter values are compared with normalized (lowercase, ascii folded) keyword sub-fields,
+# search text - with edge-ngram sub-fields. Sub-fields are filled by elastic on indexing.
+NORMALIZED_SUB_FIELD = 'normalized'
+AUTOCOMPLETE_SUB_FIELD = 'autocomplete'
+
+# fields, which have NORMALIZED_SUB_FIELD
+NORMALIZED_FIELDS = (
+    'manufacturer',
+    'product_size_attribute',
+    'rs_product_sub_type',
+    'rs_colour',
+    'gender',
+    'sizes.size',
+)
+
+# fields, which have AUTOCOMPLETE_SUB_FIELD
+AUTOCOMPLETE_FIELDS = (
+    'product_name',
+    'product_size_attribute',
+)
+
+analysis = {
+    "normalizer": {
+        "lowercase_normalizer": {
+            "type": "custom",
+            "filter": ["lowercase", "asciifolding"]
+        }
+    },
+    "filter": {
+        "autocomplete_filter": {
+            "type": "edge_ngram",
+            "min_gram": 1,
+            "max_gram": 20
+        }
+    },
+    "analyzer": {
+        "autocomplete": {
+            "type": "custom",
+            "tokenizer": "standard",
+            "filter": ["lowercase", "asciifolding", "autocomplete_filter"]
+        },
+        "autocomplete_search": {
+            "type": "custom",
+            "tokenizer": "standard",
+            "filter": ["lowercase", "asciifolding"]
+        }
+    }
+}
+
+_normalized_keyword = {
+    "type": "keyword",
+    "fields": {
+        NORMALIZED_SUB_FIELD: {"type": "keyword", "normalizer": "lowercase_normalizer"}
+    }
+}
+
+_autocomplete = {"type": "text", "analyzer": "autocomplete", "search_analyzer": "autocomplete_search"}
+
+
 mapping = {
+    "settings": {
+        "analysis": analysis
+    },
     "mappings": {
         "products": {
             "properties": {
@@ -7,11 +69,17 @@ mapping = {
                 "event_code": {"type": "keyword"},
 
                 # config attributes 1
-                "manufacturer": {"type": "keyword"},
-                "product_size_attribute": {"type": "keyword"},  # product type name
-                "rs_product_sub_type": {"type": "keyword"},
-                "rs_colour": {"type": "keyword"},
-                "gender": {"type": "keyword"},
+                "manufacturer": _normalized_keyword,
+                "product_size_attribute": {  # product type name
+                    **_normalized_keyword,
+                    "fields": {
+                        **_normalized_keyword["fields"],
+                        AUTOCOMPLETE_SUB_FIELD: _autocomplete
+                    }
+                },
+                "rs_product_sub_type": _normalized_keyword,
+                "rs_colour": _normalized_keyword,
+                "gender": _normalized_keyword,
                 "season": {"type": "keyword"},
 
                 # config attributes 2
@@ -24,13 +92,19 @@ mapping = {
                 "sticker_id": {"type": "long"},
 
                 # name
-                "product_name": {"type": "text"},
+                "product_name": {
+                    "type": "text",
+                    "fields": {
+                        AUTOCOMPLETE_SUB_FIELD: _autocomplete
+                    }
+                },
                 "product_description": {"type": "text"},
 
                 # prices
                 "freebie": {"type": "boolean"},
                 "rs_selling_price": {"type": "float"},
                 "discount": {"type": "float"},  # percent value
+                "current_price": {"type": "float"},  # see get_current_price()
 
                 # datetime
                 "created_at": {"type": "date", "format": "yyyy-MM-dd HH:mm:ss||date_hour_minute_second_millis"},
@@ -39,7 +113,7 @@ mapping = {
                 # simples
                 "sizes": {
                     "properties": {
-                        "size": {"type": "keyword"},
+                        "size": _normalized_keyword,
                         "qty": {"type": "integer"},
                         "rs_simple_sku": {"type": "keyword"},
                         "portal_simple_id": {"type": "integer"}
@@ -184,6 +258,7 @@ tracking_user_action_product_snapshot = {
 
 
 scored_products_mapping = {
+    "settings": mapping["settings"],
     "mappings": {
         "scored_products": {
             "properties": {
@@ -191,7 +266,10 @@ scored_products_mapping = {
                 'question_score': {'type': 'float'},
                 'order_score': {'type': 'float'},
                 'tracking_score': {'type': 'float'},
+                'total_score': {'type': 'float'},
+                'percentage_score': {'type': 'float'},
                 **mapping['mappings']['products']['properties'],
+                'is_low_stock': {'type': 'boolean'},
                 'views': {'type': 'integer'},
                 'clicks': {'type': 'integer'},
                 'visits': {'type': 'integer'},
@@ -1,6 +1,9 @@
+import time
 import uuid
 import json
 import boto3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional, List
 from datetime import datetime
 from boto3.dynamodb.conditions import Key, Attr
@@ -35,6 +38,19 @@ class DynamoModel(object):
     AWS_REGION = settings.AWS_DYNAMODB_DEFAULT_REGION
     PARTITION_KEY = ''
 
+    BATCH_GET_CHUNK_SIZE = 100  # BatchGetItem limit
+    BATCH_GET_MAX_ATTEMPTS = 5
+    BATCH_GET_BACKOFF_SECONDS = 0.05
+
+    # shared by all models: threads of the pool are kept between calls (and warm lambda invocations),
+    # so their resources are created once
+    BATCH_GET_POOL_SIZE = 8
+    __executor: Optional[ThreadPoolExecutor] = None
+    __executor_lock = threading.Lock()
+
+    # resources of worker threads: default session is not thread-safe, but a new session is slow to create
+    __thread_resources = threading.local()
+
     def __init__(self, table_name):
         if table_name is None:
             raise NotImplementedError('table_name is required.')
@@ -126,6 +142,29 @@ class DynamoModel(object):
         )
         return tuple(response['Items'])
 
+    def find_page(
+        self,
+        sk_condition=None,
+        limit: int = 100,
+        start_key: Optional[dict] = None,
+        scan_forward: bool = True
+    ) -> Tuple[Tuple[dict], Optional[dict]]:
+        """ one page of partition items and the key to continue from (None, when there are no more items) """
+        key_condition = Key('pk').eq(self.get_partition_key())
+        if sk_condition is not None:
+            key_condition = key_condition & sk_condition
+
+        params = {
+            'KeyConditionExpression': key_condition,
+            'Limit': limit,
+            'ScanIndexForward': scan_forward,
+        }
+        if start_key:
+            params['ExclusiveStartKey'] = start_key
+
+        response = self.table.query(**params)
+        return tuple(response.get('Items', [])), response.get('LastEvaluatedKey')
+
     def get_item(self, sk):
         response = self.table.get_item(Key={
             'pk': self.get_partition_key(),
@@ -138,6 +177,81 @@ class DynamoModel(object):
         response = self.get_item(item_id)
         return response.get('Item') if response else None
 
+    def __get_thread_resource(self):
+        dynamodb = getattr(self.__class__.__thread_resources, 'dynamodb', None)
+        if dynamodb is None:
+            dynamodb = boto3.session.Session().resource('dynamodb', region_name=self.AWS_REGION)
+            self.__class__.__thread_resources.dynamodb = dynamodb
+
+        return dynamodb
+
+    @staticmethod
+    def __get_executor() -> ThreadPoolExecutor:
+        with DynamoModel.__executor_lock:
+            if DynamoModel.__executor is None:
+                DynamoModel.__executor = ThreadPoolExecutor(max_workers=DynamoModel.BATCH_GET_POOL_SIZE)
+
+            return DynamoModel.__executor
+
+    def __batch_get_chunks_in_thread(self, chunks: List[List[dict]]) -> List[dict]:
+        dynamodb = self.__get_thread_resource()
+        return [item for chunk in chunks for item in self.__batch_get_chunk(chunk, dynamodb)]
+
+    def __batch_get_chunk(self, keys: List[dict], dynamodb) -> List[dict]:
+        request_items = {self.TABLE_NAME: {'Keys': keys}}
+
+        result = []
+        for attempt in range(self.BATCH_GET_MAX_ATTEMPTS):
+            if attempt > 0:
+                # unprocessed keys are returned, when table capacity is exceeded
+                time.sleep(self.BATCH_GET_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            result.extend(response.get('Responses', {}).get(self.TABLE_NAME, []))
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                return result
+
+        raise Exception('{} unable to get {} items after {} attempts!'.format(
+            self.batch_get_items.__qualname__,
+            len(request_items[self.TABLE_NAME]['Keys']),
+            self.BATCH_GET_MAX_ATTEMPTS
+        ))
+
+    def batch_get_items(self, keys: Tuple[dict], max_workers: int = 1) -> Tuple[dict]:
+        """
+        Loads items by {'pk': ..., 'sk': ...} keys with BatchGetItem requests.
+        Found items are returned in the order of keys, not existed items are skipped.
+        """
+        unique_keys = list(dict.fromkeys([(str(key['pk']), str(key['sk'])) for key in keys]))
+        chunks = [
+            [{'pk': pk, 'sk': sk} for pk, sk in unique_keys[i:i + self.BATCH_GET_CHUNK_SIZE]]
+            for i in range(0, len(unique_keys), self.BATCH_GET_CHUNK_SIZE)
+        ]
+
+        if max_workers > 1 and len(chunks) > 1:
+            # not more than max_workers threads of the shared pool are used by the call
+            workers_count = min(max_workers, len(chunks))
+            chunks_items = list(self.__get_executor().map(
+                self.__batch_get_chunks_in_thread,
+                [chunks[i::workers_count] for i in range(workers_count)]
+            ))
+        else:
+            # default session, as for other requests of the model
+            dynamodb = boto3.resource('dynamodb', region_name=self.AWS_REGION)
+            chunks_items = [self.__batch_get_chunk(chunk, dynamodb) for chunk in chunks]
+
+        items_map = {(item['pk'], item['sk']): item for chunk_items in chunks_items for item in chunk_items}
+        return tuple([items_map[key] for key in unique_keys if key in items_map])
+
+    def find_items(self, item_ids: Tuple[str], max_workers: int = 1) -> Tuple[dict]:
+        """ the same as find_item(), but loads many items of the partition by BatchGetItem requests """
+        return self.batch_get_items(
+            tuple([{'pk': self.get_partition_key(), 'sk': item_id} for item_id in item_ids]),
+            max_workers=max_workers
+        )
+
     def put_item(self, item_id: str, item_data: dict) -> None:
         """ the same as insert_data(), but throws exceptions """
         data = {}
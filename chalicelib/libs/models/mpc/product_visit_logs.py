@@ -1,6 +1,5 @@
 import boto3
 from datetime import datetime, timedelta
-from collections import deque
 from boto3.dynamodb.conditions import Key, Attr
 from ....settings import settings
 from .base import DynamoModel
@@ -10,7 +9,11 @@ class ProductVisitLog(DynamoModel):
     TABLE_NAME = settings.AWS_DYNAMODB_CMS_TABLE_NAME
     PARTITION_KEY = 'PROFILE#%s'
     GUEST_USER_PARTITION_KEY = 'GUEST#%s'
-    SORT_KEY = 'PRODUCT_VISIT_LOG'
+    # Every visit is stored as a separate item "PRODUCT_VISIT_LOG#<visited at>", so a visit is a single put.
+    # Old visits are removed by DynamoDB TTL, which should be enabled for TTL_ATTRIBUTE in the table.
+    SORT_KEY_PREFIX = 'PRODUCT_VISIT_LOG#'
+    TTL_ATTRIBUTE = 'expires_at'
+    READ_RESERVE_FACTOR = 3
     __session_id = None
     __customer_id = None
 
@@ -47,61 +50,54 @@ class ProductVisitLog(DynamoModel):
     def customer_id(self, value):
         self.__customer_id = value
 
-    def get_item(self, **kwargs):
-        item = self.table.get_item(
-            Key={
-                'pk': self.get_partition_key(),
-                'sk': self.SORT_KEY
-            }
-        )
-        return item.get('Item', )
+    def __get_sort_key(self, visited_at: str) -> str:
+        return self.SORT_KEY_PREFIX + visited_at
 
     def get_logs(self, omit=None):
-        item = self.get_item()
-        if item is None:
-            return []
-        else:
-            logs = item.get('logs', [])
-            from_date = (datetime.now() - timedelta(days=settings.PRODUCT_VISIT_LOG_THRESHOLD)).strftime("%Y-%m-%d %H:%M:%S")
-            logs = [log for log in logs if log['visited_at'] > from_date]
-            if omit is None:
-                return logs
-            else:
-                return [log for log in logs if log.get('id') != omit]
+        # Every visit is a separate item, so repeated visits of the same product are read with some reserve
+        # and only the last visit of every product is returned.
+        logs_max = int(settings.PRODUCT_VISIT_LOG_MAX)
+        from_date = (datetime.now() - timedelta(days=int(settings.PRODUCT_VISIT_LOG_THRESHOLD))).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        response = self.table.query(
+            KeyConditionExpression=Key('pk').eq(self.get_partition_key()) & Key('sk').between(
+                self.__get_sort_key(from_date),
+                self.__get_sort_key('9999')
+            ),
+            ScanIndexForward=False,
+            Limit=logs_max * self.READ_RESERVE_FACTOR
+        )
 
-    def insert(self, product_item, **kwargs):
-        item = self.get_item()
+        logs = []
+        product_ids = set()
+        for item in response.get('Items', []):
+            log = item['product']
+            log_id = log.get('id', log.get('portal_config_id'))
+            if log_id in product_ids:
+                continue
 
+            product_ids.add(log_id)
+            if omit is None or log.get('id') != omit:
+                logs.append(log)
+
+        return logs[:logs_max]
+
+    def insert(self, product_item, **kwargs):
         # fix of "TypeError: Float types are not supported. Use Decimal types instead." error
         import json
         from decimal import Decimal
         product_item = json.loads(json.dumps(product_item), parse_float=Decimal)
 
-        product_item['visited_at'] = self.now()
-        if item is None:
-            response = self.table.put_item(
-                Item={
-                    'pk': self.get_partition_key(),
-                    'sk': self.SORT_KEY,
-                    'logs': [product_item]
-                })
-        else:
-            logs = item.get('logs', [])
-            for idx, value in enumerate(logs):
-                value_id = value.get('id', value.get('portal_config_id'))
-                product_item_id = product_item.get('id', product_item.get('portal_config_id'))
-                if value_id == product_item_id:
-                    del logs[idx]
-            logs = deque(logs, settings.PRODUCT_VISIT_LOG_MAX)
-            logs.appendleft(product_item)
-            response = self.table.update_item(
-                Key={
-                    'pk': self.get_partition_key(),
-                    'sk': self.SORT_KEY
-                },
-                UpdateExpression="set logs=:logs",
-                ExpressionAttributeValues={
-                    ':logs': list(logs)
-                }
-            )
+        now = datetime.now()
+        product_item['visited_at'] = now.strftime("%Y-%m-%d %H:%M:%S")
+        expires_at = now + timedelta(days=int(settings.PRODUCT_VISIT_LOG_THRESHOLD))
+
+        response = self.table.put_item(
+            Item={
+                'pk': self.get_partition_key(),
+                'sk': self.__get_sort_key(now.strftime("%Y-%m-%d %H:%M:%S.%f")),
+                'product': product_item,
+                self.TTL_ATTRIBUTE: int(expires_at.timestamp()),
+            })
         return response
@@ -1,6 +1,7 @@
 import json
 import datetime
 from typing import Tuple, Optional
+from boto3.dynamodb.conditions import Key
 from chalicelib.extensions import *
 from chalicelib.settings import settings
 from chalicelib.libs.core.elastic import Elastic
@@ -252,6 +253,9 @@ class _CancelRequestStorageDynamoDb(CancelRequestStorageInterface):
     __ENTITY_PROPERTY_ADDITIONAL_COMMENT = '__additional_comment'
     __ENTITY_PROPERTY_REQUESTED_AT = '__requested_at'
 
+    # a copy of every request is stored in the order's partition, so requests of the order are loaded by one query
+    __ORDER_PARTITION_KEY = 'PURCHASE_CANCELLATION_REQUEST_BY_ORDER#%s'
+
     def __init__(self):
         self.__dynamo_db = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
         self.__dynamo_db.PARTITION_KEY = 'PURCHASE_CANCELLATION_REQUEST'
@@ -261,7 +265,23 @@ class _CancelRequestStorageDynamoDb(CancelRequestStorageInterface):
         if not isinstance(cancel_request, CancelRequest):
             raise ArgumentTypeException(self.save, 'cancel_request', cancel_request)
 
-        self.__dynamo_db.put_item(cancel_request.number.value, {
+        data = self.__get_data(cancel_request)
+
+        # both items are sent by one BatchWriteItem request
+        with self.__dynamo_db.table.batch_writer() as writer:
+            writer.put_item(Item={
+                **data,
+                'pk': self.__dynamo_db.get_partition_key(),
+                'sk': cancel_request.number.value,
+            })
+            writer.put_item(Item={
+                **data,
+                'pk': self.__class__.__ORDER_PARTITION_KEY % cancel_request.order_number.value,
+                'sk': cancel_request.number.value,
+            })
+
+    def __get_data(self, cancel_request: CancelRequest) -> dict:
+        return {
             "order_number": cancel_request.order_number.value,
             "requested_at": cancel_request.requested_at.strftime('%Y-%m-%dT%H:%M:%S.%f'),
 
@@ -276,7 +296,7 @@ class _CancelRequestStorageDynamoDb(CancelRequestStorageInterface):
             'refund_method_extra_data_json': json.dumps(cancel_request.refund_method.extra_data),
 
             "additional_comment": cancel_request.additional_comment.value if cancel_request.additional_comment else None
-        })
+        }
 
     def __restore(self, data: dict) -> CancelRequest:
         cancel_request = self.__reflector.construct(CancelRequest, {
@@ -322,7 +342,16 @@ class _CancelRequestStorageDynamoDb(CancelRequestStorageInterface):
         if not isinstance(order_number, OrderNumber):
             raise ArgumentTypeException(self.get_all_by_order_number, 'order_number', order_number)
 
-        items = self.__dynamo_db.find_by_attribute('order_number', order_number.value)
+        items = []
+        params = {'KeyConditionExpression': Key('pk').eq(self.__class__.__ORDER_PARTITION_KEY % order_number.value)}
+        while True:
+            response = self.__dynamo_db.table.query(**params)
+            items.extend(response.get('Items', []))
+            if not response.get('LastEvaluatedKey'):
+                break
+
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
         result = [self.__restore(item) for item in items]
         return tuple(result)
 
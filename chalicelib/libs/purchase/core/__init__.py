@@ -4,7 +4,7 @@ from .checkout import Checkout, CheckoutStorageInterface
 from .customer import CustomerInterface, CustomerStorageInterface
 from .customer_tier import CustomerTier, CustomerTierStorageInterface
 from .dtd import Dtd, DtdCalculatorInterface
-from .order import Order, OrderStorageInterface
+from .order import Order, OrderStorageInterface, OrderVersionConflictException
 from .payments import PaymentMethodAbstract, RefundMethodAbstract
 from .product import ProductInterface, ProductStorageInterface
 from .purchase_service import PurchaseService
@@ -6,6 +6,8 @@ from .payments import RefundMethodAbstract
 
 
 class _Number(Id):
+    __slots__ = ()
+
     def __init__(self, value: str):
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
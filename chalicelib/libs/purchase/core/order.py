@@ -1026,6 +1026,11 @@ class Order(object):
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+class OrderVersionConflictException(Exception):
+    """ Order was changed by someone else after it had been loaded """
+    pass
+
+
 class OrderStorageInterface(object):
     def save(self, order: Order) -> None:
         raise NotImplementedError()
@@ -1039,6 +1044,20 @@ class OrderStorageInterface(object):
     def get_all_for_customer(self, customer_id: Id) -> Tuple[Order]:
         raise NotImplementedError()
 
+    def get_last_for_customer(self, customer_id: Id) -> Optional[Order]:
+        """ the latest created order of the customer """
+        raise NotImplementedError()
+
+    def get_page_by_dates(
+        self,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        limit: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[Tuple[Order], Optional[str]]:
+        """ orders created in [date_from, date_to] and token of the next page (None for the last page) """
+        raise NotImplementedError()
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
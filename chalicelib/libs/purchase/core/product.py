@@ -52,6 +52,9 @@ class ProductStorageInterface(object):
     def load(self, simple_sku: SimpleSku) -> Optional[ProductInterface]:
         raise NotImplementedError()
 
+    def get_all_by_simple_skus(self, simple_skus: Tuple[SimpleSku]) -> Tuple[ProductInterface]:
+        raise NotImplementedError()
+
     def update(self, product: ProductInterface) -> None:
         raise NotImplementedError()
 
@@ -8,6 +8,9 @@ from chalicelib.extensions import *
 
 
 class _BaseSimpleValueObject(object):
+    # value objects are restored in bulk by storages, so they don't need per-instance __dict__
+    __slots__ = ('__value',)
+
     def __init__(self, value):
         self.__value = value
 
@@ -29,6 +32,8 @@ class _BaseSimpleValueObject(object):
 
 
 class _BaseStringSimpleValueObject(_BaseSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: str):
         if not isinstance(value, str):
             raise ArgumentTypeException(self.__init__, 'value', value)
@@ -37,6 +42,8 @@ class _BaseStringSimpleValueObject(_BaseSimpleValueObject):
 
 
 class _BaseNumberSimpleValueObject(_BaseSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: Union[int, float]):
         if not isinstance(value, int) and not isinstance(value, float):
             raise ArgumentTypeException(self.__init__, 'value', value)
@@ -99,6 +106,8 @@ class _BaseNumberSimpleValueObject(_BaseSimpleValueObject):
 
 
 class Id(_BaseStringSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
@@ -114,6 +123,8 @@ class Id(_BaseStringSimpleValueObject):
 
 
 class Email(_BaseStringSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
@@ -137,6 +148,8 @@ class Email(_BaseStringSimpleValueObject):
 
 
 class Name(_BaseStringSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
@@ -152,6 +165,8 @@ class Name(_BaseStringSimpleValueObject):
 
 
 class Description(_BaseSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: Optional[str]) -> None:
         if value is None:
             super().__init__(value)
@@ -174,6 +189,8 @@ class Description(_BaseSimpleValueObject):
 
 
 class Percentage(_BaseNumberSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: Union[float, int]) -> None:
         value = float(str(value))
         if value < 0 or value > 100:
@@ -191,6 +208,8 @@ class Percentage(_BaseNumberSimpleValueObject):
 
 # @todo : move to product
 class EventCode(_BaseStringSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
@@ -208,6 +227,8 @@ class EventCode(_BaseStringSimpleValueObject):
 
 # @todo : move to product
 class SimpleSku(_BaseStringSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
@@ -224,6 +245,8 @@ class SimpleSku(_BaseStringSimpleValueObject):
 
 
 class Qty(_BaseNumberSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: int) -> None:
         value = int(str(value))
         if value < 0:
@@ -242,6 +265,8 @@ class Qty(_BaseNumberSimpleValueObject):
 
 
 class Cost(_BaseNumberSimpleValueObject):
+    __slots__ = ()
+
     def __init__(self, value: Union[int, float, str]) -> None:
         value = float(str(value))
         if value < 0:
@@ -360,6 +385,8 @@ class DeliveryAddress(object):
 
 
 class OrderNumber(Id):
+    __slots__ = ()
+
     def __init__(self, value: str):
         if not str(value).strip():
             raise ArgumentCannotBeEmptyException(self.__init__, 'value')
@@ -1,4 +1,5 @@
 import uuid
+from typing import Dict
 from chalicelib.settings import settings
 from chalicelib.libs.core.elastic import Elastic
 from chalicelib.libs.models.mpc.base import DynamoModel
@@ -43,6 +44,8 @@ class CustomerTiersTiersSqsHandler(SqsHandlerInterface):
 
 
 class CustomerTiersCustomersSqsHandler(SqsHandlerInterface):
+    __CHUNK_SIZE = 500
+
     def __init__(self):
         self.__tiers_storage = CustomerTierStorageImplementation()
         self.__messages = MessageStorageImplementation()
@@ -64,44 +67,70 @@ class CustomerTiersCustomersSqsHandler(SqsHandlerInterface):
         # 'tiers' here are the same tiers set as in 'customer_tiers_set' sqs-message.
         # Theoretically this message can be handled earlier than 'customer_tiers_set' message,
         # so we need to be sure, that all new tiers exist.
-        incoming_tiers_ids = [row['id'] for row in sqs_message.message_data['tiers']]
-        stored_tiers_ids = [tier.id.value for tier in self.__tiers_storage.get_all()]
-        if sum([tier_id for tier_id in incoming_tiers_ids if tier_id not in stored_tiers_ids]) > 0:
+        incoming_tiers_ids = [str(row['id']) for row in sqs_message.message_data['tiers']]
+        tiers = self.__tiers_storage.get_all()
+        if [tier_id for tier_id in incoming_tiers_ids if tier_id not in [tier.id.value for tier in tiers]]:
             # @todo : this is a crutch
             CustomerTiersTiersSqsHandler().handle(SqsMessage(
                 sqs_message.id,
                 'customer_tiers_set',
                 {'tiers': sqs_message.message_data['tiers']}
             ))
+            tiers = self.__tiers_storage.get_all()
 
-        # assign customers to tiers
-        tiers = self.__tiers_storage.get_all()
         tiers_map = {}
         for tier in tiers:
             tiers_map[tier.id.value] = tier
 
-        for customer_tier_data in sqs_message.message_data.get('customers'):
-            customer_email = str(customer_tier_data['email'])
-            tier_id = int(customer_tier_data['tier_id'])
-
-            if self.__elastic.get_data(customer_email):
-                self.__elastic.update_data(customer_email, {'doc': {
-                    'tier_id': tier_id
-                }})
-            else:
-                self.__elastic.create(customer_email, {'tier_id': tier_id})
+        # assign customers to tiers by chunks: one request to load current tiers, one request to save changes
+        customers_data = sqs_message.message_data.get('customers') or []
+        chunk_size = self.__class__.__CHUNK_SIZE
+        for offset in range(0, len(customers_data), chunk_size):
+            tier_ids_map = dict([
+                (str(customer_tier_data['email']), int(customer_tier_data['tier_id']))
+                for customer_tier_data in customers_data[offset:offset + chunk_size]
+            ])
+            self.__assign(tier_ids_map, tiers_map)
+
+    def __assign(self, tier_ids_map: Dict[str, int], tiers_map: Dict[str, CustomerTier]) -> None:
+        current_data_map = self.__elastic.mget_data(tuple(tier_ids_map.keys()))
+
+        # skip customers, whose tier is not changed
+        changes_map = dict([
+            (customer_email, tier_id) for customer_email, tier_id in tier_ids_map.items()
+            if customer_email not in current_data_map
+            or str(current_data_map[customer_email].get('tier_id')) != str(tier_id)
+        ])
+        if not changes_map:
+            return
+
+        self.__elastic.bulk_upsert(dict([
+            (customer_email, {'tier_id': tier_id}) for customer_email, tier_id in changes_map.items()
+        ]))
+
+        # notify users (silently)
+        try:
+            messages = []
+            for customer_email, tier_id in changes_map.items():
+                tier = tiers_map.get(str(tier_id))
+                if not tier:
+                    self.__logger.log_simple('{}: Customer Tier #{} is not found for {}!'.format(
+                        self.handle.__qualname__,
+                        tier_id,
+                        customer_email
+                    ))
+                    continue
 
-            # notify user (silently)
-            try:
-                tier = tiers_map[str(tier_id)]
-                self.__messages.save(Message(
+                messages.append(Message(
                     str(uuid.uuid4()),
                     customer_email,
                     'Your Customer Tier has been changed!',
                     'Now you are in the "{}" Customer Tier!'.format(tier.name.value)
                 ))
-            except BaseException as e:
-                self.__logger.log_exception(e)
+
+            self.__messages.save_all(tuple(messages))
+        except BaseException as e:
+            self.__logger.log_exception(e)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -208,12 +208,8 @@ class _CustomerDynamoDbStorage(CustomerStorageInterface):
 
         information_model = InformationModel(customer.customer_id.value)
 
-        # delete old addresses
-        for info_address in information_model.get_information().addresses:
-            information_model.delete_address(info_address.address_hash)
-
-        # insert new
-        information_model.add_addresses([{
+        # old addresses are replaced by one request
+        information_model.replace_addresses([{
             'address_nickname': delivery_address.address_nickname,
             'recipient_name': delivery_address.recipient_name,
             'mobile_number': delivery_address.phone_number,
@@ -1,8 +1,8 @@
-import requests
 import datetime
 from typing import Optional
 from chalicelib.extensions import *
 from chalicelib.settings import Config
+from chalicelib.libs.core.http_client import HttpClient
 from chalicelib.libs.purchase.core import \
     Dtd, DtdCalculatorInterface, \
     SimpleSku, Qty, Name, Description
@@ -16,7 +16,7 @@ class _DtdApiCalculator(DtdCalculatorInterface):
         self.__sku_base_url = Config.DTD_API_SKU_BASE_URL
 
     def __get_default_dtd(self) -> Dtd:
-        response = requests.get(self.__default_dtd_url)
+        response = HttpClient('dtd').get(self.__default_dtd_url)
         if response.status_code != 200:
             raise ValueError('Unable to get Default DTD! Service is unavailable!')
 
@@ -56,7 +56,7 @@ class _DtdApiCalculator(DtdCalculatorInterface):
         return default_dtd
 
     def __get_dtd_data(self, simple_sku_value: str) -> Optional[dict]:
-        response = requests.get(self.__sku_base_url + simple_sku_value)
+        response = HttpClient('dtd').get(self.__sku_base_url + simple_sku_value)
         if response.status_code != 200:
             raise ValueError('Unable to calculate DTD! Service is unavailable!')
 
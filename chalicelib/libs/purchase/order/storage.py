@@ -1,7 +1,11 @@
+import re
 import json
+import base64
+import weakref
 import datetime
 from decimal import Decimal
 from typing import Optional, Tuple
+from boto3.dynamodb.conditions import Key, Attr
 from chalicelib.extensions import *
 from chalicelib.settings import settings
 from chalicelib.libs.core.elastic import Elastic
@@ -10,7 +14,7 @@ from chalicelib.libs.core.reflector import Reflector
 from chalicelib.libs.purchase.core import \
     Id, EventCode, SimpleSku, Qty, Cost, DeliveryAddress, \
     Name, Description, Percentage, \
-    Dtd, Order, OrderStorageInterface
+    Dtd, Order, OrderStorageInterface, OrderVersionConflictException
 from chalicelib.libs.purchase.payment_methods.regular_eft.payment import RegularEftOrderPaymentMethod
 from chalicelib.libs.purchase.payment_methods.customer_credits import CustomerCreditsOrderPaymentMethod
 from chalicelib.libs.purchase.payment_methods.peach.payments import MobicredPaymentMethod, CreditCardOrderPaymentMethod
@@ -393,7 +397,37 @@ class _OrderElasticStorage(OrderStorageInterface):
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+# "%Y-%m-%dT%H:%M:%S.%f" is used to save datetime values, but strptime() is too slow for bulk restoring
+_DATETIME_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})\.(\d{6})$')
+
+
+def _parse_datetime(value: str) -> datetime.datetime:
+    match = _DATETIME_PATTERN.match(value)
+    if not match:
+        return datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
+
+    return datetime.datetime(*map(int, match.groups()))
+
+
+def _parse_date(value: str) -> datetime.date:
+    year, month, day = value.split('-')
+    return datetime.date(int(year), int(month), int(day))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
 class _OrderStorageDynamoDb(OrderStorageInterface):
+    # chunks of 100 orders are loaded concurrently by this number of threads
+    __BATCH_GET_WORKERS = 4
+
+    # customer_id => the latest created order number, so the last order is found without customer's history
+    __LAST_ORDER_PARTITION_KEY = 'PURCHASE_ORDERS_LAST'
+
+    # versions of loaded orders for optimistic locking: order is saved,
+    # only if it has not been changed by someone else after loading.
+    __versions = weakref.WeakKeyDictionary()
+
     def __init__(self):
         self.__dynamo_db = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
         self.__dynamo_db.PARTITION_KEY = 'PURCHASE_ORDERS'
@@ -458,14 +492,58 @@ class _OrderStorageDynamoDb(OrderStorageInterface):
         # fix of "TypeError: Float types are not supported. Use Decimal types instead." error
         document_data = json.loads(json.dumps(document_data), parse_float=Decimal)
 
-        self.__dynamo_db.put_item(document_id, document_data)
+        # new orders and orders, which are not loaded by the storage, are saved without a check
+        loaded_version = self.__class__.__versions.get(order)
+        condition = None
+        if loaded_version == 0:
+            # orders, which were saved before versioning
+            condition = Attr('version').not_exists() | Attr('version').eq(loaded_version)
+        elif loaded_version is not None:
+            condition = Attr('version').eq(loaded_version)
+
+        document_data['pk'] = self.__dynamo_db.get_partition_key()
+        document_data['sk'] = document_id
+        document_data['version'] = (loaded_version or 0) + 1
+        try:
+            if condition:
+                self.__dynamo_db.table.put_item(Item=document_data, ConditionExpression=condition)
+            else:
+                self.__dynamo_db.table.put_item(Item=document_data)
+        except self.__dynamo_db.table.meta.client.exceptions.ConditionalCheckFailedException:
+            raise OrderVersionConflictException('Order #{} was changed after loading!'.format(order_number.value))
+
+        self.__class__.__versions[order] = document_data['version']
+
+        # loaded orders already exist, so the pointer is written only on order creation
+        if loaded_version is None:
+            self.__save_last_order_pointer(order)
+
+    def __save_last_order_pointer(self, order: Order) -> None:
+        # the pointer is moved only to a newer order
+        created_at = order.created_at.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        try:
+            self.__dynamo_db.table.put_item(
+                Item={
+                    'pk': self.__class__.__LAST_ORDER_PARTITION_KEY,
+                    'sk': order.customer_id.value,
+                    'order_number': order.number.value,
+                    'created_at': created_at,
+                },
+                ConditionExpression=Attr('sk').not_exists() | Attr('created_at').lte(created_at)
+            )
+        except self.__dynamo_db.table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
 
     def __restore(self, data: dict) -> Order:
-        order_number = Order.Number(data.get('sk'))
-        customer_id = Id(data.get('customer_id'))
-        delivery_cost = Cost(float(data.get('delivery_cost')))
-        vat_percent = Percentage(float(data.get('vat_percent')))
-        credits_spent = Cost(float(data.get('credits_spent') or '0'))
+        # Attention! This is a hot path for customers with long order histories,
+        # so values are converted directly from DynamoDB types (Decimal, str) and
+        # repeated values (statuses, dates) are restored only once per order.
+
+        order_number = Order.Number(data['sk'])
+        customer_id = Id(data['customer_id'])
+        delivery_cost = Cost(float(data['delivery_cost']))
+        vat_percent = Percentage(float(data['vat_percent']))
+        credits_spent = Cost(float(data.get('credits_spent') or 0))
 
         payment_method = self.__restore_payment_method(
             data.get('payment_method'),
@@ -485,70 +563,58 @@ class _OrderStorageDynamoDb(OrderStorageInterface):
             data.get('delivery_address_special_instructions')
         )
 
+        statuses = {}
         status_changes = []
-        for status_change_data in data.get('status_history'):
-            status = Order.Status(status_change_data.get('status'))
-            changed_at = datetime.datetime.strptime(status_change_data.get('datetime'), '%Y-%m-%dT%H:%M:%S.%f')
-            status_change = self.__reflector.construct(Order.StatusChangesHistory.Change, {
-                '__status': status,
-                '__datetime': changed_at
-            })
-            status_changes.append(status_change)
+        for status_change_data in data['status_history']:
+            status_value = status_change_data['status']
+            if status_value not in statuses:
+                statuses[status_value] = Order.Status(status_value)
+
+            status_changes.append(self.__reflector.construct(Order.StatusChangesHistory.Change, {
+                '__status': statuses[status_value],
+                '__datetime': _parse_datetime(status_change_data['datetime']),
+            }))
 
         status_change_history = Order.StatusChangesHistory(tuple(status_changes))
 
+        dates = {}
         order_items = []
-        for item_data in data.get('order_items'):
-            event_code = EventCode(item_data.get('event_code'))
-            simple_sku = SimpleSku(item_data.get('simple_sku'))
-            product_original_price = Cost(item_data.get('product_original_price'))
-            product_current_price = Cost(item_data.get('product_current_price'))
-            fbucks_earnings = Cost(item_data.get('fbucks_earnings'))
+        for item_data in data['order_items']:
+            for date_key in ('dtd_date_from', 'dtd_date_to'):
+                if item_data[date_key] not in dates:
+                    dates[item_data[date_key]] = _parse_date(item_data[date_key])
+
             dtd = Dtd(
                 Dtd.Occasion(
-                    Name(item_data.get('dtd_occasion_name')),
+                    Name(item_data['dtd_occasion_name']),
                     Description(item_data.get('dtd_occasion_description'))
                 ) if item_data.get('dtd_occasion_name') else None,
-                datetime.date(
-                    int(item_data.get('dtd_date_from').split('-')[0]),
-                    int(item_data.get('dtd_date_from').split('-')[1]),
-                    int(item_data.get('dtd_date_from').split('-')[2])
-                ),
-                datetime.date(
-                    int(item_data.get('dtd_date_to').split('-')[0]),
-                    int(item_data.get('dtd_date_to').split('-')[1]),
-                    int(item_data.get('dtd_date_to').split('-')[2])
-                ),
-                int(item_data.get('dtd_working_days_from')),
-                int(item_data.get('dtd_working_days_to'))
+                dates[item_data['dtd_date_from']],
+                dates[item_data['dtd_date_to']],
+                int(item_data['dtd_working_days_from']),
+                int(item_data['dtd_working_days_to'])
             )
 
-            qty_ordered = Qty(int(item_data.get('qty_ordered')))
-            qty_return_requested = Qty(int(item_data.get('qty_return_requested') or 0))
-            qty_return_returned = Qty(int(item_data.get('qty_return_returned') or 0))
-            qty_cancelled_before_payment = Qty(int(item_data.get('qty_cancelled_before_payment') or 0))
-            qty_cancelled_after_payment_requested = Qty(int(item_data.get('qty_cancelled_after_payment_requested') or 0))
-            qty_cancelled_after_payment_cancelled = Qty(int(item_data.get('qty_cancelled_after_payment_cancelled') or 0))
-            qty_refunded = Qty(int(item_data.get('qty_refunded') or 0))
-            qty_modified_at = datetime.datetime.strptime(item_data.get('qty_modified_at'), '%Y-%m-%dT%H:%M:%S.%f')
-
-            order_item = self.__reflector.construct(Order.Item, {
-                '__event_code': event_code,
-                '__simple_sku': simple_sku,
-                '__product_original_price': product_original_price,
-                '__product_current_price': product_current_price,
+            order_items.append(self.__reflector.construct(Order.Item, {
+                '__event_code': EventCode(item_data['event_code']),
+                '__simple_sku': SimpleSku(item_data['simple_sku']),
+                '__product_original_price': Cost(float(item_data['product_original_price'])),
+                '__product_current_price': Cost(float(item_data['product_current_price'])),
                 '__dtd': dtd,
-                '__qty_ordered': qty_ordered,
-                '__qty_return_requested': qty_return_requested,
-                '__qty_return_returned': qty_return_returned,
-                '__qty_cancelled_before_payment': qty_cancelled_before_payment,
-                '__qty_cancelled_after_payment_requested': qty_cancelled_after_payment_requested,
-                '__qty_cancelled_after_payment_cancelled': qty_cancelled_after_payment_cancelled,
-                '__qty_refunded': qty_refunded,
-                '__qty_modified_at': qty_modified_at,
-                '__fbucks_earnings': fbucks_earnings
-            })
-            order_items.append(order_item)
+                '__qty_ordered': Qty(int(item_data['qty_ordered'])),
+                '__qty_return_requested': Qty(int(item_data.get('qty_return_requested') or 0)),
+                '__qty_return_returned': Qty(int(item_data.get('qty_return_returned') or 0)),
+                '__qty_cancelled_before_payment': Qty(int(item_data.get('qty_cancelled_before_payment') or 0)),
+                '__qty_cancelled_after_payment_requested': Qty(
+                    int(item_data.get('qty_cancelled_after_payment_requested') or 0)
+                ),
+                '__qty_cancelled_after_payment_cancelled': Qty(
+                    int(item_data.get('qty_cancelled_after_payment_cancelled') or 0)
+                ),
+                '__qty_refunded': Qty(int(item_data.get('qty_refunded') or 0)),
+                '__qty_modified_at': _parse_datetime(item_data['qty_modified_at']),
+                '__fbucks_earnings': Cost(float(item_data['fbucks_earnings'])),
+            }))
 
         order = self.__reflector.construct(Order, {
             '__order_number': order_number,
@@ -562,6 +628,8 @@ class _OrderStorageDynamoDb(OrderStorageInterface):
             '__credits_spent': credits_spent,
         })
 
+        self.__class__.__versions[order] = int(data.get('version') or 0)
+
         return order
 
     def __restore_payment_method(
@@ -600,8 +668,12 @@ class _OrderStorageDynamoDb(OrderStorageInterface):
         if any([not isinstance(order_number, Order.Number) for order_number in order_numbers]):
             raise ArgumentTypeException(self.get_all_by_numbers, 'order_numbers', order_numbers)
 
-        result = [self.load(order_number) for order_number in order_numbers]
-        result = [order for order in result if order is not None]
+        items = self.__dynamo_db.find_items(
+            tuple([order_number.value for order_number in order_numbers]),
+            max_workers=self.__BATCH_GET_WORKERS
+        )
+
+        result = [self.__restore(item) for item in items]
         return tuple(result)
 
     def get_all_for_customer(self, customer_id: Id) -> Tuple[Order]:
@@ -612,6 +684,64 @@ class _OrderStorageDynamoDb(OrderStorageInterface):
         result = [self.__restore(item) for item in items]
         return tuple(result)
 
+    def get_last_for_customer(self, customer_id: Id) -> Optional[Order]:
+        if not isinstance(customer_id, Id):
+            raise ArgumentTypeException(self.get_last_for_customer, 'customer_id', customer_id)
+
+        pointer = self.__dynamo_db.table.get_item(Key={
+            'pk': self.__class__.__LAST_ORDER_PARTITION_KEY,
+            'sk': customer_id.value,
+        }).get('Item')
+        if pointer:
+            return self.load(Order.Number(pointer['order_number']))
+
+        # customers, whose orders were not saved after the pointer was added
+        last_order: Optional[Order] = None
+        for order in self.get_all_for_customer(customer_id):
+            if not last_order or order.created_at > last_order.created_at:
+                last_order = order
+
+        if last_order:
+            self.__save_last_order_pointer(last_order)
+
+        return last_order
+
+    def get_page_by_dates(
+        self,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        limit: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[Tuple[Order], Optional[str]]:
+        if not isinstance(date_from, datetime.date):
+            raise ArgumentTypeException(self.get_page_by_dates, 'date_from', date_from)
+        elif not isinstance(date_to, datetime.date):
+            raise ArgumentTypeException(self.get_page_by_dates, 'date_to', date_to)
+        elif not isinstance(limit, int):
+            raise ArgumentTypeException(self.get_page_by_dates, 'limit', limit)
+        elif limit < 1:
+            raise ArgumentValueException('{} expects limit > 0'.format(self.get_page_by_dates.__qualname__))
+
+        try:
+            start_key = json.loads(base64.urlsafe_b64decode(continuation_token.encode()).decode()) \
+                if continuation_token else None
+        except ValueError:
+            raise ArgumentValueException('{} continuation token "{}" is incorrect!'.format(
+                self.get_page_by_dates.__qualname__,
+                continuation_token
+            ))
+
+        # order number starts with creation date "yymmdd", so the range is a key condition, not a filter
+        items, last_key = self.__dynamo_db.find_page(
+            Key('sk').between(date_from.strftime('%y%m%d'), date_to.strftime('%y%m%d') + '99999999'),
+            limit,
+            start_key
+        )
+
+        orders = tuple([self.__restore(item) for item in items])
+        next_token = base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode() if last_key else None
+        return orders, next_token
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -633,6 +763,18 @@ class OrderStorageImplementation(OrderStorageInterface):
     def get_all_for_customer(self, customer_id: Id) -> Tuple[Order]:
         return self.__storage.get_all_for_customer(customer_id)
 
+    def get_last_for_customer(self, customer_id: Id) -> Optional[Order]:
+        return self.__storage.get_last_for_customer(customer_id)
+
+    def get_page_by_dates(
+        self,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        limit: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[Tuple[Order], Optional[str]]:
+        return self.__storage.get_page_by_dates(date_from, date_to, limit, continuation_token)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
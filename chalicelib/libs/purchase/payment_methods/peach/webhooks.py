@@ -1,10 +1,15 @@
 import json
+import time
+import hashlib
 import binascii
+from typing import Optional
+from boto3.dynamodb.conditions import Attr
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from chalicelib.extensions import *
 from chalicelib.settings import settings
 from chalicelib.libs.core.logger import Logger
+from chalicelib.libs.models.mpc.base import DynamoModel
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -63,3 +68,74 @@ class WebhooksFlowLog(object):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
+
+
+class WebhooksNotificationsRegistry(object):
+    """
+    Peach retries notifications and can send the same notification many times,
+    so every notification is locked by a conditional write before processing.
+    Old notifications are removed by DynamoDB TTL, which should be enabled for TTL_ATTRIBUTE in the table.
+    """
+
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+
+    TTL_ATTRIBUTE = 'expires_at'
+    __TTL_DAYS = 30
+
+    # a notification of a failed lambda can be processed again after this time
+    __LOCK_SECONDS = 300
+
+    def __init__(self):
+        self.__dynamo_db = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
+        self.__dynamo_db.PARTITION_KEY = 'PEACH_PAYMENT_WEBHOOK_NOTIFICATION'
+
+    @staticmethod
+    def get_notification_id(data: dict) -> str:
+        # retries have the same body
+        return hashlib.md5(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def lock(self, notification_id: str) -> bool:
+        """ False, if the notification is already processed or is being processed right now """
+        if not isinstance(notification_id, str):
+            raise ArgumentTypeException(self.lock, 'notification_id', notification_id)
+        elif not notification_id.strip():
+            raise ArgumentCannotBeEmptyException(self.lock, 'notification_id')
+
+        now = int(time.time())
+        try:
+            self.__dynamo_db.table.put_item(
+                Item={
+                    'pk': self.__dynamo_db.get_partition_key(),
+                    'sk': notification_id,
+                    'status': self.STATUS_PROCESSING,
+                    'locked_until': now + self.__class__.__LOCK_SECONDS,
+                    self.TTL_ATTRIBUTE: now + self.__class__.__TTL_DAYS * 24 * 60 * 60,
+                },
+                ConditionExpression=Attr('sk').not_exists() | (
+                    Attr('status').eq(self.STATUS_PROCESSING) & Attr('locked_until').lt(now)
+                )
+            )
+        except self.__dynamo_db.table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+        return True
+
+    def get_status(self, notification_id: str) -> Optional[str]:
+        item = self.__dynamo_db.find_item(notification_id)
+        return item.get('status') if item else None
+
+    def complete(self, notification_id: str) -> None:
+        self.__dynamo_db.table.update_item(
+            Key={'pk': self.__dynamo_db.get_partition_key(), 'sk': notification_id},
+            UpdateExpression='SET #status = :status REMOVE locked_until',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':status': self.STATUS_DONE}
+        )
+
+    def release(self, notification_id: str) -> None:
+        """ the notification can be processed again, e.g. after an error """
+        self.__dynamo_db.delete_item(notification_id)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 from chalicelib.extensions import *
 from chalicelib.libs.models.mpc.Product import Product as MpcProducts
 from chalicelib.libs.purchase.core import SimpleSku, ProductInterface, ProductStorageInterface
@@ -20,6 +20,27 @@ class ProductStorageImplementation(ProductStorageInterface):
         product = ProductInterfaceImplementation(data, simple_sku.value)
         return product
 
+    def get_all_by_simple_skus(self, simple_skus: Tuple[SimpleSku]) -> Tuple[ProductInterface]:
+        """ loads products by one request, not existed products are skipped """
+        if sum([not isinstance(simple_sku, SimpleSku) for simple_sku in simple_skus]) > 0:
+            raise ArgumentTypeException(self.get_all_by_simple_skus, 'simple_skus', simple_skus)
+
+        simple_skus = tuple(dict.fromkeys([simple_sku.value for simple_sku in simple_skus]))
+        if not simple_skus:
+            return tuple()
+
+        products_map = {}
+        for data in self.__mpcProducts.getRawDataBySimpleSkus(simple_skus):
+            for size_data in data.get('sizes', []):
+                if size_data.get('simple_sku') in simple_skus:
+                    products_map[size_data.get('simple_sku')] = ProductInterfaceImplementation(
+                        data,
+                        size_data.get('simple_sku')
+                    )
+
+        result = [products_map[simple_sku] for simple_sku in simple_skus if simple_sku in products_map]
+        return tuple(result)
+
     def update(self, product: ProductInterface) -> None:
         if not isinstance(product, ProductInterface):
             raise ArgumentTypeException(self.update, 'product', product)
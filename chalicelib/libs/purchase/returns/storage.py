@@ -104,16 +104,8 @@ class _ReturnRequestStorageElastic(ReturnRequestStorageInterface):
             }
         }'
 
-        curl -X DELETE localhost:9200/purchase_return_requests_customer_map
-        curl -X PUT localhost:9200/purchase_return_requests_customer_map -H "Content-Type: application/json" -d'{
-            "mappings": {
-                "purchase_return_requests_customer_map": {
-                    "properties": {
-                        "request_numbers_json": {"type": "keyword"}
-                    }
-                }
-            }
-        }'
+        Customer's requests are searched by "customer_id". Previously they were listed
+        in "purchase_return_requests_customer_map" index - see migrations/returns_cancellations_lookup.py
     """
 
     __ENTITY_PROPERTY_REQUEST_NUMBER = '__number'
@@ -135,10 +127,6 @@ class _ReturnRequestStorageElastic(ReturnRequestStorageInterface):
             settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS,
             settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS
         )
-        self.__customer_requests_map_elastic = Elastic(
-            settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS_CUSTOMER_MAP,
-            settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS_CUSTOMER_MAP
-        )
         self.__reflector = Reflector()
 
     def save(self, return_request: ReturnRequest) -> None:
@@ -176,39 +164,29 @@ class _ReturnRequestStorageElastic(ReturnRequestStorageInterface):
             "refund_method_extra_data_json": json.dumps(return_request.refund_method.extra_data),
         }
 
-        existed_request = self.load(return_request.number)
-        if existed_request:
-            # just a double check of number uniqueness
-            if existed_request.customer_id != return_request.customer_id:
-                raise RuntimeError(
-                    'Return Request "{}" already exists and belongs to another Customer!'.format(return_request.number)
-                )
-
-            self.__requests_elastic.update_data(document_id, {
-                'doc': document_data
-            })
-        else:
-            self.__requests_elastic.create(document_id, document_data)
-
-            # Elastic can search by attributes only after 1 second from last update.
-            # We need all data, when we are searching by customer_id,
-            # so in this case we will lost fresh data, if search directly after creation of a new return request.
-            # In this case we need to use another index and get data by elastic doc_id.
-
-            customer_requests_map = self.__customer_requests_map_elastic.get_data(return_request.customer_id.value)
-            if customer_requests_map:
-                request_numbers = list(json.loads(customer_requests_map.get('request_numbers_json', '[]')) or [])
-                request_numbers.append(return_request.number.value)
-                request_numbers = list(set(request_numbers))
-                self.__customer_requests_map_elastic.update_data(return_request.customer_id.value, {
-                    'doc': {
-                        'request_numbers_json': json.dumps(request_numbers)
-                    }
-                })
-            else:
-                self.__customer_requests_map_elastic.create(return_request.customer_id.value, {
-                    'request_numbers_json': json.dumps([return_request.number.value])
-                })
+        # Insert or update by one request. Number uniqueness is double checked by the script:
+        # the request of another customer is not changed ("noop" result).
+        # Elastic can search by attributes only after 1 second from last update, so we wait for refresh -
+        # customer's requests must be found directly after creation of a new return request.
+        response = self.__requests_elastic.update_data(document_id, {
+            'scripted_upsert': True,
+            'script': {
+                'lang': 'painless',
+                'source': " ".join([
+                    "if (ctx._source.customer_id != null && ctx._source.customer_id != params.doc.customer_id) {",
+                    "    ctx.op = 'none';",
+                    "} else {",
+                    "    ctx._source.putAll(params.doc);",
+                    "}",
+                ]),
+                'params': {'doc': document_data},
+            },
+            'upsert': {},
+        }, refresh='wait_for')
+        if response.get('result') == 'noop':
+            raise RuntimeError(
+                'Return Request "{}" already exists and belongs to another Customer!'.format(return_request.number)
+            )
 
     def load(self, request_number: ReturnRequest.Number) -> Optional[ReturnRequest]:
         if not isinstance(request_number, ReturnRequest.Number):
@@ -262,29 +240,17 @@ class _ReturnRequestStorageElastic(ReturnRequestStorageInterface):
         if not isinstance(customer_id, Id):
             raise ArgumentTypeException(self.get_all_for_customer, 'customer_id', customer_id)
 
-        data = self.__customer_requests_map_elastic.get_data(customer_id.value)
-        request_numbers = json.loads((data.get('request_numbers_json') or '[]') if data else '[]') or []
-        if not request_numbers:
-            return tuple()
-
         rows = self.__requests_elastic.post_search({
-            "query": {"ids": {"values": request_numbers}},
+            "query": {
+                "bool": {
+                    "filter": {"term": {"customer_id": customer_id.value}}
+                }
+            },
+            "sort": [{"request_number": {"order": "desc"}}],
             "size": 10000
         }).get('hits', {}).get('hits', []) or []
 
         result = [self.__restore(row['_source']) for row in rows]
-
-        if len(result) != len(request_numbers):
-            message = '{} can\'t find all Return-Requests for Customer #{}! Not existed Return-Requests in map: {}'
-            raise ValueError(message.format(
-                self.get_all_for_customer,
-                customer_id.value,
-                [
-                    request_number for request_number in request_numbers
-                    if request_number not in [request.number.value for request in result]
-                ]
-            ))
-
         return tuple(result)
 
 
@@ -70,6 +70,18 @@ class SeenStorageInterface(object):
     def load(self, seen_id) -> Optional[Seen]:
         raise NotImplementedError()
 
+    def add_items(self, seen_id, skus: Tuple[str]) -> None:
+        raise NotImplementedError()
+
+    def remove_item(self, seen_id, sku) -> None:
+        raise NotImplementedError()
+
+    def clear(self, seen_id) -> None:
+        raise NotImplementedError()
+
+    def is_added(self, seen_id, sku) -> bool:
+        raise NotImplementedError()
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -1,5 +1,5 @@
 from chalicelib.extensions import *
-from chalicelib.libs.seen.seen import Seen, SeenStorageInterface
+from chalicelib.libs.seen.seen import Seen, SeenStorageInterface, ProductNotInSeenException
 from chalicelib.libs.models.mpc.Product import Product
 
 class _SeenAppService(object):
@@ -29,37 +29,28 @@ class _SeenAppService(object):
         # if not product:
         #     raise ApplicationLogicException('Product "{0}" does not exist!'.format(sku))
 
-        seen = self.__load_or_create_seen(user_id)
-        seen.add_item(sku)
-        self.__seen_storage.save(seen)
+        self.__seen_storage.add_items(user_id, (sku,))
 
     def add_seen_products(self, user_id: str, skus: list) -> None:
-
-        seen = self.__load_or_create_seen(user_id)
-        for sku in skus:
-            seen.add_item(sku)
-        self.__seen_storage.save(seen)
+        self.__seen_storage.add_items(user_id, tuple(skus))
 
     # ------------------------------------------------------------------------------------------------------------------
 
     def remove_seen_product(self, user_id: str, sku: str) -> None:
+        if not self.__seen_storage.is_added(user_id, sku):
+            raise ProductNotInSeenException(sku)
 
-        seen = self.__load_or_create_seen(user_id)
-        seen.remove_item(sku)
-        self.__seen_storage.save(seen)
+        self.__seen_storage.remove_item(user_id, sku)
 
     # ------------------------------------------------------------------------------------------------------------------
 
     def clear_seen(self, user_id) -> None:
-        seen = self.__load_or_create_seen(user_id)
-        seen.clear()
-        self.__seen_storage.save(seen)
+        self.__seen_storage.clear(user_id)
 
     # ------------------------------------------------------------------------------------------------------------------
 
     def product_is_in_seen(self, user_id: str, sku: str) -> bool:
-        seen = self.__load_or_create_seen(user_id)
-        return seen.is_added(sku)
+        return self.__seen_storage.is_added(user_id, sku)
 
     # ------------------------------------------------------------------------------------------------------------------
 
@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import Optional, Tuple, List
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Key
 from chalicelib.extensions import *
 from chalicelib.settings import settings
 from chalicelib.libs.models.mpc.base import DynamoModel
@@ -6,8 +8,20 @@ from chalicelib.libs.seen.seen import Seen, SeenStorageInterface
 from chalicelib.libs.models.mpc.Product import Product
 
 class _SeenDynamoDbStorage(DynamoModel, SeenStorageInterface):
+    """
+    Every seen product is stored in the customer's partition by two items:
+    "SEEN_AT#<seen_at>#<sku>" - history row, so the latest products are read by one bounded descending query,
+    "SEEN#<sku>" - lookup item with "seen_at", so checking is a single key lookup and re-adding replaces the row.
+    Rows beyond SEEN_PRODUCTS_MAX are removed on loading, old items are removed by DynamoDB TTL,
+    which should be enabled for TTL_ATTRIBUTE in the table.
+    Previously seen products were stored in the "SEEN" partition - see migrations/seen_products.py
+    """
+
     TABLE_NAME = settings.AWS_DYNAMODB_CMS_TABLE_NAME
-    PARTITION_KEY = 'SEEN'
+    PARTITION_KEY = 'PROFILE#%s'
+    SORT_KEY_PREFIX = 'SEEN#'
+    HISTORY_SORT_KEY_PREFIX = 'SEEN_AT#'
+    TTL_ATTRIBUTE = 'expires_at'
 
     def __init__(self, product: Product):
         if not isinstance(product, Product):
@@ -16,20 +30,113 @@ class _SeenDynamoDbStorage(DynamoModel, SeenStorageInterface):
         super(self.__class__, self).__init__(self.TABLE_NAME)
         self.__product = product
 
+    def __get_key(self, seen_id, sku) -> dict:
+        return {'pk': self.PARTITION_KEY % seen_id, 'sk': self.SORT_KEY_PREFIX + str(sku)}
+
+    def __get_history_key(self, seen_id, sku, seen_at: str) -> dict:
+        return {'pk': self.PARTITION_KEY % seen_id, 'sk': '{}{}#{}'.format(self.HISTORY_SORT_KEY_PREFIX, seen_at, sku)}
+
+    def __get_history_sku(self, history_sort_key: str) -> str:
+        # seen_at does not contain "#"
+        return history_sort_key[len(self.HISTORY_SORT_KEY_PREFIX):].split('#', 1)[1]
+
     # ------------------------------------------------------------------------------------------------------------------
 
     def save(self, seen: Seen) -> None:
         if not isinstance(seen, Seen):
             raise ArgumentTypeException(self.save, 'seen', seen)
 
-        data = {
-            'pk': self.PARTITION_KEY,
-            'sk': seen.seen_id,
-            'seen_items': seen.items
+        # insert or update
+        removed_keys = []
+        for history_key in self.__load_history_keys(seen.seen_id):
+            sku = self.__get_history_sku(history_key['sk'])
+            if sku not in seen.items:
+                removed_keys.extend([history_key, self.__get_key(seen.seen_id, sku)])
+
+        if removed_keys:
+            with self.table.batch_writer() as writer:
+                for key in removed_keys:
+                    writer.delete_item(Key=key)
+
+        self.add_items(seen.seen_id, tuple(seen.items))
+
+    def add_items(self, seen_id, skus: Tuple[str]) -> None:
+        if seen_id is None:
+            raise ArgumentTypeException(self.add_items, 'seen_id', seen_id)
+
+        skus = list(dict.fromkeys(skus))
+        if not skus:
+            return
+
+        now = datetime.now()
+        expires_at = int((now + timedelta(days=int(settings.SEEN_PRODUCTS_THRESHOLD))).timestamp())
+
+        # microseconds keep the order of products, which are added together
+        seen_at_list = [
+            (now + timedelta(microseconds=index)).strftime('%Y-%m-%d %H:%M:%S.%f') for index in range(len(skus))
+        ]
+        history_items = [
+            {**self.__get_history_key(seen_id, sku, seen_at), self.TTL_ATTRIBUTE: expires_at}
+            for sku, seen_at in zip(skus, seen_at_list)
+        ]
+
+        # history rows are written before lookup items, so a concurrent adding always removes the replaced row
+        if len(history_items) == 1:
+            self.table.put_item(Item=history_items[0])
+        else:
+            with self.table.batch_writer() as writer:
+                for item in history_items:
+                    writer.put_item(Item=item)
+
+        replaced_keys = []
+        for sku, seen_at in zip(skus, seen_at_list):
+            response = self.table.update_item(
+                Key=self.__get_key(seen_id, sku),
+                UpdateExpression='SET seen_at = :seen_at, #ttl = :ttl',
+                ExpressionAttributeNames={'#ttl': self.TTL_ATTRIBUTE},
+                ExpressionAttributeValues={':seen_at': seen_at, ':ttl': expires_at},
+                ReturnValues='UPDATED_OLD'
+            )
+            replaced_seen_at = response.get('Attributes', {}).get('seen_at')
+            if replaced_seen_at:
+                replaced_keys.append(self.__get_history_key(seen_id, sku, replaced_seen_at))
+
+        if len(replaced_keys) == 1:
+            self.table.delete_item(Key=replaced_keys[0])
+        elif replaced_keys:
+            with self.table.batch_writer() as writer:
+                for key in replaced_keys:
+                    writer.delete_item(Key=key)
+
+    def remove_item(self, seen_id, sku) -> None:
+        if seen_id is None:
+            raise ArgumentTypeException(self.remove_item, 'seen_id', seen_id)
+
+        item = self.table.get_item(Key=self.__get_key(seen_id, sku)).get('Item')
+        if not item:
+            return
+
+        with self.table.batch_writer() as writer:
+            if item.get('seen_at'):
+                writer.delete_item(Key=self.__get_history_key(seen_id, sku, item['seen_at']))
+            writer.delete_item(Key=self.__get_key(seen_id, sku))
+
+    def clear(self, seen_id) -> None:
+        if seen_id is None:
+            raise ArgumentTypeException(self.clear, 'seen_id', seen_id)
+
+        # "SEEN" is the prefix of both lookup items and history rows
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.PARTITION_KEY % seen_id) & Key('sk').begins_with('SEEN'),
+            'ProjectionExpression': 'pk, sk',
         }
+        self.__delete_queried(params)
 
-        # insert or update
-        self.table.put_item(Item=data)
+    def is_added(self, seen_id, sku) -> bool:
+        if seen_id is None:
+            raise ArgumentTypeException(self.is_added, 'seen_id', seen_id)
+
+        return self.table.get_item(Key=self.__get_key(seen_id, sku)).get('Item') is not None
 
     # ------------------------------------------------------------------------------------------------------------------
 
@@ -37,16 +144,57 @@ class _SeenDynamoDbStorage(DynamoModel, SeenStorageInterface):
         if seen_id is None:
             raise ArgumentTypeException(self.load, 'seen_id', seen_id)
 
-        data = self.get_item(seen_id).get('Item', None)
-        result = self.__restore(data) if data else None
+        # the newest row of a product is kept, if a replaced row is not removed yet
+        skus = list(dict.fromkeys([self.__get_history_sku(key['sk']) for key in self.__load_history_keys(seen_id)]))
+        result = self.__restore(seen_id, list(reversed(skus))) if skus else None
         return result
 
-    def __restore(self, data) -> Seen:
-        seen_id = data.get('sk')
+    def __load_history_keys(self, seen_id) -> List[dict]:
+        """ keys of the latest SEEN_PRODUCTS_MAX history rows, the newest first """
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.PARTITION_KEY % seen_id) & Key('sk').begins_with(
+                self.HISTORY_SORT_KEY_PREFIX
+            ),
+            'ProjectionExpression': 'pk, sk',
+            'ScanIndexForward': False,
+            'Limit': int(settings.SEEN_PRODUCTS_MAX),
+        }
+        response = self.table.query(**params)
+        if response.get('LastEvaluatedKey'):
+            self.__trim(seen_id, response['LastEvaluatedKey'])
+
+        return response.get('Items', [])
+
+    def __trim(self, seen_id, start_key: dict) -> None:
+        """ removes rows, which are older than the latest SEEN_PRODUCTS_MAX rows """
+        params = {
+            'KeyConditionExpression': Key('pk').eq(self.PARTITION_KEY % seen_id) & Key('sk').begins_with(
+                self.HISTORY_SORT_KEY_PREFIX
+            ),
+            'ProjectionExpression': 'pk, sk',
+            'ScanIndexForward': False,
+            'ExclusiveStartKey': start_key,
+        }
+        self.__delete_queried(params, lambda key: self.__get_key(seen_id, self.__get_history_sku(key['sk'])))
+
+    def __delete_queried(self, params: dict, get_related_key=None) -> None:
+        with self.table.batch_writer() as writer:
+            while True:
+                response = self.table.query(**params)
+                for key in response.get('Items', []):
+                    writer.delete_item(Key={'pk': key['pk'], 'sk': key['sk']})
+                    if get_related_key:
+                        writer.delete_item(Key=get_related_key(key))
 
+                if not response.get('LastEvaluatedKey'):
+                    return
+
+                params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def __restore(self, seen_id, skus: List[str]) -> Seen:
         seen = object.__new__(Seen)
         seen._Seen__id = seen_id
-        seen._Seen__items = data.get('seen_items', [])
+        seen._Seen__items = skus
 
         return seen
 
@@ -65,6 +213,18 @@ class SeenStorageImplementation(SeenStorageInterface):
     def load(self, seen_id) -> Optional[Seen]:
         return self.__storage.load(seen_id)
 
+    def add_items(self, seen_id, skus: Tuple[str]) -> None:
+        return self.__storage.add_items(seen_id, skus)
+
+    def remove_item(self, seen_id, sku) -> None:
+        return self.__storage.remove_item(seen_id, sku)
+
+    def clear(self, seen_id) -> None:
+        return self.__storage.clear(seen_id)
+
+    def is_added(self, seen_id, sku) -> bool:
+        return self.__storage.is_added(seen_id, sku)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
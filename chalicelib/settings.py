@@ -286,6 +286,42 @@ class Config:
         # }'
     })))
 
+    # ------------------------------------------------------------------------------------------------------------------
+    #                                               HTTP CLIENT
+    # ------------------------------------------------------------------------------------------------------------------
+
+    HTTP_CLIENT_CONFIG = json.loads(os.environ.get('HTTP_CLIENT_CONFIG', json.dumps({
+        # values of integrations are merged with default values
+        'default': {
+            # seconds
+            'connect_timeout': 3,
+            'read_timeout': 10,
+            # only idempotent requests (GET, PUT, DELETE, ...) and connection errors are retried
+            'retries': 2,
+            'backoff_factor': 0.2,
+            # keep-alive connections per host
+            'pool_maxsize': 10,
+        },
+        'peach': {'read_timeout': 30},
+        'magento': {'read_timeout': 5},
+        'dtd': {'connect_timeout': 2, 'read_timeout': 3},
+        'elastic': {},
+    })))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    #                                                  LOGGER
+    # ------------------------------------------------------------------------------------------------------------------
+
+    LOGGER_CONFIG = json.loads(os.environ.get('LOGGER_CONFIG', json.dumps({
+        # default level and levels per module prefix, e.g. {"chalicelib.libs.core.sqs_sender": "DEBUG"}
+        'level': 'DEBUG' if DEBUG else 'INFO',
+        'levels': {},
+        # part of debug records, which is written (0..1)
+        'debug_sample_rate': 1 if DEBUG else 0.1,
+        # records are written at the end of invocation, on error or when buffer is full
+        'buffer_size': 100,
+    })))
+
     # ------------------------------------------------------------------------------------------------------------------
     #                                                  OTHER
     # ------------------------------------------------------------------------------------------------------------------
@@ -302,6 +338,27 @@ class Config:
     LAST_CHANCE_END_DATE_THRESHOLD = os.environ.get('LAST_CHANCE_END_DATE_THRESHOLD', 30)
     PRODUCT_VISIT_LOG_MAX = os.environ.get('PRODUCT_VISIT_LOG_MAX', 10)
     PRODUCT_VISIT_LOG_THRESHOLD = os.environ.get('PRODUCT_VISIT_LOG_THRESHOLD', 7)
+    SEEN_PRODUCTS_THRESHOLD = os.environ.get('SEEN_PRODUCTS_THRESHOLD', 180)  # days
+    SEEN_PRODUCTS_MAX = os.environ.get('SEEN_PRODUCTS_MAX', 1000)
+
+    # Similar styles, also availables (seconds / items per lambda container)
+    PRODUCT_RECOMMENDATIONS_CACHE_TTL = int(os.environ.get('PRODUCT_RECOMMENDATIONS_CACHE_TTL', 300))
+    PRODUCT_RECOMMENDATIONS_CACHE_SIZE = int(os.environ.get('PRODUCT_RECOMMENDATIONS_CACHE_SIZE', 500))
+
+    # Categories by gender (seconds per lambda container)
+    CATEGORIES_CACHE_TTL = int(os.environ.get('CATEGORIES_CACHE_TTL', 300))
+
+    # Responses for anonymous visitors (see AnonymousResponseCache)
+    ANONYMOUS_RESPONSE_CACHE_CONFIG = json.loads(os.environ.get('ANONYMOUS_RESPONSE_CACHE_CONFIG', json.dumps({
+        # seconds, also used as Cache-Control max-age
+        'ttl': 60,
+        # responses per lambda container
+        'max_size': 200,
+        # use DynamoDB as a cache shared by all containers
+        'shared': False,
+        # seconds, how long catalogue version is cached in a container
+        'version_ttl': 30,
+    })))
 
     # READ API
     READ_API_HEADER_NAME = os.environ.get('READ_API_HEADER_NAME', 'Identification')
@@ -3,6 +3,7 @@ from .base import *
 from chalicelib.libs.models.ml.products import Product as MlProducts
 from chalicelib.libs.models.mpc.Product import Product as MpcProducts
 from chalicelib.libs.models.ml.scored_products import ScoredProduct
+from chalicelib.libs.core.response_cache import CatalogueVersion
 
 
 class ProductSqsHandler(SqsHandlerInterface):
@@ -26,6 +27,8 @@ class ProductSqsHandler(SqsHandlerInterface):
             products
         )
 
+        CatalogueVersion().increase()
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -43,6 +46,8 @@ class EventProductSqsHandler(SqsHandlerInterface):
             settings.AWS_ELASTICSEARCH_PRODUCTS,
             items, random_date=True)
 
+        CatalogueVersion().increase()
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -71,6 +76,8 @@ class SingleProductSqsHandler(SqsHandlerInterface):
             sqs_message.message_data['rs_sku'],
             sqs_message.message_data)
 
+        CatalogueVersion().increase()
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -0,0 +1,61 @@
+"""
+Customer messages migration.
+
+Messages are moved from the shared "NOTIFICATION_SIMPLE" partition
+to partitions of customers "NOTIFICATION#<email>" by "MESSAGE#<created_at>#<id>" keys.
+This script can be run many times, moved messages are removed from the shared partition.
+
+    $ python migrations/messages_by_customer.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from boto3.dynamodb.conditions import Key
+from chalicelib.settings import settings
+from chalicelib.libs.models.mpc.base import DynamoModel
+
+
+def _migrate_messages(dry_run: bool) -> int:
+    dynamo_db = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
+    dynamo_db.PARTITION_KEY = 'NOTIFICATION_SIMPLE'
+
+    items = []
+    params = {'KeyConditionExpression': Key('pk').eq(dynamo_db.get_partition_key())}
+    while True:
+        response = dynamo_db.table.query(**params)
+        items.extend(response.get('Items', []))
+        if not response.get('LastEvaluatedKey'):
+            break
+
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if items and not dry_run:
+        with dynamo_db.table.batch_writer() as writer:
+            for item in items:
+                created_at = ''.join([c for c in item['created_at'] if c.isdigit()]).ljust(20, '0')
+                writer.put_item(Item={
+                    **item,
+                    'pk': 'NOTIFICATION#%s' % item['customer_email'],
+                    'sk': 'MESSAGE#%s#%s' % (created_at, item['sk']),
+                    'message_id': item['sk'],
+                })
+                writer.delete_item(Key={'pk': item['pk'], 'sk': item['sk']})
+
+    return len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='count messages without writing')
+    args = parser.parse_args()
+
+    print('messages: {} are moved to customers partitions'.format(_migrate_messages(args.dry_run)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Products current price backfill.
+
+Price sorting, price range filters and price facets use the stored effective price "current_price"
+(see get_current_price()). New and updated documents get it on indexing, this script calculates it
+from "rs_selling_price" and "discount" for already existed documents. It can be run many times.
+
+    $ python migrations/products_current_price.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from chalicelib.settings import settings
+from chalicelib.libs.core.elastic import Elastic
+from chalicelib.libs.models.ml.product_entry import CURRENT_PRICE_SCRIPT
+
+
+def _migrate_index(index_name: str, doc_type: str, dry_run: bool) -> int:
+    elastic = Elastic(index_name, doc_type)
+    client = elastic.client
+
+    query = {'bool': {'must_not': [{'exists': {'field': 'current_price'}}]}}
+    count = client.count(index=index_name, body={'query': query})['count']
+    if dry_run:
+        return count
+
+    # mapped explicitly, not as dynamic field
+    field_mapping = client.indices.get_field_mapping(index=index_name, doc_type=doc_type, fields='current_price')
+    if not field_mapping.get(index_name, {}).get('mappings', {}).get(doc_type, {}).get('current_price'):
+        client.indices.put_mapping(
+            index=index_name,
+            doc_type=doc_type,
+            body={'properties': {'current_price': {'type': 'float'}}}
+        )
+
+    task = client.update_by_query(
+        index=index_name,
+        doc_type=doc_type,
+        body={
+            'query': query,
+            'script': {'source': CURRENT_PRICE_SCRIPT, 'lang': 'painless'},
+        },
+        conflicts='proceed',
+        wait_for_completion=False
+    )
+    print('{}: update by query task {}'.format(index_name, task.get('task')))
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='count documents without changes')
+    args = parser.parse_args()
+
+    print('products: {} documents get current_price'.format(_migrate_index(
+        settings.AWS_ELASTICSEARCH_PRODUCTS,
+        settings.AWS_ELASTICSEARCH_PRODUCTS,
+        args.dry_run
+    )))
+    print('scored products: {} documents get current_price'.format(_migrate_index(
+        settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS,
+        settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS,
+        args.dry_run
+    )))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Products normalized / autocomplete sub-fields migration.
+
+Filters of products and scored products are compared with "normalized" keyword sub-fields and search text
+with "autocomplete" sub-fields (see ProductMapping). This script adds the analysis settings and sub-fields
+to already existed indices and reindexes documents in place, so elastic fills the new sub-fields.
+It can be run many times.
+
+    $ python migrations/products_normalized_fields.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from chalicelib.settings import settings
+from chalicelib.libs.core.elastic import Elastic
+from chalicelib.libs.models.mpc.ProductMapping import (
+    mapping, scored_products_mapping, analysis, NORMALIZED_FIELDS, AUTOCOMPLETE_FIELDS)
+
+
+def _get_sub_fields_properties(properties: dict) -> dict:
+    # only fields with sub-fields: other fields of existed indices are not changed
+    result = {}
+    for path in NORMALIZED_FIELDS + AUTOCOMPLETE_FIELDS:
+        names = path.split('.')
+        source, target = properties, result
+        for name in names[:-1]:
+            source = source[name]['properties']
+            target = target.setdefault(name, {'properties': {}})['properties']
+
+        target[names[-1]] = source[names[-1]]
+
+    return result
+
+
+def _migrate_index(index_name: str, doc_type: str, properties: dict, dry_run: bool) -> int:
+    elastic = Elastic(index_name, doc_type)
+    client = elastic.client
+
+    count = client.count(index=index_name)['count']
+    if dry_run:
+        return count
+
+    # analyzers can be added to a closed index only
+    index_settings = client.indices.get_settings(index=index_name)[index_name]['settings']['index']
+    if not all(
+        name in index_settings.get('analysis', {}).get(kind, {})
+        for kind, items in analysis.items() for name in items.keys()
+    ):
+        client.indices.close(index=index_name)
+        try:
+            client.indices.put_settings(index=index_name, body={'analysis': analysis})
+        finally:
+            client.indices.open(index=index_name)
+
+    client.indices.put_mapping(
+        index=index_name,
+        doc_type=doc_type,
+        body={'properties': _get_sub_fields_properties(properties)}
+    )
+
+    # documents are reindexed in place (without changes), so new sub-fields are filled
+    task = client.update_by_query(
+        index=index_name,
+        doc_type=doc_type,
+        body={'query': {'match_all': {}}},
+        conflicts='proceed',
+        wait_for_completion=False
+    )
+    print('{}: update by query task {}'.format(index_name, task.get('task')))
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='count documents without changes')
+    args = parser.parse_args()
+
+    print('products: {} documents are reindexed'.format(_migrate_index(
+        settings.AWS_ELASTICSEARCH_PRODUCTS,
+        settings.AWS_ELASTICSEARCH_PRODUCTS,
+        mapping['mappings']['products']['properties'],
+        args.dry_run
+    )))
+    print('scored products: {} documents are reindexed'.format(_migrate_index(
+        settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS,
+        settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS,
+        scored_products_mapping['mappings']['scored_products']['properties'],
+        args.dry_run
+    )))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Return and cancellation requests lookup migration.
+
+Return requests of a customer are searched by "customer_id" of request documents instead of
+"purchase_return_requests_customer_map" index, and cancellation requests of an order are loaded
+from the order's partition (PURCHASE_CANCELLATION_REQUEST_BY_ORDER#<order_number>).
+This script fills both lookups for already existed requests. It can be run many times.
+
+    $ python migrations/returns_cancellations_lookup.py [--dry-run]
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from boto3.dynamodb.conditions import Key
+from elasticsearch import helpers
+from chalicelib.settings import settings
+from chalicelib.libs.core.elastic import Elastic
+from chalicelib.libs.models.mpc.base import DynamoModel
+
+
+def _migrate_return_requests(dry_run: bool) -> int:
+    requests_elastic = Elastic(
+        settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS,
+        settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS
+    )
+    map_elastic = Elastic(
+        settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS_CUSTOMER_MAP,
+        settings.AWS_ELASTICSEARCH_PURCHASE_RETURN_REQUESTS_CUSTOMER_MAP
+    )
+
+    # map documents are stored by customer id: {"request_numbers_json": "[...]"}
+    documents = {}
+    for row in helpers.scan(map_elastic.client, index=map_elastic.index_name, query={'query': {'match_all': {}}}):
+        for request_number in json.loads(row['_source'].get('request_numbers_json') or '[]'):
+            documents[request_number] = {'customer_id': row['_id']}
+
+    # request documents, which already have customer_id, are not changed
+    existed = requests_elastic.mget_data(tuple(documents.keys())) if documents else {}
+    documents = {
+        request_number: document for request_number, document in documents.items()
+        if request_number in existed and not existed[request_number].get('customer_id')
+    }
+
+    if documents and not dry_run:
+        requests_elastic.bulk_upsert(documents)
+
+    return len(documents)
+
+
+def _migrate_cancellation_requests(dry_run: bool) -> int:
+    dynamo_db = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
+    dynamo_db.PARTITION_KEY = 'PURCHASE_CANCELLATION_REQUEST'
+
+    items = []
+    params = {'KeyConditionExpression': Key('pk').eq(dynamo_db.get_partition_key())}
+    while True:
+        response = dynamo_db.table.query(**params)
+        items.extend(response.get('Items', []))
+        if not response.get('LastEvaluatedKey'):
+            break
+
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if items and not dry_run:
+        with dynamo_db.table.batch_writer() as writer:
+            for item in items:
+                writer.put_item(Item={
+                    **item,
+                    'pk': 'PURCHASE_CANCELLATION_REQUEST_BY_ORDER#%s' % item['order_number'],
+                })
+
+    return len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='count documents without writing')
+    args = parser.parse_args()
+
+    print('return requests: {} documents get customer_id'.format(_migrate_return_requests(args.dry_run)))
+    print('cancellation requests: {} items are copied by order'.format(_migrate_cancellation_requests(args.dry_run)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Scored products low stock flag backfill.
+
+Last chance feed filters scored products by "is_low_stock" flag, which is written on scores calculation
+and stock updates. This script calculates the flag from sizes qty for already existed documents.
+It can be run many times.
+
+    $ python migrations/scored_products_low_stock.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from chalicelib.settings import settings
+from chalicelib.libs.core.elastic import Elastic
+from chalicelib.libs.models.ml.product_entry import LOW_STOCK_SCRIPT
+
+
+def _migrate_scored_products(dry_run: bool) -> int:
+    index_name = settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS
+    doc_type = settings.AWS_ELASTICSEARCH_SCORED_PRODUCTS
+    elastic = Elastic(index_name, doc_type)
+    client = elastic.client
+
+    query = {'bool': {'must_not': [{'exists': {'field': 'is_low_stock'}}]}}
+    count = client.count(index=index_name, body={'query': query})['count']
+    if dry_run:
+        return count
+
+    # mapped explicitly, not as dynamic field
+    field_mapping = client.indices.get_field_mapping(index=index_name, doc_type=doc_type, fields='is_low_stock')
+    if not field_mapping.get(index_name, {}).get('mappings', {}).get(doc_type, {}).get('is_low_stock'):
+        client.indices.put_mapping(
+            index=index_name,
+            doc_type=doc_type,
+            body={'properties': {'is_low_stock': {'type': 'boolean'}}}
+        )
+
+    # stored qty of sizes is not changed
+    task = client.update_by_query(
+        index=index_name,
+        doc_type=doc_type,
+        body={
+            'query': query,
+            'script': {
+                'source': LOW_STOCK_SCRIPT,
+                'lang': 'painless',
+                'params': {
+                    'stocks': {},
+                    'threshold': int(settings.LAST_CHANCE_STOCK_THRESHOLD),
+                },
+            },
+        },
+        conflicts='proceed',
+        wait_for_completion=False
+    )
+    print('{}: update by query task {}'.format(index_name, task.get('task')))
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='count documents without changes')
+    args = parser.parse_args()
+
+    print('scored products: {} documents get is_low_stock'.format(_migrate_scored_products(args.dry_run)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Seen products migration.
+
+Seen products are stored by history rows "SEEN_AT#<seen_at>#<sku>" and lookup items "SEEN#<sku>"
+in the customer's partition (see _SeenDynamoDbStorage). This script moves lists of the old "SEEN" partition
+and creates history rows for lookup items, which were stored without them. The order of adding is kept.
+It can be run many times.
+
+    $ python migrations/seen_products.py [--dry-run]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DEBUG', '1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+from boto3.dynamodb.conditions import Key, Attr
+from chalicelib.settings import settings
+from chalicelib.libs.models.mpc.base import DynamoModel
+from chalicelib.libs.seen.storage import SeenStorageImplementation, _SeenDynamoDbStorage
+
+LEGACY_PARTITION_KEY = 'SEEN'
+
+
+def _query_all(dynamo_db: DynamoModel, method: str, params: dict) -> list:
+    items = []
+    while True:
+        response = getattr(dynamo_db.table, method)(**params)
+        items.extend(response.get('Items', []))
+        if not response.get('LastEvaluatedKey'):
+            return items
+
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def _migrate_seen_products(dry_run: bool) -> int:
+    dynamo_db = DynamoModel(settings.AWS_DYNAMODB_CMS_TABLE_NAME)
+    partition_prefix = _SeenDynamoDbStorage.PARTITION_KEY % ''
+
+    # skus of every customer, the oldest first: old lists, then lookup items by time of adding
+    skus = {}
+    legacy_items = _query_all(dynamo_db, 'query', {'KeyConditionExpression': Key('pk').eq(LEGACY_PARTITION_KEY)})
+    for item in legacy_items:
+        skus.setdefault(item['sk'], []).extend(item.get('seen_items') or [])
+
+    lookup_items = _query_all(dynamo_db, 'scan', {
+        'FilterExpression': Attr('pk').begins_with(partition_prefix) & Attr('sk').begins_with(
+            _SeenDynamoDbStorage.SORT_KEY_PREFIX
+        ),
+    })
+    for item in sorted(lookup_items, key=lambda data: data.get('seen_at') or ''):
+        seen_id = item['pk'][len(partition_prefix):]
+        skus.setdefault(seen_id, []).append(item['sk'][len(_SeenDynamoDbStorage.SORT_KEY_PREFIX):])
+
+    if dry_run:
+        return len(skus)
+
+    seen_storage = SeenStorageImplementation()
+    for seen_id, seen_skus in skus.items():
+        # the last adding of a product is kept
+        seen_skus = list(reversed(list(dict.fromkeys(reversed(seen_skus)))))
+        seen_storage.add_items(seen_id, tuple(seen_skus[-int(settings.SEEN_PRODUCTS_MAX):]))
+
+    with dynamo_db.table.batch_writer() as writer:
+        for item in legacy_items:
+            writer.delete_item(Key={'pk': item['pk'], 'sk': item['sk']})
+
+    return len(skus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='count customers without writing')
+    args = parser.parse_args()
+
+    print('seen products: {} customers are migrated'.format(_migrate_seen_products(args.dry_run)))
+
+
+if __name__ == '__main__':
+    main()